@@ -0,0 +1,286 @@
+from cache import cdp_fingerprint
+from exceptions import DeviceAuthenticationFailed
+from metrics import phase_timer
+from net_async import ForceSessionRetry
+from parsers import targeted_mac_commands
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+
+discovery_commands = ['show cdp neighbor detail', 'show interface switchport', 'show mac address-table']
+"""Show commands collected for 'discovery()'"""
+
+
+cdp_legacy_fields = {
+    'neighbor_name': {'cisco_ios': 'destination_host', 'cisco_nxos': 'dest_host'},
+    'mgmt_address': {'cisco_ios': 'management_ip', 'cisco_nxos': 'mgmt_ip'},
+    'neighbor_description': {'cisco_ios': 'software_version', 'cisco_nxos': 'version'},
+    'neighbor_interface': {'cisco_ios': 'remote_port', 'cisco_nxos': 'remote_port'},
+    'local_interface': {'cisco_ios': 'local_port', 'cisco_nxos': 'local_port'}
+}
+"""{ntc_templates 4+ field: {platform: field of earlier templates}} of 'show cdp neighbor detail'"""
+mac_legacy_fields = {
+    'vlan_id': {'cisco_ios': 'vlan', 'cisco_nxos': 'vlan'},
+    'mac_address': {'cisco_ios': 'destination_address', 'cisco_nxos': 'mac'},
+    'ports': {'cisco_ios': 'destination_port'}
+}
+"""{ntc_templates 4+ field: {platform: field of earlier templates}} of 'show mac address-table'"""
+
+
+def legacy_fields(platform, command, parsed_output):
+    """Renames fields of ntc_templates 4+ parsed output to the field names of earlier templates 'CdpParser' uses,
+    eg. 'neighbor_name' to 'destination_host' or 'dest_host'. Output of earlier templates is returned unchanged."""
+    if command == 'show cdp neighbor detail':
+        fields = cdp_legacy_fields
+    elif command.startswith('show mac address-table'):
+        fields = mac_legacy_fields
+    else:
+        return parsed_output
+    if not isinstance(parsed_output, list):
+        return parsed_output
+    for entry in parsed_output:
+        for field, platform_fields in fields.items():
+            if field in entry and platform in platform_fields:
+                entry.setdefault(platform_fields[platform], entry.pop(field))
+        if fields is cdp_legacy_fields and platform == 'cisco_nxos':
+            entry.setdefault('sysname', '')
+            entry.setdefault('interface_ip', '')
+    return parsed_output
+
+
+def textfsm_parse(platform, command, raw_output):
+    """Parses raw command output with NTC TextFSM templates the same as Netmiko 'use_textfsm'. Fields of either
+    ntc_templates generation are returned with the earlier field names, same as 'identify()' accepts either generation
+    of 'show version' fields.\n
+    Returns raw output if no template matches."""
+    from ntc_templates.parse import parse_output
+    try:
+        parsed_output = parse_output(platform=platform, command=command, data=raw_output)
+    except Exception:
+        return raw_output
+    return legacy_fields(platform, command, parsed_output)
+
+
+def asyncssh_connector(username, password, timeout=30):
+    """Returns coroutine function connecting to device IP address over SSH with asyncssh
+
+    :return: connect(ip_address) -> AsyncSshConnection"""
+    import asyncssh
+
+    class AsyncSshConnection:
+        """Runs each show command on its own SSH exec channel of a single connection"""
+        def __init__(self, connection):
+            self.connection = connection
+
+        async def send_command(self, command):
+            result = await self.connection.run(command)
+            return result.stdout
+
+        def close(self):
+            self.connection.close()
+
+    async def connect(ip_address):
+        try:
+            connection = await asyncssh.connect(
+                ip_address, username=username, password=password, known_hosts=None, connect_timeout=timeout)
+        except asyncssh.PermissionDenied:
+            raise DeviceAuthenticationFailed(f'Authentication failed to {ip_address}')
+        return AsyncSshConnection(connection)
+
+    return connect
+
+
+class CollectedSession:
+    """
+    Session-like object given to 'discovery()' holding TextFSM parsed outputs collected asynchronously.
+
+    :param connection: Connection returned from connector
+    :param ip_address: Device management IP address
+    :param metrics: 'DiscoveryMetrics' recording command and TextFSM parse time
+    :param parse_cache: 'ParseCache' of TextFSM results keyed by raw output digest
+    :param executor: Executor TextFSM parsing runs within so parsing doesn't block the event loop, parsed within
+    event loop if None
+    """
+    def __init__(self, connection, ip_address, metrics=None, parse_cache=None, executor=None):
+        self.connection = connection
+        self.ip_address = ip_address
+        self.metrics = metrics
+        self.parse_cache = parse_cache
+        self.executor = executor
+        self.hostname = ip_address
+        self.platform = 'cisco_ios'
+        self.outputs = {}
+        """{command: parsed output}"""
+        self.raw_outputs = {}
+        """{command: raw output}"""
+        self.device = {
+            'hostname': ip_address,
+            'ip_address': ip_address,
+            'model': 'Unknown',
+            'software_version': 'Unknown',
+            'serial': 'Unknown',
+            'rommon': 'Unknown',
+            'connection_type': 'ssh',
+            'device_type': 'cisco_ios'
+        }
+        """Device dictionary in 'AsyncSessions().successful_devices' format"""
+
+    async def parse(self, command, raw_output):
+        """Runs 'textfsm_parse' on raw output within executor"""
+        def timed_parse():
+            with phase_timer(self.metrics, 'textfsm', self.ip_address):
+                return textfsm_parse(self.platform, command, raw_output)
+
+        if self.executor is None:
+            return timed_parse()
+        return await asyncio.get_running_loop().run_in_executor(self.executor, timed_parse)
+
+    async def identify(self):
+        """Runs 'show version' setting platform, hostname, and device dictionary"""
+        with phase_timer(self.metrics, 'show version', self.ip_address):
+            raw_output = await self.connection.send_command('show version')
+        if raw_output.__contains__('NX-OS'):
+            self.platform = 'cisco_nxos'
+        version = await self.parse('show version', raw_output)
+        if isinstance(version, list) and len(version) != 0:
+            version = version[0]
+            self.hostname = version.get('hostname') or self.ip_address
+            hardware = version.get('hardware') or version.get('platform') or 'Unknown'
+            serial = version.get('serial') or 'Unknown'
+            self.device.update({
+                'hostname': self.hostname,
+                'model': hardware[0] if isinstance(hardware, list) else hardware,
+                'software_version': version.get('version') or version.get('os') or 'Unknown',
+                'serial': serial[0] if isinstance(serial, list) else serial,
+                'rommon': version.get('rommon') or version.get('bios') or 'Unknown'
+            })
+        self.device['device_type'] = self.platform
+
+    async def fetch(self, commands):
+        """Runs and parses commands not already collected"""
+        for command in commands:
+            if command not in self.outputs:
+                with phase_timer(self.metrics, command, self.ip_address):
+                    raw_output = await self.connection.send_command(command)
+                self.raw_outputs[command] = raw_output
+                digest = None
+                if self.parse_cache is not None:
+                    digest = self.parse_cache.digest(self.platform, command, raw_output)
+                    parsed_output = self.parse_cache.get('textfsm', digest)
+                    if parsed_output is not None:
+                        self.outputs[command] = parsed_output
+                        continue
+                self.outputs[command] = await self.parse(command, raw_output)
+                if digest is not None:
+                    self.parse_cache.put('textfsm', digest, self.outputs[command])
+
+    def send_command(self, command):
+        """Returns collected parsed output of command"""
+        return self.outputs[command]
+
+
+class AsyncDiscoverySessions:
+    """
+    asyncio based alternative to 'AsyncSessions' running 'discovery()' on thousands of devices concurrently.\n
+    Show command output is collected asynchronously, then function is run on 'CollectedSession'. TextFSM parsing and
+    function run within a bounded thread pool so CPU bound parsing doesn't stall I/O and timeouts of other sessions.
+
+    :param username: Username for device management
+    :param password: Password for device management
+    :param mgmt_ips: List of management IP addresses
+    :param function: Function run on each 'CollectedSession', eg. 'discovery'
+    :param cache: 'DiscoveryCache' checked with 'show cdp neighbors' fingerprint before discovery commands are run
+    :param max_sessions: Maximum concurrent device sessions
+    :param timeout: Seconds per device for connecting and collecting all commands
+    :param connector: Coroutine function 'connect(ip_address)' returning connection with coroutine
+    'send_command(command)' and 'close()', defaults to asyncssh
+    :param retries: Additional attempts on device raising 'ForceSessionRetry'
+    :param metrics: 'DiscoveryMetrics' recording connect, command, and TextFSM parse time
+    :param targeted_mac: Collects 'show mac address-table vlan <voice_vlan>' for phone voice VLANs instead of the full
+    MAC address table, function must be 'discovery' with matching 'targeted_mac'
+    :param parse_cache: 'ParseCache' of TextFSM results keyed by raw output digest
+    :param parse_workers: Threads running TextFSM parsing and function, defaults to 'ThreadPoolExecutor' default
+
+        Attributes:
+            outputs = [{'device', 'output'}]\n
+            successful_devices = []\n
+            failed_devices = []
+    """
+    def __init__(self, username, password, mgmt_ips, function, cache=None, max_sessions=1000, timeout=120,
+                 connector=None, retries=1, metrics=None, targeted_mac=False, parse_cache=None, parse_workers=None):
+        self.outputs = []
+        self.successful_devices = []
+        self.failed_devices = []
+        if connector is None:
+            connector = asyncssh_connector(username, password)
+
+        async def collect(ip_address):
+            """Connects to device and runs 'function' returning {'device', 'output'}"""
+            with phase_timer(metrics, 'connect', ip_address):
+                connection = await connector(ip_address)
+            try:
+                session = CollectedSession(connection, ip_address, metrics, parse_cache, executor)
+                await session.identify()
+                output = None
+                fingerprint = None
+                if cache is not None:
+                    await session.fetch(['show cdp neighbors'])
+                    fingerprint = cdp_fingerprint(session)
+                    output = cache.get(ip_address, session.hostname, fingerprint)
+                if output is None:
+                    if targeted_mac:
+                        await session.fetch(discovery_commands[0:2])
+                        await session.fetch(targeted_mac_commands(
+                            session.outputs[discovery_commands[0]], session.outputs[discovery_commands[1]]))
+                    else:
+                        await session.fetch(discovery_commands)
+                    output = await asyncio.get_running_loop().run_in_executor(executor, function, session)
+                    if cache is not None:
+                        cache.put(ip_address, session.hostname, fingerprint, output)
+                return {'device': session.device, 'output': output}
+            finally:
+                connection.close()
+
+        def failed_device(ip_address, exception, connectivity=True, authentication=True, authorization=True):
+            """Appends device to 'failed_devices'"""
+            self.failed_devices.append({
+                'ip_address': ip_address,
+                'connection_type': 'ssh',
+                'device_type': 'Unknown',
+                'connectivity': connectivity,
+                'authentication': authentication,
+                'authorization': authorization,
+                'exception': str(exception)
+            })
+
+        async def device_session(semaphore, ip_address):
+            """Runs 'collect' on device within semaphore and timeout, sorting into successful and failed devices"""
+            async with semaphore:
+                for attempt in range(0, retries + 1):
+                    try:
+                        result = await asyncio.wait_for(collect(ip_address), timeout)
+                        self.outputs.append(result)
+                        self.successful_devices.append(result['device'])
+                    except ForceSessionRetry as e:
+                        if attempt != retries:
+                            continue
+                        failed_device(ip_address, e, authorization=False)
+                    except DeviceAuthenticationFailed as e:
+                        failed_device(ip_address, e, authentication=False, authorization=False)
+                    except (asyncio.TimeoutError, OSError) as e:
+                        failed_device(ip_address, repr(e), False, False, False)
+                    except Exception as e:
+                        failed_device(ip_address, repr(e))
+                    break
+
+        async def run():
+            semaphore = asyncio.BoundedSemaphore(max_sessions)
+            await asyncio.gather(*[device_session(semaphore, ip_address) for ip_address in mgmt_ips])
+
+        with ThreadPoolExecutor(parse_workers) as executor:
+            asyncio.run(run())
+
+        # Orders results by management IP address, sessions finish in any order
+        order = {ip_address: i for i, ip_address in enumerate(mgmt_ips)}
+        self.outputs.sort(key=lambda output: order[output['device']['ip_address']])
+        self.successful_devices.sort(key=lambda device: order[device['ip_address']])
+        self.failed_devices.sort(key=lambda device: order[device['ip_address']])
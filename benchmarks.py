@@ -0,0 +1,577 @@
+from capture import CaptureReplay
+from fake_cli import fake_campus_network
+from inventory import InventoryDiscovery, RtSwSeperator, HostnameIndex
+import normalize
+from parsers import CdpParser, output_to_spreadsheet
+from records import Phone
+from synthetic import SyntheticNetwork
+from topology import TopologyGraph
+from datetime import datetime
+from os import makedirs, path
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import re
+
+# Run with: python benchmarks.py, or python benchmarks.py --end-to-end --scales 1000 10000 for end-to-end suite only.
+# End-to-end results are appended to 'bench_output/benchmark_results.jsonl' by default.
+
+
+class FakeSession:
+    """Stand-in for 'AsyncSessions' session providing only attributes used by 'CdpParser'"""
+    def __init__(self, hostname='BENCH-SW1', ip_address='10.0.0.1'):
+        self.hostname = hostname
+        self.ip_address = ip_address
+
+
+def synthetic_phone_outputs(phone_count=400, mac_count=20000, switch_count=9):
+    """Builds TextFSM shaped outputs of 'show cdp neighbor detail', 'show interface switchport', and
+    'show mac address-table' for a switch stack with phone neighbors.
+
+    :return: cdp_neighbors, switchports, mac_addrs"""
+    cdp_neighbors = []
+    switchports = []
+    mac_addrs = []
+    ports_per_switch = max(int(phone_count / switch_count) + 1, 48)
+    for n in range(0, switch_count * ports_per_switch):
+        intf = f'{int(n / ports_per_switch) + 1}/0/{n % ports_per_switch + 1}'
+        switchports.append({
+            'interface': f'Gi{intf}',
+            'mode': 'static access',
+            'access_vlan': '10',
+            'native_vlan': '1',
+            'voice_vlan': str(100 + n % switch_count)
+        })
+        if n < phone_count:
+            mac = f'{n:012x}'.upper()
+            cdp_neighbors.append({
+                'destination_host': f'SEP{mac}',
+                'management_ip': f'10.1.{int(n / 250)}.{n % 250 + 1}',
+                'platform': 'Cisco IP Phone 8845',
+                'remote_port': 'Port 1',
+                'local_port': f'GigabitEthernet{intf}',
+                'software_version': 'sip88xx.12-8-1-0001-455.loads',
+                'capabilities': 'Host Phone Two-port Mac Relay'
+            })
+    for n in range(0, mac_count):
+        mac = f'{n:012x}'
+        mac_addrs.append({
+            'destination_address': f'{mac[0:4]}.{mac[4:8]}.{mac[8:12]}',
+            'type': 'DYNAMIC',
+            'vlan': str(10 + n % 20),
+            'destination_port': f'Gi{n % switch_count + 1}/0/{n % 48 + 1}'
+        })
+    # Voice VLANs present in MAC address table for every other switch in the stack
+    for n in range(0, switch_count, 2):
+        mac_addrs.append({
+            'destination_address': f'0000.0000.{n:04x}',
+            'type': 'DYNAMIC',
+            'vlan': str(100 + n),
+            'destination_port': f'Gi{n + 1}/0/1'
+        })
+    return cdp_neighbors, switchports, mac_addrs
+
+
+def synthetic_mixed_outputs(neighbor_count=2000):
+    """Builds TextFSM shaped outputs for a device with phone, router/switch, access point, and other CDP neighbors.
+
+    :return: cdp_neighbors, switchports, mac_addrs"""
+    cdp_neighbors, switchports, mac_addrs = synthetic_phone_outputs(int(neighbor_count / 2), 2000)
+    for n in range(0, neighbor_count - len(cdp_neighbors)):
+        kind = n % 3
+        intf = f'TenGigabitEthernet{int(n / 48) + 1}/1/{n % 48 + 1}'
+        if kind == 0:
+            neighbor = {
+                'destination_host': f'BENCH-ACC{n}.corp.local',
+                'platform': 'cisco WS-C3850-48P',
+                'software_version': 'Cisco IOS Software, IOS-XE Software, Catalyst L3 Switch Software '
+                                    '(CAT3K_CAA-UNIVERSALK9-M), Version 16.9.5, RELEASE SOFTWARE (fc2)',
+                'capabilities': 'Router Switch IGMP'
+            }
+        elif kind == 1:
+            neighbor = {
+                'destination_host': f'BENCH-AP{n}',
+                'platform': 'cisco AIR-AP2802I-B-K9',
+                'software_version': 'Cisco AP Software, ap1g5-k9w8 Version: 8.10.130.0',
+                'capabilities': 'Trans-Bridge Source-Route-Bridge IGMP'
+            }
+        else:
+            neighbor = {
+                'destination_host': f'BENCH-OTHER{n}',
+                'platform': 'VMware ESX',
+                'software_version': 'Releasever 6.7.0',
+                'capabilities': 'Host'
+            }
+        neighbor['management_ip'] = f'10.2.{int(n / 250)}.{n % 250 + 1}'
+        neighbor['remote_port'] = 'GigabitEthernet1/0/1'
+        neighbor['local_port'] = intf
+        cdp_neighbors.append(neighbor)
+    return cdp_neighbors, switchports, mac_addrs
+
+
+def scan_voice_vlans(cdp_neighbors, switchports, mac_addrs):
+    """Reference voice VLAN lookup scanning switchports and MAC address table for every phone"""
+    voice_vlans = []
+    for neighbor in cdp_neighbors:
+        l_intf = neighbor['local_port']
+        intf = re.findall(r'.{2}', l_intf)[0] + re.findall(r'\d.+', l_intf)[0]
+        voice_vlan = 'None'
+        for switchport in switchports:
+            if switchport['interface'] == intf:
+                for mac_addr in mac_addrs:
+                    if mac_addr['vlan'] == switchport['voice_vlan']:
+                        voice_vlan = mac_addr['vlan']
+                        break
+                break
+        voice_vlans.append(voice_vlan)
+    return voice_vlans
+
+
+def indexed_voice_vlans(cdp_neighbors, switchports, mac_addrs):
+    """Voice VLAN lookup of 'CdpParser', switchports and MAC address table VLANs indexed once per device"""
+    switchport_index = {}
+    for switchport in switchports:
+        switchport_index.setdefault(switchport['interface'], switchport)
+    mac_vlans = {mac_addr['vlan'] for mac_addr in mac_addrs}
+    voice_vlans = []
+    for neighbor in cdp_neighbors:
+        l_intf = neighbor['local_port']
+        intf = re.findall(r'.{2}', l_intf)[0] + re.findall(r'\d.+', l_intf)[0]
+        voice_vlan = 'None'
+        switchport = switchport_index.get(intf)
+        if switchport is not None and switchport['voice_vlan'] in mac_vlans:
+            voice_vlan = switchport['voice_vlan']
+        voice_vlans.append(voice_vlan)
+    return voice_vlans
+
+
+def timed(function, *args, repeat=3):
+    """Returns best elapsed seconds of 'repeat' runs of function"""
+    best = None
+    for _ in range(0, repeat):
+        start = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def bench_phone_voice_vlan(phone_count=400, mac_count=20000, switch_count=9):
+    """Compares scanning voice VLAN lookup against indexed lookup of 'CdpParser', timing only the lookup on both sides
+
+    :return: {'scan', 'indexed', 'speedup'}"""
+    cdp_neighbors, switchports, mac_addrs = synthetic_phone_outputs(phone_count, mac_count, switch_count)
+    session = FakeSession()
+    expected = scan_voice_vlans(cdp_neighbors, switchports, mac_addrs)
+    parsed = CdpParser(cdp_neighbors, switchports, mac_addrs, session)
+    voice_vlans = {phone['neighbor']['remote_intf']: phone['voice_vlan'] for phone in parsed.phones}
+    if [voice_vlans[n['local_port']] for n in cdp_neighbors] != expected or \
+            indexed_voice_vlans(cdp_neighbors, switchports, mac_addrs) != expected:
+        raise AssertionError('Indexed voice VLAN lookup differs from scanning lookup')
+    scan = timed(scan_voice_vlans, cdp_neighbors, switchports, mac_addrs)
+    indexed = timed(indexed_voice_vlans, cdp_neighbors, switchports, mac_addrs)
+    return {
+        'scan': scan,
+        'indexed': indexed,
+        'speedup': scan / indexed
+    }
+
+
+def bench_cdp_parser_modes(neighbor_count=2000, processes=None):
+    """Compares 'CdpParser' sequential, thread, and process classification modes
+
+    :return: {'sequential', 'thread', 'process'}"""
+    cdp_neighbors, switchports, mac_addrs = synthetic_mixed_outputs(neighbor_count)
+    session = FakeSession()
+
+    def parsed(mode):
+        cdp_parser = CdpParser(cdp_neighbors, switchports, mac_addrs, session, mode, processes)
+        return [cdp_parser.phones, cdp_parser.routers_switches, cdp_parser.waps, cdp_parser.others]
+
+    sequential = parsed('sequential')
+    if parsed('process') != sequential:
+        raise AssertionError('Process mode output differs from sequential mode output')
+    for devices, expected in zip(parsed('thread'), sequential):
+        if sorted(devices, key=repr) != sorted(expected, key=repr):
+            raise AssertionError('Thread mode output differs from sequential mode output')
+    return {mode: timed(parsed, mode) for mode in ['sequential', 'thread', 'process']}
+
+
+def bench_async_discovery(core_count=2, dist_per_core=20, access_per_dist=124, latency=0.05, max_sessions=2000):
+    """Runs recursive 'InventoryDiscovery' with asyncio session backend against 'fake_campus_network'.\n
+    Defaults simulate 5002 switches with 50ms latency on connect and each command.
+
+    :return: {'devices', 'seconds', 'devices_per_second'}"""
+    network = fake_campus_network(core_count, dist_per_core, access_per_dist, latency=latency)
+    core_ips = [device.ip_address for device in network.devices.values() if device.nxos]
+    start = time.perf_counter()
+    inventory = InventoryDiscovery('bench', 'bench', core_ips, max_sessions=max_sessions, session_backend='asyncio',
+                                   connector=network.connect)
+    seconds = time.perf_counter() - start
+    if len(inventory.routers_switches) != len(network.devices) or len(inventory.failed_devices) != 0:
+        raise AssertionError('Discovery did not find every simulated device')
+    return {
+        'devices': len(inventory.routers_switches),
+        'seconds': seconds,
+        'devices_per_second': len(inventory.routers_switches) / seconds
+    }
+
+
+def synthetic_phone_dicts(count):
+    """Builds discovered phone dictionaries spread across 48 port access switches"""
+    phones = []
+    for n in range(0, count):
+        mac = f'{n:012x}'
+        phones.append({
+            'hostname': f'SEP{mac.upper()}',
+            'neighbor': {
+                'hostname': f'ACCESS-SW{int(n / 48)}',
+                'ip_address': f'10.{int(n / 48 / 65536) % 256}.{int(n / 48 / 256) % 256}.{int(n / 48) % 256}',
+                'remote_intf': f'GigabitEthernet1/0/{n % 48 + 1}'
+            },
+            'ip_address': f'10.200.{int(n / 256) % 256}.{n % 256}',
+            'mac_addr': f'{mac[0:4]}.{mac[4:8]}.{mac[8:12]}',
+            'voice_vlan': '100',
+            'software_version': 'sip88xx.12-8-1-0001-455',
+            'model': '8845'
+        })
+    return phones
+
+
+def bench_record_memory(counts=(100000, 500000)):
+    """Compares traced memory of phone dictionaries against 'records.Phone' holding the same phones.\n
+    Source phones are built as they arrive from discovery, each with its own strings.
+
+    :return: {count: {'dict', 'record'}} megabytes"""
+    results = {}
+    for count in counts:
+        tracemalloc.start()
+        phones = synthetic_phone_dicts(count)
+        dict_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        records = []
+        for phone in synthetic_phone_dicts(count):
+            records.append(Phone.from_dict(phone))
+        record_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        results[count] = {'dict': dict_size / 1048576, 'record': record_size / 1048576}
+        del phones, records
+    return results
+
+
+def bench_topology_queries(nodes=50000, links=500000):
+    """Times 'TopologyGraph' queries on random graph of nodes and links
+
+    :return: {'build', 'shortest_path', 'endpoints', 'connected_components'} seconds"""
+    rng = random.Random(1)
+    graph = TopologyGraph()
+    start = time.perf_counter()
+    for i in range(0, nodes):
+        graph.add_node(f'NODE-{i}', 'RouterSwitch' if i % 10 == 0 else 'Phone')
+    for i in range(0, links):
+        a = rng.randrange(0, nodes, 10)
+        b = rng.randrange(0, nodes)
+        if a != b:
+            graph.add_link(f'NODE-{a}', f'NODE-{b}', f'Gi1/0/{i}', 'Port 1')
+    results = {'build': time.perf_counter() - start}
+    results['shortest_path'] = timed(graph.shortest_path, 'NODE-1', f'NODE-{nodes - 1}')
+    results['endpoints'] = timed(graph.endpoints, 'NODE-0')
+    results['connected_components'] = timed(graph.connected_components)
+    return results
+
+
+def legacy_router_sw_version(software_version):
+    """Inline 'router_sw_parse' version extraction replaced by 'normalize.router_sw_version'"""
+    for software in software_version.split(','):
+        if software.__contains__('Version'):
+            software_version = software.split('Version')[1].split('REL')[0]
+            if software_version.__contains__(':'):
+                software_version = software_version.replace(': ', '')
+            else:
+                software_version = software_version.replace(' ', '')
+            break
+    return software_version
+
+
+def legacy_wap_version(software_version):
+    """Inline 'wap_parse' version extraction replaced by 'normalize.wap_version'"""
+    for software in software_version.split(','):
+        if software.__contains__('Version'):
+            software_version = software.split('Version')[1]
+            if software_version.__contains__(':'):
+                software_version = software_version.replace(': ', '')
+            else:
+                software_version = software_version.replace(' ', '')
+            break
+    return software_version
+
+
+def legacy_other_version(software_version):
+    """Inline 'other_parse' version extraction replaced by 'normalize.other_version'"""
+    if software_version.__contains__(','):
+        return legacy_router_sw_version(software_version)
+    for keyword in ['Version', 'version']:
+        if software_version.__contains__(keyword):
+            found_1 = False
+            for x in software_version.split(' '):
+                if x.__contains__(keyword):
+                    found_1 = True
+                    continue
+                if found_1:
+                    software_version = x
+                    break
+            break
+    return software_version
+
+
+def legacy_platform_model(platform):
+    """Inline platform stripping replaced by 'normalize.platform_model'"""
+    if platform.__contains__('cisco '):
+        return platform.replace('cisco ', '')
+    elif platform.__contains__('Cisco '):
+        return platform.replace('Cisco ', '')
+    return platform
+
+
+def bench_version_normalization(neighbor_count=100000):
+    """Checks equivalence with legacy inline parsing, then times per neighbor normalization of banners repeating across
+    neighbors. Expected values of the banner corpus are tested in 'tests/test_normalize.py'.
+
+    :return: {'mismatches', 'legacy', 'normalized'} seconds per neighbor"""
+    legacy = {
+        'router_sw_version': legacy_router_sw_version,
+        'wap_version': legacy_wap_version,
+        'other_version': legacy_other_version,
+        'platform_model': legacy_platform_model
+    }
+    corpus = [
+        ('router_sw_version', 'Cisco IOS Software, C2960X Software (C2960X-UNIVERSALK9-M), Version 15.2(7)E4, RELEASE '
+                              'SOFTWARE (fc2)'),
+        ('router_sw_version', 'Cisco IOS Software [Bengaluru], Catalyst L3 Switch Software (CAT9K_IOSXE), Version '
+                              '17.6.4, RELEASE SOFTWARE (fc1)'),
+        ('router_sw_version', 'Cisco Nexus Operating System (NX-OS) Software, Version 9.3(8)'),
+        ('wap_version', 'Cisco IOS Software, C3600 Software (AP3G2-K9W8-M), Version 15.3(3)JPJ7, RELEASE SOFTWARE '
+                        '(fc1)'),
+        ('wap_version', 'Cisco AP Software, ap3g3-k9w8 Version: 17.3.4.154'),
+        ('other_version', 'VMware ESXi version 7.0.3'),
+        ('other_version', 'Cisco Identity Services Engine Version 3.1.0.518'),
+        ('platform_model', 'cisco WS-C3850-48P'),
+        ('platform_model', 'Cisco AIR-AP2802I-B-K9'),
+        ('platform_model', 'Cisco cisco C8000V')
+    ]
+    """(normalizer, raw CDP banner) of IOS, IOS-XE, NX-OS, access point, and other banners"""
+    mismatches = []
+    for normalizer, raw in corpus:
+        if legacy[normalizer](raw) != normalize.normalizers[normalizer](raw):
+            mismatches.append((normalizer, raw, legacy[normalizer](raw), normalize.normalizers[normalizer](raw)))
+    neighbors = [corpus[i % len(corpus)] for i in range(0, neighbor_count)]
+
+    def run(normalizers):
+        for normalizer, raw in neighbors:
+            normalizers[normalizer](raw)
+
+    return {
+        'mismatches': mismatches,
+        'legacy': timed(run, legacy) / neighbor_count,
+        'normalized': timed(run, normalize.normalizers) / neighbor_count
+    }
+
+
+def bench_cold_start(repeat=5):
+    """Measures cold start of headless and GUI entry points importing 'cli' and 'gui' in fresh interpreters
+
+    :return: {'headless', 'gui'} best seconds, None if entry point fails to import"""
+    def cold_start(module):
+        best = None
+        for _ in range(0, repeat):
+            start = time.perf_counter()
+            process = subprocess.run([sys.executable, '-c', f'import {module}'], capture_output=True)
+            elapsed = time.perf_counter() - start
+            if process.returncode != 0:
+                return None
+            if best is None or elapsed < best:
+                best = elapsed
+        return best
+
+    return {
+        'headless': cold_start('cli'),
+        'gui': cold_start('gui')
+    }
+
+
+def bench_end_to_end(device_count, repeat=1):
+    """Times 'CdpParser' on every switch, 'RtSwSeperator' on every switch's result, recursive 'InventoryDiscovery'
+    replaying 'SyntheticNetwork' capture, and 'output_to_spreadsheet' default and streaming modes on synthetic network
+    of approximately 'device_count' devices
+
+    :return: {'devices', 'cdp_parser', 'rt_sw_seperator', 'discovery', 'spreadsheet', 'spreadsheet_streaming'}
+    seconds"""
+    network = SyntheticNetwork.scaled(device_count)
+    sessions_outputs = network.sessions_outputs()
+
+    def parse_all():
+        parsed = []
+        for session_output in sessions_outputs:
+            device = session_output['device']
+            outputs = session_output['outputs']
+            cdp_parser = CdpParser(outputs['show cdp neighbor detail'], outputs['show interface switchport'],
+                                   outputs['show mac address-table'], FakeSession(device['hostname'],
+                                                                                  device['ip_address']))
+            parsed.append({'device': dict(device), 'output': {
+                'waps': cdp_parser.waps,
+                'phones': cdp_parser.phones,
+                'routers_switches': cdp_parser.routers_switches,
+                'others': cdp_parser.others
+            }})
+        return parsed
+
+    results = {'devices': network.device_count(), 'cdp_parser': timed(parse_all, repeat=repeat)}
+    parsed = parse_all()
+    results['rt_sw_seperator'] = timed(lambda: RtSwSeperator(parsed, HostnameIndex()), repeat=repeat)
+    if len(RtSwSeperator(parsed, HostnameIndex()).connection_parsed) != network.counts['routers_switches']:
+        raise AssertionError('RtSwSeperator did not seperate every synthetic switch')
+    with tempfile.TemporaryDirectory() as folder:
+        capture_file = path.join(folder, 'synthetic.jsonl.gz')
+        network.write_capture(capture_file)
+        replay = CaptureReplay(capture_file)
+        start = time.perf_counter()
+        inventory = InventoryDiscovery('bench', 'bench', network.core_ips, session_backend=replay)
+        results['discovery'] = time.perf_counter() - start
+        found = {
+            'routers_switches': len(inventory.routers_switches),
+            'phones': len(inventory.phones),
+            'waps': len(inventory.waps),
+            'others': len(inventory.others)
+        }
+        if found != network.counts or len(inventory.failed_devices) != 0:
+            raise AssertionError('Discovery did not find every synthetic device')
+        inventory_lists = [inventory.routers_switches, inventory.phones, inventory.waps, inventory.others,
+                           inventory.failed_devices]
+        for name, streaming in [('spreadsheet', False), ('spreadsheet_streaming', True)]:
+            start = time.perf_counter()
+            output_to_spreadsheet(*inventory_lists, folder, streaming)
+            results[name] = time.perf_counter() - start
+            # Same second timestamped workbook names would collide
+            time.sleep(1)
+    return results
+
+
+def git_commit():
+    """Returns current git commit of repository, None outside a git checkout"""
+    try:
+        process = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                 cwd=path.dirname(path.abspath(__file__)))
+    except OSError:
+        return None
+    return process.stdout.strip() if process.returncode == 0 else None
+
+
+def load_results(file):
+    """Returns stored benchmark runs, oldest first"""
+    if not path.isfile(file):
+        return []
+    with open(file) as results_file:
+        return [json.loads(line) for line in results_file if line.strip() != '']
+
+
+def store_results(file, results):
+    """Appends benchmark run to JSON lines results file
+
+    :return: Stored run {'timestamp', 'commit', 'python', 'results'}"""
+    run = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'results': results
+    }
+    if path.dirname(file) != '':
+        makedirs(path.dirname(file), exist_ok=True)
+    with open(file, 'a') as results_file:
+        results_file.write(json.dumps(run) + '\n')
+    return run
+
+
+def micro_benchmarks():
+    result = bench_phone_voice_vlan()
+    print(f'Phone voice VLAN lookup (400 phones, 20000 MAC entries, 9 switches)\n'
+          f'    Scan:    {result["scan"]:.4f}s\n'
+          f'    Indexed: {result["indexed"]:.4f}s\n'
+          f'    Speedup: {result["speedup"]:.1f}x')
+    result = bench_cdp_parser_modes()
+    print(f'CdpParser classification modes (2000 neighbors)\n'
+          f'    Sequential: {result["sequential"]:.4f}s\n'
+          f'    Thread:     {result["thread"]:.4f}s\n'
+          f'    Process:    {result["process"]:.4f}s')
+    result = bench_async_discovery()
+    print(f'Asyncio discovery against fake CLI network ({result["devices"]} devices, 50ms latency)\n'
+          f'    Elapsed:    {result["seconds"]:.2f}s\n'
+          f'    Throughput: {result["devices_per_second"]:.0f} devices/s')
+    result = bench_record_memory()
+    print('Phone inventory memory')
+    for count, sizes in result.items():
+        print(f'    {count} Phones: Dictionaries {sizes["dict"]:.0f}MB, Records {sizes["record"]:.0f}MB')
+    result = bench_topology_queries()
+    print(f'Topology graph (50000 nodes, 500000 links)\n'
+          f'    Build:                {result["build"]:.2f}s\n'
+          f'    Shortest path:        {result["shortest_path"]:.4f}s\n'
+          f'    Endpoints:            {result["endpoints"]:.4f}s\n'
+          f'    Connected components: {result["connected_components"]:.4f}s')
+    result = bench_version_normalization()
+    print(f'Version and platform normalization (100000 neighbors)\n'
+          f'    Legacy Mismatches: {len(result["mismatches"])}\n'
+          f'    Legacy:            {result["legacy"] * 1e9:.0f}ns/neighbor\n'
+          f'    Normalized:        {result["normalized"] * 1e9:.0f}ns/neighbor')
+    for mismatch in result['mismatches']:
+        print(f'    Mismatch: {mismatch}')
+    result = bench_cold_start()
+    print('Cold start')
+    for entry_point in ['headless', 'gui']:
+        if result[entry_point] is None:
+            print(f'    {entry_point.capitalize()}: Import failed')
+        else:
+            print(f'    {entry_point.capitalize()}: {result[entry_point]:.3f}s')
+
+
+def end_to_end_benchmarks(scales, results_file):
+    """Runs 'bench_end_to_end' at each scale, printing change against last stored run before storing results"""
+    previous_runs = load_results(results_file)
+    previous = previous_runs[-1] if len(previous_runs) != 0 else None
+    results = {}
+    for scale in scales:
+        result = bench_end_to_end(scale)
+        results[str(scale)] = result
+        print(f'End-to-end synthetic network ({result["devices"]} devices)')
+        for phase in ['cdp_parser', 'rt_sw_seperator', 'discovery', 'spreadsheet', 'spreadsheet_streaming']:
+            line = f'    {phase + ":":<23}{result[phase]:.3f}s'
+            previous_seconds = previous['results'].get(str(scale), {}).get(phase) if previous is not None else None
+            if previous_seconds:
+                line += f' ({(result[phase] - previous_seconds) / previous_seconds:+.0%} from {previous["commit"]})'
+            print(line)
+    store_results(results_file, results)
+    print(f'Stored results to {results_file}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='benchmarks', description='NetInventory benchmarks')
+    parser.add_argument('--end-to-end', action='store_true', help='Only run end-to-end synthetic network suite')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Synthetic network device counts of end-to-end suite')
+    parser.add_argument('--results-file', default=path.join('bench_output', 'benchmark_results.jsonl'),
+                        help='JSON lines file end-to-end results are appended to and compared against')
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    if not args.end_to_end:
+        micro_benchmarks()
+    end_to_end_benchmarks(args.scales, args.results_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+from threading import Lock
+from os import path, replace
+import hashlib
+import json
+import time
+
+
+def cdp_fingerprint(session):
+    """Returns cheap fingerprint of device CDP state from 'show cdp neighbors' summary.\n
+    Any added, removed, or moved neighbor changes the fingerprint."""
+    cdp_summary = session.send_command('show cdp neighbors')
+    if isinstance(cdp_summary, str):
+        entries = [cdp_summary]
+    else:
+        entries = sorted(json.dumps(entry, sort_keys=True) for entry in cdp_summary)
+    digest = hashlib.sha1('\n'.join(entries).encode()).hexdigest()
+    return f'{len(entries)}:{digest}'
+
+
+class DiscoveryCache:
+    """
+    Persistent on-disk cache of 'discovery()' results keyed by management IP address and hostname.\n
+    Devices with unchanged CDP fingerprint reuse cached result instead of running discovery show commands.
+
+    :param file: JSON cache file location
+    :param ttl: Seconds cached result is reused before device is polled again
+    :param max_entries: Maximum cached devices, least recently stored devices are evicted first
+    """
+    def __init__(self, file, ttl=86400, max_entries=100000):
+        self.file = file
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        """Devices using cached result"""
+        self.misses = 0
+        """Devices polled"""
+        self.entries = {}
+        """
+        Dictionary:
+            {'ip_address|hostname': {
+                'fingerprint',\n
+                'stored', (epoch seconds)\n
+                'output' (discovery() result)
+            }}"""
+        self.lock = Lock()
+        if path.isfile(file):
+            try:
+                with open(file) as cache_file:
+                    self.entries = json.load(cache_file)
+            except (OSError, ValueError):
+                self.entries = {}
+        self.evict()
+
+    @staticmethod
+    def key(ip_address, hostname):
+        return f'{ip_address}|{hostname}'
+
+    def get(self, ip_address, hostname, fingerprint):
+        """Returns cached 'discovery()' result if fingerprint is unchanged and entry hasn't expired, otherwise None"""
+        with self.lock:
+            entry = self.entries.get(self.key(ip_address, hostname))
+            if entry is not None and entry['fingerprint'] == fingerprint and \
+                    time.time() - entry['stored'] < self.ttl:
+                self.hits += 1
+                return entry['output']
+            self.misses += 1
+            return None
+
+    def put(self, ip_address, hostname, fingerprint, output):
+        """Stores 'discovery()' result for device"""
+        with self.lock:
+            key = self.key(ip_address, hostname)
+            # Re-inserts key so dictionary order stays least to most recently stored
+            self.entries.pop(key, None)
+            self.entries[key] = {
+                'fingerprint': fingerprint,
+                'stored': time.time(),
+                'output': output
+            }
+
+    def evict(self):
+        """Removes expired entries and least recently stored entries over 'max_entries'"""
+        with self.lock:
+            now = time.time()
+            for key in [k for k, entry in self.entries.items() if now - entry['stored'] >= self.ttl]:
+                del self.entries[key]
+            overflow = len(self.entries) - self.max_entries
+            if overflow > 0:
+                for key in list(self.entries)[:overflow]:
+                    del self.entries[key]
+
+    def save(self):
+        """Evicts stale entries and writes cache to file"""
+        self.evict()
+        with self.lock:
+            temp_file = f'{self.file}.tmp'
+            with open(temp_file, 'w') as cache_file:
+                json.dump(self.entries, cache_file)
+            replace(temp_file, self.file)
+
+
+class ParseCache:
+    """
+    Persistent content-addressed LRU cache of parse results keyed by SHA-256 digest of command output, so
+    byte-identical outputs skip TextFSM parsing and 'CdpParser' classification run after run.\n
+    Results are stored serialized, callers always receive their own copy.\n
+    Kinds:
+        'textfsm', (raw command output, asyncio session backend only)\n
+        'cdp_parser' (CDP neighbor, switchport, and MAC address table VLAN outputs of device)
+
+    :param file: JSON cache file location, None keeps cache in memory only
+    :param max_entries: Maximum cached results, least recently used results are evicted first
+    """
+    def __init__(self, file=None, max_entries=50000):
+        self.file = file
+        self.max_entries = max_entries
+        self.entries = {}
+        """{'kind:digest': serialized result}, ordered least to most recently used"""
+        self.stats = {}
+        """{kind: {'hits', 'misses'}} of current run"""
+        self.lock = Lock()
+        if file is not None and path.isfile(file):
+            try:
+                with open(file) as cache_file:
+                    self.entries = json.load(cache_file)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    @staticmethod
+    def digest(*outputs):
+        """Returns SHA-256 digest of outputs, parsed outputs are serialized with sorted keys"""
+        sha256 = hashlib.sha256()
+        for output in outputs:
+            if not isinstance(output, str):
+                output = json.dumps(output, sort_keys=True)
+            sha256.update(output.encode())
+            sha256.update(b'\0')
+        return sha256.hexdigest()
+
+    def count(self, kind, result):
+        stats = self.stats.setdefault(kind, {'hits': 0, 'misses': 0})
+        stats['hits' if result else 'misses'] += 1
+
+    def get(self, kind, digest):
+        """Returns copy of cached result, None if not cached"""
+        key = f'{kind}:{digest}'
+        with self.lock:
+            serialized = self.entries.pop(key, None)
+            self.count(kind, serialized is not None)
+            if serialized is None:
+                return None
+            self.entries[key] = serialized
+        return json.loads(serialized)
+
+    def put(self, kind, digest, result):
+        serialized = json.dumps(result)
+        key = f'{kind}:{digest}'
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = serialized
+            while len(self.entries) > self.max_entries:
+                del self.entries[next(iter(self.entries))]
+
+    def hit_rates(self):
+        """
+        :return: {kind: hit rate} of current run"""
+        with self.lock:
+            return {kind: stats['hits'] / (stats['hits'] + stats['misses']) for kind, stats in self.stats.items()}
+
+    def save(self):
+        """Writes cache to file"""
+        if self.file is None:
+            return
+        with self.lock:
+            temp_file = f'{self.file}.tmp'
+            with open(temp_file, 'w') as cache_file:
+                json.dump(self.entries, cache_file)
+            replace(temp_file, self.file)
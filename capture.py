@@ -0,0 +1,148 @@
+from journal import ReplayedSessions
+from net_async import ForceSessionRetry
+from threading import Lock
+import gzip
+import json
+import zlib
+
+
+class CommandNotCaptured(KeyError):
+    pass
+
+
+class CaptureArchive:
+    """
+    gzip compressed JSON lines archive of every device's show command outputs, written while 'InventoryDiscovery'
+    runs for offline replay with 'CaptureReplay'.\n
+    Outputs are stored as 'discovery()' receives them from 'send_command', TextFSM parsed where a template matches.\n
+    Records:
+        {'record': 'device', 'ip_address', 'device', 'outputs': {command: output}}, (successful session)\n
+        {'record': 'failed', 'ip_address', 'device'} (failed session)
+
+    :param file: Archive file location, eg. 'capture.jsonl.gz'
+    """
+    def __init__(self, file):
+        self.file = file
+        self.lock = Lock()
+        self.pending = {}
+        """{ip_address: {command: output}} of devices finished by 'discovery()' but not yet written"""
+        self.devices = 0
+        """Devices written"""
+        self.archive_file = gzip.open(file, 'wt')
+
+    def add_outputs(self, ip_address, outputs):
+        """Holds command outputs of device until its session result is written"""
+        with self.lock:
+            self.pending[ip_address] = outputs
+
+    def write(self, record):
+        with self.lock:
+            self.archive_file.write(json.dumps(record, default=str) + '\n')
+
+    def write_device(self, device, outputs):
+        """Writes successful device with its command outputs"""
+        self.write({'record': 'device', 'ip_address': device['ip_address'], 'device': device, 'outputs': outputs})
+        self.devices += 1
+
+    def write_sessions(self, sessions):
+        """Writes successful devices with their held command outputs and failed devices of 'AsyncSessions' results.\n
+        Devices without held outputs, eg. replayed from journal, aren't written."""
+        for output in sessions.outputs:
+            ip_address = output['device']['ip_address']
+            with self.lock:
+                outputs = self.pending.pop(ip_address, None)
+            if outputs is not None:
+                self.write_device(output['device'], outputs)
+        for failed_device in sessions.failed_devices:
+            self.write({'record': 'failed', 'ip_address': failed_device['ip_address'], 'device': failed_device})
+
+    def close(self):
+        with self.lock:
+            self.archive_file.close()
+
+
+class ReplaySession:
+    """
+    Session-like object given to 'discovery()' returning captured command outputs.
+
+    :param device: Captured device dictionary
+    :param outputs: {command: output} of device
+    """
+    def __init__(self, device, outputs):
+        self.ip_address = device['ip_address']
+        self.hostname = device['hostname']
+        self.outputs = outputs
+
+    def send_command(self, command):
+        try:
+            return self.outputs[command]
+        except KeyError:
+            raise CommandNotCaptured(f'{command} not captured for {self.ip_address}')
+
+
+class CaptureReplay:
+    """
+    Replays 'CaptureArchive' as 'InventoryDiscovery' session_backend instead of connecting to devices.\n
+    'discovery()' and 'CdpParser' run on captured outputs, so recursive passes follow the captured CDP graph.
+    IP addresses not within archive are failed devices. Archives truncated by an interrupted capture replay up to their
+    last complete record.
+
+    :param file: Archive file location
+    """
+    def __init__(self, file):
+        self.file = file
+        self.records = {}
+        """{ip_address: serialized record}, deserialized on each replay so every run gets its own copy"""
+        with gzip.open(file, 'rt') as archive_file:
+            try:
+                for line in archive_file:
+                    try:
+                        ip_address = json.loads(line)['ip_address']
+                    except ValueError:
+                        # Ignores partially written final line of interrupted capture
+                        continue
+                    self.records[ip_address] = line
+            except (EOFError, zlib.error):
+                # Stops at last complete record of capture interrupted before gzip stream was finished
+                pass
+
+    def run(self, username, password, ip_addresses, enable_pw='', targeted_mac=False, metrics=None):
+        """Runs 'discovery' on captured outputs of IP addresses
+
+        :return: ReplayedSessions(params)"""
+        # Imported here since 'inventory' imports 'CaptureArchive'
+        from inventory import discovery
+
+        sessions = ReplayedSessions()
+
+        def failed_device(ip_address, exception, connectivity=True, authorization=True):
+            sessions.failed_devices.append({
+                'ip_address': ip_address,
+                'connection_type': 'Unknown',
+                'device_type': 'Unknown',
+                'connectivity': connectivity,
+                'authentication': connectivity,
+                'authorization': authorization,
+                'exception': exception
+            })
+
+        for ip_address in ip_addresses:
+            if ip_address not in self.records:
+                failed_device(ip_address, 'Not within capture archive', False, False)
+                continue
+            record = json.loads(self.records[ip_address])
+            if record['record'] == 'failed':
+                sessions.failed_devices.append(record['device'])
+                continue
+            try:
+                output = discovery(ReplaySession(record['device'], record['outputs']), metrics=metrics,
+                                   targeted_mac=targeted_mac)
+            except ForceSessionRetry:
+                failed_device(ip_address, 'Authorization failed', authorization=False)
+                continue
+            except CommandNotCaptured as e:
+                failed_device(ip_address, e.args[0])
+                continue
+            sessions.outputs.append({'device': record['device'], 'output': output})
+            sessions.successful_devices.append(record['device'])
+        return sessions
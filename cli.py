@@ -0,0 +1,157 @@
+from capture import CaptureReplay
+from cucm_index import CucmPhoneIndex
+from exceptions import NoPhoneReportFound
+from cucm_join import CucmJoin
+from inventory import InventoryDiscovery
+from exporters import output_to_csv, output_to_parquet
+from parsers import output_to_spreadsheet
+from net_async import MgmtIPAddresses
+from os import path, environ
+import argparse
+import json
+import sys
+
+# Headless entry point, doesn't import PySimpleGUI. Credentials are read from a JSON credentials file
+# {"username", "password", "enable_pw"} or environment variables below.
+username_env = 'NETINVENTORY_USERNAME'
+password_env = 'NETINVENTORY_PASSWORD'
+enable_pw_env = 'NETINVENTORY_ENABLE_PW'
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='NetInventory', description='Headless Cisco network inventory discovery')
+    parser.add_argument('--ip-file', required=True, help='Text file of device management IP addresses')
+    parser.add_argument('--output-dir', required=True, help='Folder to save inventory workbook')
+    parser.add_argument('--credentials-file', help='JSON file with username, password, and enable_pw, otherwise '
+                                                   f'{username_env}, {password_env}, and {enable_pw_env}')
+    parser.add_argument('--cucm-csv', help='CUCM phone report CSV export')
+    parser.add_argument('--cucm-index', help='SQLite index file of CUCM export reused while newer than CSV export')
+    parser.add_argument('--no-recursive', action='store_true', help='Only discover provided management IPs')
+    parser.add_argument('--pipelined', action='store_true', help='Work queue discovery instead of discovery passes')
+    parser.add_argument('--asyncio', action='store_true', help='asyncio session backend')
+    parser.add_argument('--max-sessions', type=int, default=100, help='Maximum concurrent device sessions')
+    parser.add_argument('--precheck', action='store_true',
+                        help='TCP/22 and TCP/23 reachability precheck, unreachable IPs fail without a session')
+    parser.add_argument('--precheck-timeout', type=float, default=1.0,
+                        help='Precheck connect timeout in seconds before subnet RTTs are learned')
+    parser.add_argument('--max-retries', type=int, default=3,
+                        help='Retries of devices missing from session results')
+    parser.add_argument('--targeted-mac', action='store_true', help='Only query MAC address table for voice VLANs')
+    parser.add_argument('--cache-file', help='Discovery cache file reusing results of unchanged devices')
+    parser.add_argument('--parse-cache-file', help='Parse cache file reusing parse results of identical outputs')
+    parser.add_argument('--journal-file', help='Discovery journal file checkpointing every device')
+    parser.add_argument('--resume', action='store_true', help='Resume discovery from journal file')
+    parser.add_argument('--no-retry-failed', action='store_true',
+                        help='Replay devices journaled as failed when resuming instead of connecting to them again')
+    parser.add_argument('--capture-file', help='Compressed archive of every device\'s show command outputs')
+    parser.add_argument('--replay-file', help='Replay discovery from capture archive instead of connecting to devices')
+    parser.add_argument('--streaming', action='store_true', help='Write-only streaming spreadsheet export')
+    parser.add_argument('--parallel-spreadsheet', action='store_true',
+                        help='Build each spreadsheet worksheet within its own worker process')
+    parser.add_argument('--csv', action='store_true', help='Also export inventory tables to CSV files')
+    parser.add_argument('--parquet', action='store_true', help='Also export inventory tables to Parquet files')
+    parser.add_argument('--arrow', action='store_true', help='Also export inventory tables to Arrow IPC files')
+    parser.add_argument('--topology-json', help='Write CDP topology graph to node-link JSON file')
+    parser.add_argument('--topology-graphml', help='Write CDP topology graph to GraphML file')
+    parser.add_argument('--metrics-json', help='Write discovery timing metrics to JSON file')
+    parser.add_argument('--metrics-csv', help='Write discovery timing metrics to CSV file')
+    parser.add_argument('--metrics-prometheus', help='Write discovery timing metrics to Prometheus text file')
+    parser.add_argument('--quiet', action='store_true', help='Does not print discovery progress')
+    return parser.parse_args(argv)
+
+
+def credentials(credentials_file=None):
+    """Reads credentials from JSON file or environment variables
+
+    :return: username, password, enable_pw"""
+    if credentials_file is not None:
+        with open(credentials_file) as file:
+            creds = json.load(file)
+        return creds['username'], creds['password'], creds.get('enable_pw', '')
+    try:
+        return environ[username_env], environ[password_env], environ.get(enable_pw_env, '')
+    except KeyError:
+        raise SystemExit(f'Credentials not found, provide --credentials-file or set {username_env} and {password_env}')
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.resume and args.journal_file is None:
+        raise SystemExit('--resume requires --journal-file')
+    if args.replay_file is not None:
+        # Replay doesn't connect to devices
+        username, password, enable_pw = '', '', ''
+    else:
+        username, password, enable_pw = credentials(args.credentials_file)
+    if not path.isdir(args.output_dir):
+        raise SystemExit(f'Output directory not found: {args.output_dir}')
+    try:
+        mgmt_file = MgmtIPAddresses(args.ip_file)
+    except FileNotFoundError:
+        raise SystemExit(f'Management IP address file not found: {args.ip_file}')
+    if not mgmt_file.valid:
+        invalid_lines = '\n'.join(f'    Line {line_n}: {ip_addr}' for line_n, ip_addr in zip(
+            mgmt_file.invalid_line_nums, mgmt_file.invalid_ip_addresses))
+        raise SystemExit(f'Invalid management IP address file entries:\n{invalid_lines}')
+    if args.replay_file is not None:
+        if not path.isfile(args.replay_file):
+            raise SystemExit(f'Capture archive not found: {args.replay_file}')
+        session_backend = CaptureReplay(args.replay_file)
+    elif args.asyncio:
+        session_backend = 'asyncio'
+    else:
+        session_backend = 'threads'
+    parsed_cucm_phones = None
+    if args.cucm_csv is not None:
+        try:
+            parsed_cucm_phones = CucmPhoneIndex(args.cucm_csv, args.cucm_index)
+        except NoPhoneReportFound:
+            raise SystemExit(f'CUCM export file not found: {args.cucm_csv}')
+
+    try:
+        inventory = InventoryDiscovery(
+            username, password, mgmt_file.mgmt_ips, enable_pw, not args.quiet, not args.no_recursive,
+            cache_file=args.cache_file, pipelined=args.pipelined, max_sessions=args.max_sessions,
+            session_backend=session_backend, targeted_mac=args.targeted_mac,
+            journal_file=args.journal_file, resume=args.resume, precheck=args.precheck,
+            precheck_timeout=args.precheck_timeout, max_retries=args.max_retries,
+            topology=args.topology_json is not None or args.topology_graphml is not None,
+            parse_cache_file=args.parse_cache_file, capture_file=args.capture_file,
+            retry_failed=not args.no_retry_failed)
+        if parsed_cucm_phones is not None:
+            cucm_join = CucmJoin(inventory.phones, parsed_cucm_phones.records())
+            cucm_join.apply()
+        else:
+            cucm_join = None
+    finally:
+        # Removes temporary CUCM index even if discovery fails
+        if parsed_cucm_phones is not None:
+            parsed_cucm_phones.close()
+    output_to_spreadsheet(
+        inventory.routers_switches, inventory.phones, inventory.waps, inventory.others, inventory.failed_devices,
+        args.output_dir, args.streaming, inventory.metrics, args.parallel_spreadsheet, cucm_join=cucm_join)
+    inventory_lists = [inventory.routers_switches, inventory.phones, inventory.waps, inventory.others,
+                       inventory.failed_devices]
+    if args.csv:
+        output_to_csv(*inventory_lists, args.output_dir, inventory.metrics, cucm_join)
+    if args.parquet:
+        output_to_parquet(*inventory_lists, args.output_dir, metrics=inventory.metrics, cucm_join=cucm_join)
+    if args.arrow:
+        output_to_parquet(*inventory_lists, args.output_dir, arrow=True, metrics=inventory.metrics,
+                          cucm_join=cucm_join)
+
+    if args.topology_json is not None:
+        inventory.topology.to_json(args.topology_json)
+    if args.topology_graphml is not None:
+        inventory.topology.to_graphml(args.topology_graphml)
+    if args.metrics_json is not None:
+        inventory.metrics.to_json(args.metrics_json)
+    if args.metrics_csv is not None:
+        inventory.metrics.to_csv(args.metrics_csv)
+    if args.metrics_prometheus is not None:
+        with open(args.metrics_prometheus, 'w') as file:
+            file.write(inventory.metrics.to_prometheus())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+from async_discovery import AsyncDiscoverySessions
+from inventory import discovery
+from metrics import DiscoveryMetrics
+from net_async import AsyncSessions
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from threading import Lock
+
+
+def run_shard(username, password, ip_addresses, enable_pw='', targeted_mac=False, backend='threads',
+              max_sessions=100, device_timeout=120, connector=None):
+    """Runs 'discovery' on shard of IP addresses within worker
+
+    :return: {'outputs', 'failed_devices', 'samples'}"""
+    metrics = DiscoveryMetrics()
+    if backend == 'asyncio':
+        sessions = AsyncDiscoverySessions(
+            username, password, ip_addresses, partial(discovery, metrics=metrics, targeted_mac=targeted_mac),
+            max_sessions=max_sessions, timeout=device_timeout, connector=connector, metrics=metrics,
+            targeted_mac=targeted_mac)
+    else:
+        sessions = AsyncSessions(username, password, ip_addresses,
+                                 partial(discovery, metrics=metrics, targeted_mac=targeted_mac), enable_pw, True)
+    return {
+        'outputs': sessions.outputs,
+        'failed_devices': sessions.failed_devices,
+        'samples': metrics.samples
+    }
+
+
+class LocalProcessTransport:
+    """
+    Runs shards within local worker processes, each worker being its own single process executor so shards can be
+    handed to the least loaded worker.
+
+    :param workers: Worker process count
+    """
+    def __init__(self, workers=4):
+        self.executors = [ProcessPoolExecutor(1) for _ in range(0, workers)]
+        self.loads = [0] * workers
+        """Outstanding IP addresses per worker"""
+        self.lock = Lock()
+
+    def submit(self, ip_addresses, **shard):
+        """Submits shard to least loaded worker
+
+        :return: Future of 'run_shard()' result"""
+        with self.lock:
+            worker = self.loads.index(min(self.loads))
+            self.loads[worker] += len(ip_addresses)
+
+        def done(_):
+            with self.lock:
+                self.loads[worker] -= len(ip_addresses)
+
+        future = self.executors[worker].submit(run_shard, ip_addresses=ip_addresses, **shard)
+        future.add_done_callback(done)
+        return future
+
+    def close(self):
+        for executor in self.executors:
+            executor.shutdown()
+
+
+class MergedSessions:
+    """
+    'AsyncSessions' shaped results merged from shards in original IP address order.
+
+        Attributes:
+            outputs = [{'device', 'output'}]\n
+            successful_devices = []\n
+            failed_devices = []
+    """
+    def __init__(self, ip_addresses, shard_results):
+        order = {ip_address: i for i, ip_address in enumerate(ip_addresses)}
+        outputs = []
+        failed_devices = []
+        for result in shard_results:
+            outputs += result['outputs']
+            failed_devices += result['failed_devices']
+        self.outputs = sorted(outputs, key=lambda o: order.get(o['device']['ip_address'], len(order)))
+        self.successful_devices = [output['device'] for output in self.outputs]
+        self.failed_devices = sorted(failed_devices, key=lambda d: order.get(d['ip_address'], len(order)))
+
+
+class ShardCoordinator:
+    """
+    Splits discovery sessions across worker shards and merges results so 'InventoryDiscovery' runs
+    'RtSwSeperator' deduplication across all shards. Used as 'InventoryDiscovery' session_backend.\n
+    Newly discovered neighbors of each pass, or each device with pipelined discovery, are handed to the least loaded
+    worker. 'InventoryDiscovery' raises ValueError when combined with 'DiscoveryCache', 'ParseCache', or
+    'CaptureArchive', workers don't share them.\n
+    Closed by 'InventoryDiscovery' once discovery finishes, or by 'close()' or using coordinator as context manager.
+
+    :param workers: Worker count for default 'LocalProcessTransport'
+    :param transport: Object with 'submit(ip_addresses, **shard)' returning future of 'run_shard()' result and 'close()'
+    :param worker_backend: 'threads' or 'asyncio' session backend within workers
+    :param max_sessions: Maximum concurrent sessions per worker with 'asyncio' worker backend
+    :param device_timeout: Seconds per device with 'asyncio' worker backend
+    :param connector: 'AsyncDiscoverySessions' connector, must be picklable for process transport
+    """
+    def __init__(self, workers=4, transport=None, worker_backend='threads', max_sessions=100, device_timeout=120,
+                 connector=None):
+        if transport is None:
+            transport = LocalProcessTransport(workers)
+        self.transport = transport
+        self.workers = workers
+        self.worker_backend = worker_backend
+        self.max_sessions = max_sessions
+        self.device_timeout = device_timeout
+        self.connector = connector
+
+    def run(self, username, password, ip_addresses, enable_pw='', targeted_mac=False, metrics=None):
+        """Runs shards of IP addresses and merges results
+
+        :return: MergedSessions(params)"""
+        shard_size = max(-(-len(ip_addresses) // self.workers), 1)
+        futures = [
+            self.transport.submit(
+                ip_addresses[i:i + shard_size], username=username, password=password, enable_pw=enable_pw,
+                targeted_mac=targeted_mac, backend=self.worker_backend, max_sessions=self.max_sessions,
+                device_timeout=self.device_timeout, connector=self.connector)
+            for i in range(0, len(ip_addresses), shard_size)]
+        shard_results = [future.result() for future in futures]
+        if metrics is not None:
+            for result in shard_results:
+                for device, phase, seconds in result['samples']:
+                    metrics.record(phase, seconds, device)
+        return MergedSessions(ip_addresses, shard_results)
+
+    def close(self):
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
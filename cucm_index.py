@@ -0,0 +1,124 @@
+from parsers import cucm_export_records
+from itertools import islice
+from os import close, path, remove
+import tempfile
+import sqlite3
+
+lookup_batch_size = 900
+"""Device names per SQLite lookup query, below SQLite's default host parameter limit"""
+record_columns = ['device_name', 'description', 'directory_number', 'line_numbers', 'device_pool', 'model']
+"""SQLite columns, 'line_numbers' stored newline seperated"""
+
+
+class CucmPhoneIndex:
+    """
+    Memory-bounded CUCM phone report loaded in chunks into an on-disk SQLite index keyed by device name.
+    Only phones looked up are loaded into memory, eg. by 'merge_phone_discovery_cucm_export'.\n
+    Supports 'in', [device_name], and 'get' like 'cucm_export_parse()' output, values being 'cucm_export_records()'
+    records. Closed by 'close()' or by using index as context manager.
+
+    :param file: CUCM phone report CSV export
+    :param index_file: SQLite index file kept between runs and reused while newer than CSV export, temporary file
+    removed by 'close()' if None
+    :param chunk_size: CSV rows inserted per transaction
+    """
+    def __init__(self, file, index_file=None, chunk_size=10000):
+        self.temporary = index_file is None
+        if self.temporary:
+            descriptor, index_file = tempfile.mkstemp(suffix='.sqlite')
+            close(descriptor)
+        self.index_file = index_file
+        reuse = not self.temporary and path.isfile(index_file) and path.isfile(file) and \
+            path.getmtime(index_file) >= path.getmtime(file)
+        # Discovery threads and GUI may use the index from different threads, queries are serialized by sqlite
+        self.connection = sqlite3.connect(index_file, check_same_thread=False)
+        if reuse:
+            columns = [row[1] for row in self.connection.execute('PRAGMA table_info(phones)')]
+            reuse = columns == record_columns
+        if not reuse:
+            try:
+                self.load(file, chunk_size)
+            except BaseException:
+                self.close()
+                raise
+
+    def load(self, file, chunk_size):
+        """Loads CSV export into staging table swapped in for 'phones' table only after the whole export loads, so a
+        missing or unreadable export keeps the existing index"""
+        rows = (tuple('\n'.join(record[column]) if column == 'line_numbers' else record[column]
+                      for column in record_columns) for record in cucm_export_records(file))
+        with self.connection:
+            self.connection.execute('DROP TABLE IF EXISTS phones_staging')
+            self.connection.execute('CREATE TABLE phones_staging (device_name TEXT PRIMARY KEY, description TEXT, '
+                                    'directory_number TEXT, line_numbers TEXT, device_pool TEXT, model TEXT)')
+        try:
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if len(chunk) == 0:
+                    break
+                with self.connection:
+                    # Later rows replace earlier rows of same device name, same as 'cucm_export_parse()'
+                    self.connection.executemany('INSERT OR REPLACE INTO phones_staging VALUES (?, ?, ?, ?, ?, ?)',
+                                                chunk)
+        except BaseException:
+            with self.connection:
+                self.connection.execute('DROP TABLE phones_staging')
+            raise
+        with self.connection:
+            self.connection.execute('DROP TABLE IF EXISTS phones')
+            self.connection.execute('ALTER TABLE phones_staging RENAME TO phones')
+
+    @staticmethod
+    def record(row):
+        """Returns 'cucm_export_records()' record of SQLite row"""
+        record = dict(zip(record_columns, row))
+        record['line_numbers'] = record['line_numbers'].split('\n') if record['line_numbers'] != '' else []
+        return record
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM phones').fetchone()[0]
+
+    def __contains__(self, device_name):
+        return self.get(device_name) is not None
+
+    def __getitem__(self, device_name):
+        phone = self.get(device_name)
+        if phone is None:
+            raise KeyError(device_name)
+        return phone
+
+    def get(self, device_name, default=None):
+        row = self.connection.execute('SELECT * FROM phones WHERE device_name = ?', (device_name.upper(),)).fetchone()
+        if row is None:
+            return default
+        return self.record(row)
+
+    def records(self):
+        """Streams all records of index"""
+        for row in self.connection.execute('SELECT * FROM phones'):
+            yield self.record(row)
+
+    def lookup(self, device_names):
+        """Looks up device names in batches
+
+        :return: {'SEP000000000000': record} of found device names"""
+        device_names = iter({device_name.upper() for device_name in device_names})
+        phones = {}
+        while True:
+            batch = list(islice(device_names, lookup_batch_size))
+            if len(batch) == 0:
+                return phones
+            query = f'SELECT * FROM phones WHERE device_name IN ({", ".join("?" * len(batch))})'
+            for row in self.connection.execute(query, batch):
+                phones[row[0]] = self.record(row)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+        if self.temporary and path.isfile(self.index_file):
+            remove(self.index_file)
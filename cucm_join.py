@@ -0,0 +1,59 @@
+class CucmJoin:
+    """
+    Single pass hash join of discovered phones with CUCM phone records on device name. Discovered phones are hashed by
+    hostname, then CUCM records are streamed once probing the hash, O(discovered + CUCM) time with only unmatched
+    CUCM records held in memory.
+
+    :param discovered_phones: 'InventoryDiscovery().phones'
+    :param cucm_records: Iterable of 'cucm_export_records()' records, eg. 'CucmPhoneIndex().records()'
+
+        Attributes:
+            matched = [(phone, record)], (inner join)\n
+            discovered_only = [phone], (discovered phones not in CUCM, left anti-join)\n
+            cucm_only = [record] (CUCM phones never seen by CDP, right anti-join)
+    """
+    def __init__(self, discovered_phones, cucm_records):
+        self.matched = []
+        self.discovered_only = []
+        self.cucm_only = []
+
+        discovered_index = {}
+        """{hostname: [phones]}, phone may be seen from more than one switch"""
+        for phone in discovered_phones:
+            discovered_index.setdefault(phone['hostname'].upper(), []).append(phone)
+        matched_names = set()
+        for record in cucm_records:
+            phones = discovered_index.get(record['device_name'])
+            if phones is None:
+                self.cucm_only.append(record)
+            else:
+                matched_names.add(record['device_name'])
+                for phone in phones:
+                    self.matched.append((phone, record))
+        for device_name, phones in discovered_index.items():
+            if device_name not in matched_names:
+                self.discovered_only += phones
+
+    def left_join(self):
+        """Yields (phone, record or None) of each discovered phone"""
+        for phone, record in self.matched:
+            yield phone, record
+        for phone in self.discovered_only:
+            yield phone, None
+
+    def right_join(self):
+        """Yields (record, phone or None) of each CUCM record"""
+        for phone, record in self.matched:
+            yield record, phone
+        for record in self.cucm_only:
+            yield record, None
+
+    def apply(self):
+        """Adds CUCM fields to matched discovered phones: 'description', 'directory_number', 'line_numbers',
+        'device_pool', and 'cucm_model'"""
+        for phone, record in self.matched:
+            phone['description'] = record['description']
+            phone['directory_number'] = record['directory_number']
+            phone['line_numbers'] = record['line_numbers']
+            phone['device_pool'] = record['device_pool']
+            phone['cucm_model'] = record['model']
@@ -0,0 +1,240 @@
+from parsers import add_table, table_columns, update_column_widths
+from xlsx_writer import column_letters
+from datetime import datetime
+from os import path
+import argparse
+import json
+import csv
+import sys
+
+# Inventory categories compared between runs: (worksheet title, key columns, location columns of moved devices)
+diff_categories = [
+    ('Routers_Switches', ('Hostname',), ()),
+    ('Phones', ('MAC Address',), ('Switch Hostname', 'Switchport')),
+    ('APs', ('Hostname', 'Switchport'), ('Switch Hostname', 'Switchport')),
+    ('Others', ('Hostname',), ('Neighbor  Hostname', 'Local Interface to Neighbor'))
+]
+ignored_columns = {'Discovery Status'}
+"""Columns relative to each run, not compared"""
+diff_header = ['Category', 'Change', 'Key', 'Field', 'Previous Value', 'Current Value']
+
+
+def normalize_row(header, row):
+    """Returns {column: value} with values as strings, empty cells as ''"""
+    return {column: '' if value is None else str(value) for column, value in zip(header, row)}
+
+
+def load_spreadsheet(file):
+    """Loads 'output_to_spreadsheet' workbook
+
+    :return: {worksheet title: [{column: value}]}"""
+    from openpyxl import load_workbook
+    wb = load_workbook(file, read_only=True)
+    inventory = {}
+    for title, _, _ in diff_categories:
+        if title not in wb.sheetnames:
+            inventory[title] = []
+            continue
+        rows = wb[title].iter_rows(values_only=True)
+        header = next(rows, ())
+        inventory[title] = [normalize_row(header, row) for row in rows if any(value is not None for value in row)]
+    wb.close()
+    return inventory
+
+
+def load_csv(prefix):
+    """Loads 'output_to_csv' files sharing prefix, eg. 'out/network_inventory-10_18_2026-01_00_00-'
+
+    :return: {worksheet title: [{column: value}]}"""
+    inventory = {}
+    for title, _, _ in diff_categories:
+        file = f'{prefix}{title}.csv'
+        if not path.isfile(file):
+            inventory[title] = []
+            continue
+        with open(file, newline='') as csv_file:
+            reader = csv.reader(csv_file)
+            header = next(reader, [])
+            inventory[title] = [normalize_row(header, row) for row in reader]
+    return inventory
+
+
+def load_inventory(location):
+    """Loads xlsx workbook, or CSV export files if location isn't an xlsx file"""
+    if location.endswith('.xlsx'):
+        return load_spreadsheet(location)
+    return load_csv(location)
+
+
+class InventoryDiff:
+    """
+    Linear time diff of two loaded inventories. Records are indexed by stable keys: phone MAC address, WAP hostname
+    and switchport, router/switch and other hostname.\n
+    Moved phones and others keep their key while their switch or switchport changes. Moved WAPs keep their key while
+    their switch changes, or are removed and added keys sharing a hostname when their switchport changes.\n
+    Records sharing a key, eg. others seen from several switches, are compared as sets of locations.
+
+    :param previous: 'load_inventory()' of previous run
+    :param current: 'load_inventory()' of current run
+
+        Attributes:
+            changes = [{'category', 'change', 'key', 'field', 'previous', 'current'}]\n
+            counts = {category: {'added', 'removed', 'moved', 'changed'}}
+    """
+    def __init__(self, previous, current):
+        self.changes = []
+        self.counts = {}
+
+        def record_key(record, key_columns):
+            return ' '.join(record.get(column, '') for column in key_columns)
+
+        def location(record, location_columns):
+            return ' '.join(record.get(column, '') for column in location_columns)
+
+        def change(category, change_type, key, field='', previous_value='', current_value=''):
+            self.changes.append({'category': category, 'change': change_type, 'key': key, 'field': field,
+                                 'previous': previous_value, 'current': current_value})
+            self.counts[category][change_type] += 1
+
+        def compare(category, key, previous_record, current_record, location_columns):
+            """Appends moved and changed fields of records sharing key"""
+            if location_columns and location(previous_record, location_columns) != \
+                    location(current_record, location_columns):
+                change(category, 'moved', key, 'Location', location(previous_record, location_columns),
+                       location(current_record, location_columns))
+            for column, current_value in current_record.items():
+                if column in ignored_columns or column in location_columns or column.startswith('Neighbor '):
+                    continue
+                previous_value = previous_record.get(column, '')
+                if previous_value != current_value:
+                    change(category, 'changed', key, column, previous_value, current_value)
+
+        def compare_group(category, key, previous_records, current_records, location_columns):
+            """Pairs records sharing key at the same location, then pairs remaining records as moved. Records left
+            unpaired are added or removed."""
+            previous_locations = {}
+            """{location: [previous record]} not yet paired"""
+            for previous_record in previous_records:
+                previous_locations.setdefault(location(previous_record, location_columns), []).append(previous_record)
+            unpaired_current = []
+            for current_record in current_records:
+                same_location = previous_locations.get(location(current_record, location_columns))
+                if same_location:
+                    previous_record = same_location.pop(0)
+                    # Unchanged records are skipped with a single dictionary comparison
+                    if previous_record != current_record:
+                        compare(category, key, previous_record, current_record, location_columns)
+                else:
+                    unpaired_current.append(current_record)
+            unpaired_previous = [record for records in previous_locations.values() for record in records]
+            for previous_record, current_record in zip(unpaired_previous, unpaired_current):
+                compare(category, key, previous_record, current_record, location_columns)
+            for current_record in unpaired_current[len(unpaired_previous):]:
+                change(category, 'added', key, current_value=current_record.get('Hostname', ''))
+            for previous_record in unpaired_previous[len(unpaired_current):]:
+                change(category, 'removed', key, previous_value=previous_record.get('Hostname', ''))
+
+        def group(records, key_columns):
+            """Returns {key: [record]}, others and phones seen from several switches share a key"""
+            index = {}
+            for record in records:
+                index.setdefault(record_key(record, key_columns), []).append(record)
+            return index
+
+        for category, key_columns, location_columns in diff_categories:
+            self.counts[category] = {'added': 0, 'removed': 0, 'moved': 0, 'changed': 0}
+            previous_index = group(previous.get(category, []), key_columns)
+            current_index = group(current.get(category, []), key_columns)
+            # Records sharing key are only moved by location columns outside key, eg. WAP switch hostname
+            keyed_location_columns = tuple(column for column in location_columns if column not in key_columns)
+            added = {key: current_index[key] for key in current_index if key not in previous_index}
+            removed = {key: previous_index[key] for key in previous_index if key not in current_index}
+
+            # WAPs keyed by hostname and switchport are moved when only the switchport key changed
+            if 'Switchport' in key_columns:
+                removed_hostnames = {}
+                """{hostname: [(key, record)]} of removed WAPs"""
+                for key, records in removed.items():
+                    for record in records:
+                        removed_hostnames.setdefault(record['Hostname'], []).append((key, record))
+                moved_records = set()
+                """ids of moved records"""
+                for records in added.values():
+                    for record in records:
+                        removed_records = removed_hostnames.get(record['Hostname'])
+                        if removed_records:
+                            previous_record = removed_records.pop(0)[1]
+                            moved_records.update((id(record), id(previous_record)))
+                            compare(category, record['Hostname'], previous_record, record, location_columns)
+                added = {key: [record for record in records if id(record) not in moved_records]
+                         for key, records in added.items()}
+                removed = {key: [record for record in records if id(record) not in moved_records]
+                           for key, records in removed.items()}
+
+            for key, records in added.items():
+                for record in records:
+                    change(category, 'added', key, current_value=record.get('Hostname', ''))
+            for key, records in removed.items():
+                for record in records:
+                    change(category, 'removed', key, previous_value=record.get('Hostname', ''))
+            for key, current_records in current_index.items():
+                previous_records = previous_index.get(key)
+                if previous_records is not None and previous_records != current_records:
+                    compare_group(category, key, previous_records, current_records, keyed_location_columns)
+
+    def to_json(self, file):
+        """Writes {'counts', 'changes'} JSON file"""
+        with open(file, 'w') as json_file:
+            json.dump({'counts': self.counts, 'changes': self.changes}, json_file)
+
+    def to_spreadsheet(self, file_location):
+        """Writes 'Inventory_Changes' report workbook streamed through write-only worksheet
+
+        :return: File location of workbook"""
+        from openpyxl import Workbook
+        from openpyxl.worksheet.table import Table, TableStyleInfo
+        date_time = datetime.now().strftime('%m_%d_%Y-%H_%M_%S')
+        file = f'{file_location}/inventory_changes-{date_time}-.xlsx'
+        rows = [[c['category'], c['change'], c['key'], c['field'], c['previous'], c['current']]
+                for c in self.changes]
+        column_widths = []
+        update_column_widths(column_widths, diff_header)
+        for row in rows:
+            update_column_widths(column_widths, row)
+        wb = Workbook(write_only=True)
+        worksheet = wb.create_sheet('Inventory_Changes')
+        for i, column_width in enumerate(column_widths):
+            worksheet.column_dimensions[column_letters(i)].width = column_width + 3
+        worksheet.append(diff_header)
+        for row in rows:
+            worksheet.append(row)
+        if len(rows) != 0:
+            table = Table(displayName='InventoryChanges',
+                          ref=f'A1:{column_letters(len(diff_header) - 1)}{len(rows) + 1}',
+                          tableColumns=table_columns(diff_header))
+            table.tableStyleInfo = TableStyleInfo(name='TableStyleMedium9', showFirstColumn=False,
+                                                  showLastColumn=False, showRowStripes=True, showColumnStripes=True)
+            add_table(worksheet, table)
+        wb.save(file)
+        return file
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='NetInventory Diff', description='Changes between two inventory runs')
+    parser.add_argument('previous', help='Previous inventory workbook (.xlsx) or CSV export prefix')
+    parser.add_argument('current', help='Current inventory workbook (.xlsx) or CSV export prefix')
+    parser.add_argument('--output-dir', help='Folder to save changes report workbook')
+    parser.add_argument('--json', help='Write changes to JSON file')
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    inventory_diff = InventoryDiff(load_inventory(args.previous), load_inventory(args.current))
+    for category, counts in inventory_diff.counts.items():
+        print(f'{category}: {counts["added"]} Added, {counts["removed"]} Removed, {counts["moved"]} Moved, '
+              f'{counts["changed"]} Changed')
+    if args.output_dir is not None:
+        inventory_diff.to_spreadsheet(args.output_dir)
+    if args.json is not None:
+        inventory_diff.to_json(args.json)
+
+
+if __name__ == '__main__':
+    main()
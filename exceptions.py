@@ -1,2 +1,6 @@
 class NoPhoneReportFound(Exception):
     pass
+
+
+class DeviceAuthenticationFailed(Exception):
+    pass
@@ -0,0 +1,125 @@
+from parsers import cucm_join_titles, phone_device_type, sheet_titles, spreadsheet_header, spreadsheet_rows
+from datetime import datetime
+from itertools import islice
+import time
+import csv
+
+neighbor_header = ['Hostname', 'IP Address', 'Neighbor Hostname', 'Neighbor IP Address', 'Local Interface to Neighbor',
+                   'Neighbor Interface']
+"""Exploded router/switch neighbor table header, one row per neighbor"""
+neighbor_title = 'Routers_Switches_Neighbors'
+
+
+def neighbor_rows(routers_switches):
+    """Yields exploded neighbor row of each router/switch neighbor"""
+    for rt_sw in routers_switches:
+        for neighbor in rt_sw.get('neighbors', ()):
+            yield [rt_sw['hostname'], rt_sw['ip_address'], neighbor['hostname'], neighbor['ip_address'],
+                   neighbor['local_intf'], neighbor['remote_intf']]
+
+
+def boolean(value):
+    """Returns value as bool for boolean columns, eg. 'False' string of failed device replayed from CSV or JSON is
+    False, None is kept as null"""
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', 'yes', '1')
+    return bool(value)
+
+
+def integer(value):
+    """Returns value as int for integer columns, None or non-numeric value as null"""
+    try:
+        return None if value is None else int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def inventory_tables(routers_switches, phones, aps, others, failed_devices, cucm_join=None):
+    """
+    Inventory tables with 'output_to_spreadsheet' column schemas, router/switch 'Neighbor N' columns replaced by
+    exploded neighbor table.
+
+    :param cucm_join: 'CucmJoin' adding tables of CUCM phones not discovered and discovered phones not in CUCM
+
+    :return: [(title, header, rows)], rows being generator
+    """
+    tables = []
+    for title, device_list, device_type in zip(
+            sheet_titles, [routers_switches, phones, aps, others, failed_devices],
+            ['RouterSwitch', phone_device_type(phones), 'WAP', 'Other', 'Failed']):
+        tables.append((title, spreadsheet_header(device_type, neighbor_count=0),
+                       spreadsheet_rows(device_list, device_type, neighbors=False)))
+    tables.append((neighbor_title, neighbor_header, neighbor_rows(routers_switches)))
+    if cucm_join is not None:
+        for title, device_list, device_type in zip(cucm_join_titles, [cucm_join.cucm_only, cucm_join.discovered_only],
+                                                   ['CUCMOnly', 'NotInCUCM']):
+            tables.append((title, spreadsheet_header(device_type), spreadsheet_rows(device_list, device_type)))
+    return tables
+
+
+def output_to_csv(routers_switches, phones, aps, others, failed_devices, file_location, metrics=None, cucm_join=None):
+    """Streams device lists to CSV file per inventory table
+
+    :param metrics: 'DiscoveryMetrics' recording 'csv_export' write time
+    :param cucm_join: 'CucmJoin' adding CUCM report tables"""
+    start_time = time.perf_counter()
+    date_time = datetime.now().strftime('%m_%d_%Y-%H_%M_%S')
+    for title, header, rows in inventory_tables(routers_switches, phones, aps, others, failed_devices, cucm_join):
+        with open(f'{file_location}/network_inventory-{date_time}-{title}.csv', 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(header)
+            writer.writerows(rows)
+    if metrics is not None:
+        metrics.record('csv_export', time.perf_counter() - start_time)
+
+
+def output_to_parquet(routers_switches, phones, aps, others, failed_devices, file_location, arrow=False,
+                      batch_size=65536, metrics=None, cucm_join=None):
+    """Writes device lists to Parquet file per inventory table in record batches. Requires pyarrow.\n
+    Columns are strings except 'Failed' table connectivity, authentication, and authorization booleans and session
+    retries integers.
+
+    :param arrow: Writes Arrow IPC files instead of Parquet
+    :param batch_size: Rows per record batch
+    :param metrics: 'DiscoveryMetrics' recording 'parquet_export' or 'arrow_export' write time
+    :param cucm_join: 'CucmJoin' adding CUCM report tables"""
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    start_time = time.perf_counter()
+    date_time = datetime.now().strftime('%m_%d_%Y-%H_%M_%S')
+    boolean_columns = {'Connectivity', 'Authentication', 'Authorization'}
+    integer_columns = {'Session Retries'}
+
+    def column_type(title, column):
+        if title == 'Failed' and column in boolean_columns:
+            return pyarrow.bool_()
+        elif title == 'Failed' and column in integer_columns:
+            return pyarrow.int64()
+        return pyarrow.string()
+
+    for title, header, rows in inventory_tables(routers_switches, phones, aps, others, failed_devices, cucm_join):
+        schema = pyarrow.schema([(column, column_type(title, column)) for column in header])
+        file = f'{file_location}/network_inventory-{date_time}-{title}.{"arrow" if arrow else "parquet"}'
+        if arrow:
+            writer = pyarrow.ipc.new_file(file, schema)
+        else:
+            writer = pyarrow.parquet.ParquetWriter(file, schema)
+        with writer:
+            for batch in iter(lambda: list(islice(rows, batch_size)), []):
+                # Pads rows of phones without CUCM fields to header width
+                batch = [row + [None] * (len(header) - len(row)) if len(row) < len(header) else row for row in batch]
+                columns = []
+                for field, column in zip(schema, zip(*batch)):
+                    if field.type == pyarrow.bool_():
+                        columns.append([boolean(value) for value in column])
+                    elif field.type == pyarrow.int64():
+                        columns.append([integer(value) for value in column])
+                    else:
+                        columns.append([None if value is None else str(value) for value in column])
+                writer.write_batch(pyarrow.record_batch(columns, schema=schema))
+    if metrics is not None:
+        metrics.record('arrow_export' if arrow else 'parquet_export', time.perf_counter() - start_time)
@@ -0,0 +1,349 @@
+import asyncio
+import zlib
+
+# In-process stand-in for device CLIs replaying canned IOS and NX-OS show command outputs, used as
+# 'AsyncDiscoverySessions' connector for benchmarking discovery offline.
+
+ios_version_banner = 'Cisco IOS Software, IOS-XE Software, Catalyst L3 Switch Software (CAT3K_CAA-UNIVERSALK9-M), ' \
+                     'Version 16.9.5, RELEASE SOFTWARE (fc2)'
+nxos_version_banner = 'Cisco Nexus Operating System (NX-OS) Software, Version 9.3(5)'
+ap_version_banner = 'Cisco AP Software, ap3g3-k9w8 Version: 8.10.130.0'
+phone_version_banner = 'sip88xx.12-8-1-0001-455.loads'
+
+
+def ios_show_version(hostname, model, serial):
+    return f'''Cisco IOS XE Software, Version 16.09.05
+Cisco IOS Software [Fuji], Catalyst L3 Switch Software (CAT3K_CAA-UNIVERSALK9-M), Version 16.9.5, RELEASE SOFTWARE (fc2)
+Technical Support: http://www.cisco.com/techsupport
+Copyright (c) 1986-2020 by Cisco Systems, Inc.
+Compiled Thu 30-Jan-20 18:48 by mcpre
+
+
+ROM: IOS-XE ROMMON
+BOOTLDR: CAT3K_CAA Boot Loader (CAT3K_CAA-HBOOT-M) Version 4.78, RELEASE SOFTWARE (P)
+
+{hostname} uptime is 1 year, 2 weeks, 3 days, 4 hours, 5 minutes
+Uptime for this control processor is 1 year, 2 weeks, 3 days, 4 hours, 7 minutes
+System returned to ROM by Power Failure
+System image file is "flash:packages.conf"
+Last reload reason: Power Failure
+
+cisco {model} (MIPS) processor (revision V07) with 803500K/6147K bytes of memory.
+Processor board ID {serial}
+1 Virtual Ethernet interface
+52 Gigabit Ethernet interfaces
+2048K bytes of non-volatile configuration memory.
+
+Configuration register is 0x102
+'''
+
+
+def nxos_show_version(hostname, model, serial):
+    return f'''Cisco Nexus Operating System (NX-OS) Software
+TAC support: http://www.cisco.com/tac
+Copyright (C) 2002-2020, Cisco and/or its affiliates.
+All rights reserved.
+
+Software
+  BIOS: version 07.69
+  NXOS: version 9.3(5)
+  BIOS compile time:  04/08/2021
+  NXOS image file is: bootflash:///nxos.9.3.5.bin
+  NXOS compile time:  7/20/2020 20:00:00 [07/21/2020 06:30:11]
+
+
+Hardware
+  cisco Nexus9000 {model} chassis
+  Intel(R) Xeon(R) CPU  @ 1.80GHz with 24632252 kB of memory.
+  Processor Board ID {serial}
+
+  Device name: {hostname}
+  bootflash: 53298520 kB
+Kernel uptime is 120 day(s), 3 hour(s), 4 minute(s), 5 second(s)
+
+Last reset
+  Reason: Unknown
+'''
+
+
+def ios_cdp_entry(device_id, ip_address, platform, capabilities, local_intf, remote_intf, version):
+    return f'''-------------------------
+Device ID: {device_id}
+Entry address(es):
+  IP address: {ip_address}
+Platform: {platform},  Capabilities: {capabilities}
+Interface: {local_intf},  Port ID (outgoing port): {remote_intf}
+Holdtime : 150 sec
+
+Version :
+{version}
+
+advertisement version: 2
+Management address(es):
+  IP address: {ip_address}
+
+'''
+
+
+def nxos_cdp_entry(device_id, ip_address, platform, capabilities, local_intf, remote_intf, version):
+    return f'''----------------------------------------
+Device ID:{device_id}
+System Name: {device_id}
+
+Interface address(es):
+    IPv4 Address: {ip_address}
+Platform: {platform}, Capabilities: {capabilities}
+Interface: {local_intf}, Port ID (outgoing port): {remote_intf}
+Holdtime: 150 sec
+
+Version:
+{version}
+
+Advertisement Version: 2
+
+Mgmt address(es):
+    IPv4 Address: {ip_address}
+
+'''
+
+
+def ios_cdp_summary(entries):
+    lines = ['Capability Codes: R - Router, T - Trans Bridge, B - Source Route Bridge',
+             '                  S - Switch, H - Host, I - IGMP, r - Repeater, P - Phone',
+             '',
+             'Device ID        Local Intrfce     Holdtme    Capability  Platform  Port ID']
+    for entry in entries:
+        lines.append(f'{entry["device_id"]}\n                 {entry["local_intf"]}  150  {entry["capability_codes"]}  '
+                     f'{entry["platform"][-9:]}  {entry["remote_intf"]}')
+    return '\n'.join(lines) + f'\n\nTotal cdp entries displayed : {len(entries)}\n'
+
+
+def ios_switchport(interface, voice_vlan):
+    return f'''Name: {interface}
+Switchport: Enabled
+Administrative Mode: static access
+Operational Mode: static access
+Administrative Trunking Encapsulation: negotiate
+Operational Trunking Encapsulation: native
+Negotiation of Trunking: Off
+Access Mode VLAN: 10 (DATA)
+Trunking Native Mode VLAN: 1 (default)
+Administrative Native VLAN tagging: enabled
+Voice VLAN: {voice_vlan}
+Administrative private-vlan host-association: none
+Administrative private-vlan mapping: none
+Operational private-vlan: none
+Trunking VLANs Enabled: ALL
+Pruning VLANs Enabled: 2-1001
+Capture Mode Disabled
+Capture VLANs Allowed: ALL
+
+Protected: false
+Unknown unicast blocked: disabled
+Unknown multicast blocked: disabled
+Appliance trust: none
+
+'''
+
+
+def nxos_switchport(interface):
+    return f'''Name: {interface}
+  Switchport: Enabled
+  Switchport Monitor: Not enabled
+  Operational Mode: trunk
+  Access Mode VLAN: 1 (default)
+  Trunking Native Mode VLAN: 1 (default)
+  Trunking VLANs Allowed: 1-4094
+  Voice VLAN: none
+  Extended Trust State : not trusted [COS 0]
+
+'''
+
+
+def ios_mac_table(entries):
+    lines = ['          Mac Address Table',
+             '-------------------------------------------',
+             '',
+             'Vlan    Mac Address       Type        Ports',
+             '----    -----------       --------    -----']
+    for vlan, mac_addr, port in entries:
+        lines.append(f'{vlan:>4}    {mac_addr}    DYNAMIC     {port}')
+    return '\n'.join(lines) + f'\nTotal Mac Addresses for this criterion: {len(entries)}\n'
+
+
+def nxos_mac_table(entries):
+    lines = ['Legend: ',
+             '        * - primary entry, G - Gateway MAC, (R) - Routed MAC, O - Overlay MAC',
+             '        age - seconds since last seen,+ - primary entry using vPC Peer-Link,',
+             '        (T) - True, (F) - False, C - ControlPlane MAC, ~ - vsan',
+             '   VLAN     MAC Address      Type      age     Secure NTFY Ports',
+             '---------+-----------------+--------+---------+------+----+------------------']
+    for vlan, mac_addr, port in entries:
+        lines.append(f'*  {vlan:>4}     {mac_addr}   dynamic  0         F      F    {port}')
+    return '\n'.join(lines) + '\n'
+
+
+class FakeDevice:
+    """
+    Canned CLI of a single device.
+
+    :param hostname: Device hostname
+    :param ip_address: Management IP address
+    :param nxos: NX-OS formatted outputs, otherwise IOS
+    """
+    def __init__(self, hostname, ip_address, nxos=False):
+        self.hostname = hostname
+        self.ip_address = ip_address
+        self.nxos = nxos
+        self.neighbors = []
+        """CDP neighbor entries"""
+        self.switchports = []
+        """Raw switchport blocks"""
+        self.mac_entries = []
+        """(vlan, mac_addr, port)"""
+        self.outputs = None
+        """{command: raw output} rendered on first connection"""
+
+    def add_neighbor(self, device_id, ip_address, platform, capabilities, capability_codes, local_intf, remote_intf,
+                     version):
+        self.neighbors.append({
+            'device_id': device_id,
+            'ip_address': ip_address,
+            'platform': platform,
+            'capabilities': capabilities,
+            'capability_codes': capability_codes,
+            'local_intf': local_intf,
+            'remote_intf': remote_intf,
+            'version': version
+        })
+
+    def mac_table(self, vlan=None):
+        """Renders raw MAC address table, filtered to VLAN if provided"""
+        entries = [entry for entry in self.mac_entries if vlan is None or entry[0] == vlan]
+        if self.nxos:
+            return nxos_mac_table(entries)
+        else:
+            return ios_mac_table(entries)
+
+    def render(self):
+        """Renders raw show command outputs"""
+        serial = f'FOC{zlib.crc32(self.hostname.encode()) % 100000000:08d}'
+        if self.nxos:
+            cdp_entry = nxos_cdp_entry
+            show_version = nxos_show_version(self.hostname, 'C93180YC-EX', serial)
+        else:
+            cdp_entry = ios_cdp_entry
+            show_version = ios_show_version(self.hostname, 'WS-C3850-48P', serial)
+        self.outputs = {
+            'show version': show_version,
+            'show cdp neighbors': ios_cdp_summary(self.neighbors),
+            'show cdp neighbor detail': ''.join(
+                cdp_entry(n['device_id'], n['ip_address'], n['platform'], n['capabilities'], n['local_intf'],
+                          n['remote_intf'], n['version']) for n in self.neighbors),
+            'show interface switchport': ''.join(self.switchports),
+            'show mac address-table': self.mac_table()
+        }
+
+
+class FakeCliConnection:
+    """Connection to 'FakeDevice' returned from 'FakeCliNetwork.connect'"""
+    def __init__(self, device, latency):
+        self.device = device
+        self.latency = latency
+        self.commands = 0
+        """Commands run on connection"""
+
+    async def send_command(self, command):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.commands += 1
+        if command.startswith('show mac address-table vlan '):
+            return self.device.mac_table(command.split(' ')[-1])
+        return self.device.outputs.get(command, "% Invalid input detected at '^' marker.\n")
+
+    def close(self):
+        pass
+
+
+class FakeCliNetwork:
+    """
+    Collection of 'FakeDevice' keyed by management IP address. 'connect' is used as 'AsyncDiscoverySessions'
+    connector.
+
+    :param latency: Seconds of simulated delay on connect and each command
+    """
+    def __init__(self, latency=0.0):
+        self.devices = {}
+        """{ip_address: FakeDevice}"""
+        self.latency = latency
+        self.connections = 0
+        """Connections made"""
+
+    def add_device(self, device):
+        self.devices[device.ip_address] = device
+        return device
+
+    async def connect(self, ip_address):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        device = self.devices.get(ip_address)
+        if device is None:
+            raise OSError(f'Connection to {ip_address} timed out')
+        if device.outputs is None:
+            device.render()
+        self.connections += 1
+        return FakeCliConnection(device, self.latency)
+
+
+def fake_campus_network(core_count=2, dist_per_core=2, access_per_dist=4, phones_per_access=4, aps_per_access=2,
+                        latency=0.0):
+    """Builds 'FakeCliNetwork' of NX-OS core switches, IOS distribution switches, and IOS access switches with
+    phones and access points. Core management IP addresses start at 10.0.0.1.
+
+    :return: FakeCliNetwork"""
+    network = FakeCliNetwork(latency)
+    ip_count = [0]
+
+    def next_ip():
+        ip_count[0] += 1
+        n = ip_count[0]
+        return f'10.{int(n / 65536) % 256}.{int(n / 256) % 256}.{n % 256}'
+
+    def link(a, a_intf, b, b_intf):
+        """Adds CDP neighbor entries in both directions between switches"""
+        for local, local_intf, remote, remote_intf in [(a, a_intf, b, b_intf), (b, b_intf, a, a_intf)]:
+            if remote.nxos:
+                platform = 'N9K-C93180YC-EX'
+                version = nxos_version_banner
+            else:
+                platform = 'cisco WS-C3850-48P'
+                version = ios_version_banner
+            local.add_neighbor(remote.hostname, remote.ip_address, platform, 'Router Switch IGMP', 'R S I',
+                               local_intf, remote_intf, version)
+
+    cores = [network.add_device(FakeDevice(f'CORE{c + 1}', next_ip(), True)) for c in range(0, core_count)]
+    mac_count = 0
+    for c, core in enumerate(cores):
+        for d in range(0, dist_per_core):
+            dist = network.add_device(FakeDevice(f'DIST{c + 1}-{d + 1}', next_ip()))
+            link(core, f'Ethernet1/{d + 1}', dist, 'TenGigabitEthernet1/1/1')
+            core.switchports.append(nxos_switchport(f'Ethernet1/{d + 1}'))
+            for a in range(0, access_per_dist):
+                access = network.add_device(FakeDevice(f'ACC{c + 1}-{d + 1}-{a + 1}', next_ip()))
+                link(dist, f'GigabitEthernet1/0/{a + 1}', access, 'GigabitEthernet1/1/1')
+                for p in range(0, phones_per_access):
+                    mac_count += 1
+                    mac = f'{mac_count:012X}'
+                    intf = f'GigabitEthernet1/0/{p + 1}'
+                    access.add_neighbor(f'SEP{mac}', f'10.200.{int(mac_count / 256) % 256}.{mac_count % 256}',
+                                        'Cisco IP Phone 8845', 'Host Phone Two-port Mac Relay', 'H P M', intf,
+                                        'Port 1', phone_version_banner)
+                    access.switchports.append(ios_switchport(f'Gi1/0/{p + 1}', '100 (VOICE)'))
+                    access.mac_entries.append(('100', f'{mac[0:4]}.{mac[4:8]}.{mac[8:12]}'.lower(), f'Gi1/0/{p + 1}'))
+                for w in range(0, aps_per_access):
+                    intf = f'GigabitEthernet2/0/{w + 1}'
+                    access.add_neighbor(f'AP{c + 1}-{d + 1}-{a + 1}-{w + 1}', next_ip(), 'cisco AIR-AP2802I-B-K9',
+                                        'Trans-Bridge Source-Route-Bridge IGMP', 'T B I', intf,
+                                        'GigabitEthernet0', ap_version_banner)
+                    access.switchports.append(ios_switchport(f'Gi2/0/{w + 1}', 'none'))
+    return network
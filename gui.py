@@ -1,6 +1,6 @@
 import PySimpleGUI as Sg
 from net_async import MgmtIPAddresses
-from parsers import cucm_export_parse
+from cucm_index import CucmPhoneIndex
 from exceptions import NoPhoneReportFound
 from os import path
 
@@ -218,7 +218,7 @@ class InventoryGui:
 
         Attributes:
             mgmt_ips - List of management IP addresses\n
-            parsed_cucm_phones - Output from 'cucm_export_parse()'\n
+            parsed_cucm_phones - 'CucmPhoneIndex' of CUCM export\n
             username - Network Username\n
             password - Network Password\n
             enable_pw - Enable Password
@@ -251,8 +251,8 @@ class InventoryGui:
             elif event == 'Next' and cucm:
                 try:
                     Sg.user_settings_set_entry('-cucm_file-', values['cucm_file'])
-                    self.parsed_cucm_phones = cucm_export_parse(values['cucm_file'])
-                    """Output from 'cucm_export_parse()'"""
+                    self.parsed_cucm_phones = CucmPhoneIndex(values['cucm_file'])
+                    """'CucmPhoneIndex' of CUCM export"""
                     current_window = w_credential(current_window)
                 except NoPhoneReportFound:
                     current_window = w_file_not_found(current_window, True)
@@ -1,12 +1,31 @@
-from parsers import CdpParser
-from net_async import AsyncSessions, BugCheck, InputError, ForceSessionRetry
+from parsers import CdpParser, targeted_mac_commands
+from async_discovery import AsyncDiscoverySessions, CollectedSession
+from cache import DiscoveryCache, ParseCache, cdp_fingerprint
+from capture import CaptureArchive
+from cucm_index import CucmPhoneIndex
+from journal import DiscoveryJournal, ReplayedSessions
+from metrics import DiscoveryMetrics, phase_timer
+from reachability import ReachabilityPrecheck
+from records import RouterSwitch, Phone, Wap, Other
+from topology import TopologyGraph
+from net_async import AsyncSessions, InputError, ForceSessionRetry
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
 import time
 
 
-def discovery(session):
+def discovery(session, cache=None, metrics=None, targeted_mac=False, journal=None, parse_cache=None, capture=None):
     """
     Function to run within ASyncSessions. Runs show commands and returns dictionary for each device eventually\n
     returned from ASyncSessions.\n
+        :param cache: 'DiscoveryCache' reused instead of running show commands when device CDP fingerprint is unchanged
+        :param metrics: 'DiscoveryMetrics' recording show command and 'CdpParser' time
+        :param targeted_mac: Queries MAC address table only for voice VLANs of phone switchports instead of the full
+        table, skipping the query on devices without phone neighbors
+        :param journal: 'DiscoveryJournal' output is appended to, journaled output is reused when resuming
+        :param parse_cache: 'ParseCache' of 'CdpParser' results keyed by digest of CDP neighbor and switchport output
+        and MAC address table VLANs, the only MAC address table content 'CdpParser' uses
+        :param capture: 'CaptureArchive' holding every show command output of device, 'cache' isn't used while capturing
         :return:
             {
                 'waps': cdp_parser.waps,
@@ -14,22 +33,131 @@ def discovery(session):
                 'routers_switches': cdp_parser.routers_switches,
                 'others': cdp_parser.others
             }"""
+    device = session.ip_address
+    # 'CollectedSession' outputs are already collected and timed by 'AsyncDiscoverySessions'
+    command_metrics = None if isinstance(session, CollectedSession) else metrics
+    captured_outputs = {}
+    """{command: output} held by 'capture'"""
+
+    def send_command(command):
+        with phase_timer(command_metrics, command, device):
+            command_output = session.send_command(command)
+        if capture is not None:
+            captured_outputs[command] = command_output
+        return command_output
+
+    if journal is not None and device in journal.outputs:
+        return journal.outputs[device]
+
     try:
-        cdp_neighbors = session.send_command('show cdp neighbor detail')
-        switchports = session.send_command('show interface switchport')
-        mac_addrs = session.send_command('show mac address-table')
+        fingerprint = None
+        if cache is not None and capture is None:
+            fingerprint = cdp_fingerprint(session)
+            cached_output = cache.get(device, session.hostname, fingerprint)
+            if cached_output is not None:
+                if journal is not None:
+                    journal.write_output(device, session.hostname, cached_output)
+                return cached_output
+        cdp_neighbors = send_command('show cdp neighbor detail')
+        switchports = send_command('show interface switchport')
+        if targeted_mac:
+            mac_addrs = []
+            for command in targeted_mac_commands(cdp_neighbors, switchports):
+                vlan_mac_addrs = send_command(command)
+                if isinstance(vlan_mac_addrs, str):
+                    # Unparsed output is either an empty VLAN or authorization failure checked below
+                    if vlan_mac_addrs.__contains__('Authorization failed'):
+                        mac_addrs = vlan_mac_addrs
+                        break
+                else:
+                    mac_addrs += vlan_mac_addrs
+        else:
+            mac_addrs = send_command('show mac address-table')
         if cdp_neighbors.__contains__('Authorization failed') or switchports.__contains__('Authorization failed') or \
                 mac_addrs.__contains__('Authorization failed'):
             raise ForceSessionRetry
-        cdp_parser = CdpParser(cdp_neighbors, switchports, mac_addrs, session)
+        output = None
+        if parse_cache is not None:
+            if isinstance(session, CollectedSession):
+                # Hashes raw output instead of TextFSM parsed output
+                cdp_output = session.raw_outputs.get('show cdp neighbor detail', cdp_neighbors)
+                switchport_output = session.raw_outputs.get('show interface switchport', switchports)
+            else:
+                cdp_output = cdp_neighbors
+                switchport_output = switchports
+            if isinstance(mac_addrs, list):
+                mac_output = sorted({mac_addr['vlan'] for mac_addr in mac_addrs})
+            else:
+                # Unparsed MAC address table, eg. empty table
+                mac_output = mac_addrs
+            digest = parse_cache.digest(session.hostname, device, cdp_output, switchport_output, mac_output)
+            output = parse_cache.get('cdp_parser', digest)
+        if output is None:
+            with phase_timer(metrics, 'cdp_parser', device):
+                cdp_parser = CdpParser(cdp_neighbors, switchports, mac_addrs, session)
+            output = {
+                'waps': cdp_parser.waps,
+                'phones': cdp_parser.phones,
+                'routers_switches': cdp_parser.routers_switches,
+                'others': cdp_parser.others
+            }
+            if parse_cache is not None:
+                parse_cache.put('cdp_parser', digest, output)
     except OSError:
         raise ForceSessionRetry
-    return {
-        'waps': cdp_parser.waps,
-        'phones': cdp_parser.phones,
-        'routers_switches': cdp_parser.routers_switches,
-        'others': cdp_parser.others
-    }
+    if cache is not None and capture is None:
+        cache.put(device, session.hostname, fingerprint, output)
+    if capture is not None:
+        capture.add_outputs(device, captured_outputs)
+    if journal is not None:
+        journal.write_output(device, session.hostname, output)
+    return output
+
+
+def missing_ip_addresses(ip_addresses, sessions):
+    """Returns IP addresses without successful or failed device within sessions results, in requested order"""
+    completed = {device['ip_address'] for device in sessions.successful_devices}
+    completed.update(device['ip_address'] for device in sessions.failed_devices)
+    return [ip_address for ip_address in ip_addresses if ip_address not in completed]
+
+
+class HostnameIndex:
+    """
+    Hash index of known router and switch hostnames keeping the substring semantics of
+    'hostname.__contains__(known_hostname)' used when seperating CDP neighbors.\n
+    Known hostnames are bucketed by length so a lookup only slides one window per distinct length over the
+    looked up hostname instead of scanning every known hostname.
+
+    :param hostnames: Iterable of initial hostnames
+    """
+    def __init__(self, hostnames=()):
+        self.lengths = {}
+        """{hostname length: set(hostnames)}"""
+        for hostname in hostnames:
+            self.add(hostname)
+
+    def add(self, hostname):
+        """Adds hostname to index"""
+        self.lengths.setdefault(len(hostname), set()).add(hostname)
+
+    def __iter__(self):
+        for hostnames in self.lengths.values():
+            yield from hostnames
+
+    def __contains__(self, hostname):
+        """Returns True if hostname matches or contains any indexed hostname, eg. 'SW1' matches 'SW1.domain.com'"""
+        hostname_length = len(hostname)
+        for length, hostnames in self.lengths.items():
+            if length > hostname_length:
+                continue
+            if length == hostname_length:
+                if hostname in hostnames:
+                    return True
+                continue
+            for i in range(hostname_length - length + 1):
+                if hostname[i:i + length] in hostnames:
+                    return True
+        return False
 
 
 class RtSwSeperator:
@@ -37,8 +165,8 @@ class RtSwSeperator:
     Provided 'ASyncSessions().output' dict and 'known_hostnames' list, seperates connection \n
     scanned devices and CDP neighbor devices checking if device has already been discovered.
 
-    :param sessions_output: - test
-    :param known_hostnames: - test
+    :param sessions_output: 'AsyncSessions().outputs'
+    :param known_hostnames: List of hostnames or 'HostnameIndex' of routers and switches from previous passes
     """
     def __init__(self, sessions_output, known_hostnames):
         inv = sessions_output
@@ -46,6 +174,16 @@ class RtSwSeperator:
         """Discovered CDP neighbors"""
         self.connection_parsed = []
         """Scanned devices via SSH/TELNET sessions"""
+        new_index = {}
+        """{hostname: router_switch} of devices in 'new'"""
+
+        # Indexes connection scanned device hostnames from current discovery pass and known hostnames from previous
+        # discovery passes
+        if isinstance(known_hostnames, HostnameIndex):
+            known_index = known_hostnames
+        else:
+            known_index = HostnameIndex(known_hostnames)
+        session_index = HostnameIndex(output['device']['hostname'] for output in inv)
 
         def new_parse(routers_switches_raw, neighbor_device):
             """Appends final device dictionary format to 'new'."""
@@ -61,26 +199,23 @@ class RtSwSeperator:
 
                 # Checks if CDP neighbor hostname isn't any connection scanned device hostname from current
                 # discovery pass and any known hostname from previously scanned discovery passes
-                if all(not hostname.__contains__(device['device']['hostname']) for device in inv) and \
-                        all(not hostname.__contains__(known_hostname) for known_hostname in known_hostnames):
-                    router_switch = {
-                        'hostname': hostname,
-                        'ip_address': rw_sw['ip_address'],
-                        'software_version': rw_sw['software_version'],
-                        'model': rw_sw['model'],
-                        'neighbors': [
-                            neighbor
-                        ]
-                    }
-                    # If device not already in new list or none in new list, appends device to new list
-                    if len(self.new) == 0 or \
-                            all(hostname != n_device['hostname'] for n_device in self.new):
+                if hostname not in session_index and hostname not in known_index:
+                    # If device not already in new list, appends device to new list
+                    if hostname not in new_index:
+                        router_switch = {
+                            'hostname': hostname,
+                            'ip_address': rw_sw['ip_address'],
+                            'software_version': rw_sw['software_version'],
+                            'model': rw_sw['model'],
+                            'neighbors': [
+                                neighbor
+                            ]
+                        }
+                        new_index[hostname] = router_switch
                         self.new.append(router_switch)
                     # Appends neighbor to existing scanned device
                     else:
-                        for d in self.new:
-                            if d['hostname'] == hostname:
-                                d['neighbors'].append(neighbor)
+                        new_index[hostname]['neighbors'].append(neighbor)
 
         # Goes through each entry in ASyncSessions output appending to 'connection_parsed' and running 'new_parse'
         # function on newly discovered devices
@@ -102,8 +237,46 @@ class InventoryDiscovery:
     :parameter verbose: Prints progress of connections and discovery to screen
     :parameter recursive: Runs additional dicovery passes on newly discovered devices not found within previously
     scanned devices
+    :parameter cache_file: File location of 'DiscoveryCache' reusing results of devices with unchanged CDP state
+    :parameter cache_ttl: Seconds cached device results are reused before device is fully polled again
+    :parameter pipelined: Connects to newly discovered routers and switches as soon as they are found instead of running
+    barrier synchronized discovery passes
+    :parameter max_sessions: Maximum concurrent device sessions across the whole pipelined discovery, and per pass
+    with 'asyncio' session backend
+    :parameter session_backend: 'threads' runs 'AsyncSessions' (default), 'asyncio' runs 'AsyncDiscoverySessions',
+    or 'ShardCoordinator' instance splitting sessions across worker processes, closed once discovery finishes.
+    'ShardCoordinator' raises ValueError with 'cache_file', 'parse_cache_file', or 'capture_file', journal records its
+    session results but not device outputs within an unfinished session
+    :parameter connector: 'AsyncDiscoverySessions' connector, eg. 'FakeCliNetwork().connect', defaults to asyncssh
+    :parameter device_timeout: Seconds per device for 'asyncio' session backend
+    :parameter targeted_mac: Queries MAC address table only for phone voice VLANs instead of the full table
+    :parameter journal_file: File location of 'DiscoveryJournal' checkpointing every device and discovery pass
+    :parameter resume: Replays existing journal, continuing from its last finished discovery pass and only connecting
+    to devices not yet completed
+    :parameter compact_records: Stores inventory devices as '__slots__' records from 'records' with interned switch
+    hostnames, models, and software versions instead of dictionaries, records support dictionary style access
+    :parameter precheck: Runs 'ReachabilityPrecheck' TCP/22 and TCP/23 connect check before sessions, unreachable IP
+    addresses are appended to 'failed_devices' without starting a session
+    :parameter precheck_timeout: Connect timeout in seconds of precheck for subnets without observed RTTs
+    :parameter max_retries: Session retries of IP addresses missing from both successful and failed session results
+    :parameter retry_backoff: Seconds before first retry, doubling each following retry
+    :parameter topology: Builds 'TopologyGraph' of CDP adjacencies as each device's result arrives with pipelined
+    discovery, or after each discovery pass
+    :parameter parse_cache_file: File location of 'ParseCache' reusing TextFSM and 'CdpParser' results of
+    byte-identical command outputs
+    :parameter parse_cache_size: Maximum 'ParseCache' results
+    :parameter capture_file: File location of 'CaptureArchive' storing every device's show command outputs for offline
+    replay with 'CaptureReplay' session_backend, devices are fully polled instead of using discovery cache while
+    capturing
+    :parameter retry_failed: Connects again to devices journaled as failed when resuming instead of replaying them as
+    failed
     """
-    def __init__(self, username, password, initial_mgmt_ips, enable_pw='', verbose=False, recursive=True):
+    def __init__(self, username, password, initial_mgmt_ips, enable_pw='', verbose=False, recursive=True,
+                 cache_file=None, cache_ttl=86400, pipelined=False, max_sessions=100, session_backend='threads',
+                 connector=None, device_timeout=120, targeted_mac=False, journal_file=None, resume=False,
+                 compact_records=False, precheck=False, precheck_timeout=1.0, max_retries=3, retry_backoff=1.0,
+                 topology=False, parse_cache_file=None, parse_cache_size=50000, capture_file=None,
+                 retry_failed=True):
         self.routers_switches = []
         """
         Dictionary: 
@@ -168,14 +341,21 @@ class InventoryDiscovery:
             'authentication',\n
             'authorization',\n
             'exception',\n
-            'discovery_status'}"""
+            'discovery_status',\n
+            'session_retries'} (retries of IP address missing from session results)"""
+        self.topology = TopologyGraph() if topology else None
+        """'TopologyGraph' of connection scanned devices and CDP neighbors if 'topology'"""
+        self.session_retries = {}
+        """{ip_address: retry count} of IP addresses retried after missing from session results"""
 
         new_routers_switches = []
         """Routers and switches discovered through CDP, not through SSH/TELNET"""
-        known_hostnames = []
-        """All known router and switcheshostnames"""
+        known_hostnames = HostnameIndex()
+        """All known router and switches hostnames"""
         init = True
         """Bool of initial discovery pass"""
+        requeued_existing_ips = set()
+        """Initial IP addresses journaled as failed, connected to again within resumed pass"""
 
         # Changes logical variable name from initial name to match variable name for recursive discovery pass loop
         # Also validates input
@@ -188,63 +368,174 @@ class InventoryDiscovery:
         except TypeError:
             raise InputError('No Management IP Addresses found')
 
+        # Imported here since 'coordinator' imports 'discovery'
+        from coordinator import ShardCoordinator
+        if isinstance(session_backend, ShardCoordinator):
+            # Workers run 'discovery()' without caches or capture, only session results reach this process
+            unsupported = [name for name, value in [('cache_file', cache_file), ('parse_cache_file', parse_cache_file),
+                                                    ('capture_file', capture_file)] if value is not None]
+            if len(unsupported) != 0:
+                raise ValueError(f'{", ".join(unsupported)} not supported with ShardCoordinator session_backend')
+
         discovery_count = 1
         """Discovery pass counter"""
 
-        def connection_sessions():
-            """Runs AsyncSessions with 'discovery' function on 'mgmt_ips'
+        self.metrics = DiscoveryMetrics()
+        """Per device and aggregate timing of discovery phases"""
+
+        if cache_file is not None:
+            cache = DiscoveryCache(cache_file, cache_ttl)
+        else:
+            cache = None
+        if journal_file is not None:
+            journal = DiscoveryJournal(journal_file, resume)
+            if verbose and resume:
+                print(f'Resuming Discovery with {len(journal.devices) + len(journal.failed)} Journaled Devices')
+        else:
+            journal = None
+        if parse_cache_file is not None:
+            self.parse_cache = ParseCache(parse_cache_file, parse_cache_size)
+            """'ParseCache' with per run hit rates"""
+        else:
+            self.parse_cache = None
+        capture = CaptureArchive(capture_file) if capture_file is not None else None
+        if precheck:
+            reachability = ReachabilityPrecheck(timeout=precheck_timeout, max_concurrency=max(max_sessions, 100),
+                                                metrics=self.metrics)
+        else:
+            reachability = None
+        discovery_function = partial(
+            discovery, cache=cache, metrics=self.metrics, targeted_mac=targeted_mac, journal=journal,
+            parse_cache=self.parse_cache, capture=capture)
+
+        def backend_sessions(ip_addresses):
+            """Runs 'discovery' function on IP addresses with configured session backend
+
+            :return: AsyncSessions(params) or AsyncDiscoverySessions(params)
+            """
+            if session_backend == 'asyncio':
+                collected_discovery = partial(discovery, metrics=self.metrics, targeted_mac=targeted_mac,
+                                              journal=journal, parse_cache=self.parse_cache, capture=capture)
+                return AsyncDiscoverySessions(
+                    username, password, ip_addresses, collected_discovery, cache if capture is None else None,
+                    max_sessions, device_timeout, connector, metrics=self.metrics, targeted_mac=targeted_mac,
+                    parse_cache=self.parse_cache)
+            elif session_backend == 'threads':
+                return AsyncSessions(username, password, ip_addresses, discovery_function, enable_pw, True)
+            else:
+                return session_backend.run(username, password, ip_addresses, enable_pw, targeted_mac, self.metrics)
+
+        def run_sessions(ip_addresses):
+            """Runs 'backend_sessions' on IP addresses not already completed within journal and passing reachability
+            precheck, journaling results
 
-            :return: AsyncSessions(params)
+            :return: AsyncSessions(params), AsyncDiscoverySessions(params), or ReplayedSessions(params)
+            """
+            if journal is None and reachability is None and capture is None:
+                return backend_sessions(ip_addresses)
+            if journal is not None:
+                sessions, remaining_ips = journal.replay(ip_addresses, retry_failed)
+            else:
+                sessions, remaining_ips = ReplayedSessions(), ip_addresses
+            if reachability is not None and len(remaining_ips) != 0:
+                remaining_ips, unreachable_devices = reachability.check(remaining_ips)
+                unreachable_sessions = ReplayedSessions(failed_devices=unreachable_devices)
+                if journal is not None:
+                    journal.write_sessions(unreachable_sessions)
+                if capture is not None:
+                    capture.write_sessions(unreachable_sessions)
+                sessions.extend(unreachable_sessions)
+            if len(remaining_ips) != 0:
+                connected_sessions = backend_sessions(remaining_ips)
+                if journal is not None:
+                    journal.write_sessions(connected_sessions)
+                if capture is not None:
+                    capture.write_sessions(connected_sessions)
+                sessions.extend(connected_sessions)
+            return sessions
+
+        def reconciled_sessions(ip_addresses):
+            """Runs 'run_sessions' on IP addresses, then retries only IP addresses missing from both successful and
+            failed devices with exponential backoff. IP addresses still missing after 'max_retries' are failed.
+
+            :return: ReplayedSessions(params)
             """
-            while True:
-                outputs = AsyncSessions(username, password, mgmt_ips, discovery, enable_pw, True)
-                bug_check = BugCheck(outputs.successful_devices, outputs.failed_devices, mgmt_ips)
-                if not bug_check.bug:
+            sessions = ReplayedSessions()
+            sessions.extend(run_sessions(ip_addresses))
+            missing_ips = missing_ip_addresses(ip_addresses, sessions)
+            for retry in range(0, max_retries):
+                if len(missing_ips) == 0:
                     break
-                else:
-                    if verbose:
-                        print('Bug Found')
-            return outputs
+                if verbose:
+                    print(f'Retrying {len(missing_ips)} Devices Missing from Session Results')
+                time.sleep(retry_backoff * 2 ** retry)
+                for ip_address in missing_ips:
+                    self.session_retries[ip_address] = self.session_retries.get(ip_address, 0) + 1
+                self.metrics.increment('session_retry', len(missing_ips))
+                sessions.extend(run_sessions(missing_ips))
+                missing_ips = missing_ip_addresses(missing_ips, sessions)
+            for ip_address in missing_ips:
+                sessions.failed_devices.append({
+                    'ip_address': ip_address,
+                    'connection_type': 'Unknown',
+                    'device_type': 'Unknown',
+                    'connectivity': False,
+                    'authentication': False,
+                    'authorization': False,
+                    'exception': f'No session result after {max_retries} retries'
+                })
+            return sessions
 
         def append_failed(failed_devices):
             """Appends failed devices from 'connection_sessions()' to 'failed_devices'"""
             if len(failed_devices) != 0:
                 for failed_device in failed_devices:
-                    if init:
+                    if init or failed_device['ip_address'] in requeued_existing_ips:
                         failed_device['discovery_status'] = 'existing'
                     else:
                         failed_device['discovery_status'] = 'new'
                     self.failed_devices.append(failed_device)
 
+        def compact(record_type, device):
+            """Returns device as compact 'records' type if 'compact_records', otherwise device dictionary"""
+            if compact_records:
+                return record_type.from_dict(device)
+            return device
+
         def append_endpoints(sessions_outputs):
             """Apends WAPs, phones, and others to corresponding lists and device hostnames from init connections to
             'known_hostnames' list"""
             for output in sessions_outputs:
+                if self.topology is not None:
+                    self.topology.add_discovery(output['device'], output['output'])
                 output = output['output']
                 for wap in output['waps']:
-                    self.waps.append(wap)
+                    self.waps.append(compact(Wap, wap))
                 for phone in output['phones']:
-                    self.phones.append(phone)
+                    self.phones.append(compact(Phone, phone))
                 for other in output['others']:
-                    self.others.append(other)
+                    self.others.append(compact(Other, other))
 
-        def remove_connection_discovered_new(device):
-            """Removes connection parsed device from 'new_routers_switches' list"""
+        def remove_connection_discovered_new(device, match_hostname=False):
+            """Removes connection parsed device from 'new_routers_switches' list, matched by IP address.\n
+            Pipelined discovery also matches by hostname, connecting to a device through an initial IP address other
+            than its CDP management IP address while the CDP entry is already queued"""
             for new_rt_sw in new_routers_switches:
-                if device['ip_address'] == new_rt_sw['ip_address']:
+                if device['ip_address'] == new_rt_sw['ip_address'] or \
+                        (match_hostname and device['hostname'] == new_rt_sw['hostname']):
                     new_routers_switches.remove(new_rt_sw)
                     break
 
         def append_routers_switches(connection_parsed):
             """Appends connection parsed device to 'routers_switches' list"""
             for router_switch in connection_parsed:
-                if init:
+                if init or router_switch['ip_address'] in requeued_existing_ips:
                     router_switch['discovery_status'] = 'existing'
                 else:
                     router_switch['discovery_status'] = 'new'
                 router_switch['connection_attempt'] = 'Success'
-                known_hostnames.append(router_switch['hostname'])
-                self.routers_switches.append(router_switch)
+                known_hostnames.add(router_switch['hostname'])
+                self.routers_switches.append(compact(RouterSwitch, router_switch))
                 remove_connection_discovered_new(router_switch)
 
         def new_routers_switches_parse(new_cdp_routers_switches):
@@ -255,7 +546,7 @@ class InventoryDiscovery:
             """
             new_ip_addresses = []
             for new_rt_sw in new_cdp_routers_switches:
-                known_hostnames.append(new_rt_sw['hostname'])
+                known_hostnames.add(new_rt_sw['hostname'])
                 ip_address = new_rt_sw['ip_address']
                 # Doesn't append blank IP address from CDP neighbor entry to new IP address list
                 if ip_address != '':
@@ -263,68 +554,195 @@ class InventoryDiscovery:
                 new_routers_switches.append(new_rt_sw)
             return new_ip_addresses
 
+        def pipelined_discovery():
+            """Runs discovery through work queue, connecting to newly discovered routers and switches as soon as the
+            neighbor device's discovery returns instead of waiting for the full discovery pass to finish"""
+            existing_ips = set(mgmt_ips)
+            """Initial management IP addresses"""
+            queued_ips = set(mgmt_ips)
+            """Management IP addresses already queued for connection"""
+            completed_hostnames = set()
+            """Hostnames of connection scanned devices, a device reached through a second IP address, eg. an unfinished
+            initial IP address also queued by its CDP management IP address, is only kept once"""
+
+            with ThreadPoolExecutor(max_sessions) as executor:
+                pending = {executor.submit(reconciled_sessions, [ip_address]): ip_address for ip_address in mgmt_ips}
+                while len(pending) != 0:
+                    done = wait(pending, return_when=FIRST_COMPLETED)[0]
+                    for future in done:
+                        ip_address = pending.pop(future)
+                        sessions = future.result()
+                        if ip_address in existing_ips:
+                            discovery_status = 'existing'
+                        else:
+                            discovery_status = 'new'
+
+                        for failed_device in sessions.failed_devices:
+                            failed_device['discovery_status'] = discovery_status
+                            self.failed_devices.append(failed_device)
+
+                        sessions_outputs = []
+                        for output in sessions.outputs:
+                            hostname = output['device']['hostname']
+                            if hostname not in completed_hostnames:
+                                completed_hostnames.add(hostname)
+                                sessions_outputs.append(output)
+
+                        append_endpoints(sessions_outputs)
+
+                        with self.metrics.timer('rt_sw_seperator'):
+                            rt_sw = RtSwSeperator(sessions_outputs, known_hostnames)
+                        for router_switch in rt_sw.connection_parsed:
+                            router_switch['discovery_status'] = discovery_status
+                            router_switch['connection_attempt'] = 'Success'
+                            known_hostnames.add(router_switch['hostname'])
+                            self.routers_switches.append(compact(RouterSwitch, router_switch))
+                            remove_connection_discovered_new(router_switch, match_hostname=True)
+
+                        # Queues newly discovered routers and switches for connection immediately
+                        if recursive and len(rt_sw.new) != 0:
+                            for new_ip_address in new_routers_switches_parse(rt_sw.new):
+                                if new_ip_address not in queued_ips:
+                                    queued_ips.add(new_ip_address)
+                                    pending[executor.submit(reconciled_sessions, [new_ip_address])] = new_ip_address
+
+        finished = False
+        """Bool of discovery passes finished"""
+        if journal is not None and len(journal.passes) != 0 and not pipelined:
+            # Restores finished passes from journal instead of rerunning their seperation
+            completed_ips = set()
+            """IP addresses of successful devices within finished passes"""
+            journaled_failed = {}
+            """{ip_address: failed device} of finished passes"""
+            for pass_record in journal.passes:
+                completed_ips.update(pass_record['output_ips'])
+                append_endpoints(journal.devices[ip_address] for ip_address in pass_record['output_ips'])
+                for router_switch in pass_record['routers_switches']:
+                    self.routers_switches.append(compact(RouterSwitch, router_switch))
+                for failed_device in pass_record['failed_devices']:
+                    journaled_failed[failed_device['ip_address']] = failed_device
+            last_pass = journal.passes[-1]
+            for hostname in last_pass['known_hostnames']:
+                known_hostnames.add(hostname)
+            new_routers_switches += last_pass['new_routers_switches']
+            mgmt_ips = list(last_pass['mgmt_ips'])
+            discovery_count = last_pass['discovery_count'] + 1
+            init = False
+            for ip_address, failed_device in journaled_failed.items():
+                # Devices failed within a pass and successful within a later pass are already restored
+                if ip_address in completed_ips:
+                    continue
+                if retry_failed:
+                    if ip_address not in mgmt_ips:
+                        mgmt_ips.append(ip_address)
+                    if failed_device.get('discovery_status') == 'existing':
+                        requeued_existing_ips.add(ip_address)
+                else:
+                    self.failed_devices.append(failed_device)
+            finished = len(mgmt_ips) == 0
+            if verbose:
+                print(f'Resumed {last_pass["discovery_count"]} Finished Discovery Passes from Journal')
+
         start_full_discovery_time = time.perf_counter()
 
-        while True:
-            start_discovery_time = time.perf_counter()
-            if verbose:
-                if init:
+        try:
+            if pipelined:
+                if verbose:
                     print(f'=========================================================================\n'
-                          f'Starting Initial Discovery on {len(mgmt_ips)} Devices...\n'
+                          f'Starting Pipelined Discovery on {len(mgmt_ips)} Devices...\n'
                           f'=========================================================================')
-                else:
-                    print(f'-------------------------------------------------------------------------\n'
-                          f'Starting Discovery Pass #{discovery_count} on {len(mgmt_ips)} Devices...\n'
-                          f'-------------------------------------------------------------------------')
+                pipelined_discovery()
+            else:
+                while not finished:
+                    start_discovery_time = time.perf_counter()
+                    if verbose:
+                        if init:
+                            print(f'=========================================================================\n'
+                                  f'Starting Initial Discovery on {len(mgmt_ips)} Devices...\n'
+                                  f'=========================================================================')
+                        else:
+                            print(f'-------------------------------------------------------------------------\n'
+                                  f'Starting Discovery Pass #{discovery_count} on {len(mgmt_ips)} Devices...\n'
+                                  f'-------------------------------------------------------------------------')
 
-            # Connects to devices
-            sessions = connection_sessions()
+                    # Connects to devices
+                    sessions = reconciled_sessions(mgmt_ips)
 
-            # Appends failed connection devices to 'failed_devices' list
-            append_failed(sessions.failed_devices)
+                    # Appends failed connection devices to 'failed_devices' list
+                    append_failed(sessions.failed_devices)
 
-            # Appends non-router/switch devices to corresponding lists
-            append_endpoints(sessions.outputs)
+                    # Appends non-router/switch devices to corresponding lists
+                    append_endpoints(sessions.outputs)
 
-            # Seperates and formats previously connected to devices and devices discovered through CDP neighbors
-            rt_sw = RtSwSeperator(sessions.outputs, known_hostnames)
+                    # Seperates and formats previously connected to devices and devices discovered through CDP neighbors
+                    with self.metrics.timer('rt_sw_seperator'):
+                        rt_sw = RtSwSeperator(sessions.outputs, known_hostnames)
 
-            # Appends connection discovered devices to 'routers_switches' list
-            append_routers_switches(rt_sw.connection_parsed)
+                    # Appends connection discovered devices to 'routers_switches' list
+                    append_routers_switches(rt_sw.connection_parsed)
 
-            finish_discovery_time = time.perf_counter()
-            if verbose:
-                discovery_elapsed_time = int(round((finish_discovery_time - start_discovery_time) / 60, 0))
-                if init:
-                    if recursive:
-                        print(f'-------------------------------------------------------------------------\n'
-                              f'Finished Initial Discovery in {discovery_elapsed_time} Minutes\n'
-                              f'-------------------------------------------------------------------------\n')
-                else:
-                    print(f'-------------------------------------------------------------------------\n'
-                          f'Finished Discovery Pass #{discovery_count} in {discovery_elapsed_time} Minutes\n'
-                          f'-------------------------------------------------------------------------\n')
-
-            # Ends discovery loop if recursive flag not true
-            if not recursive:
-                break
-            # Checks if any new routers and switches discovered
-            elif len(rt_sw.new) != 0:
-                # Re-defines 'mgmt_ips' list for next discovery pass and appends to 'new_routers_switches' list
-                mgmt_ips = new_routers_switches_parse(rt_sw.new)
-                discovery_count += 1
-                init = False
-            # Ends discovery loop if no new routers and switches discovered
-            else:
-                break
+                    finish_discovery_time = time.perf_counter()
+                    self.metrics.record('discovery_pass', finish_discovery_time - start_discovery_time)
+                    if verbose:
+                        discovery_elapsed_time = int(round((finish_discovery_time - start_discovery_time) / 60, 0))
+                        if init:
+                            if recursive:
+                                print(f'-------------------------------------------------------------------------\n'
+                                      f'Finished Initial Discovery in {discovery_elapsed_time} Minutes\n'
+                                      f'-------------------------------------------------------------------------\n')
+                        else:
+                            print(f'-------------------------------------------------------------------------\n'
+                                  f'Finished Discovery Pass #{discovery_count} in {discovery_elapsed_time} Minutes\n'
+                                  f'-------------------------------------------------------------------------\n')
+
+                    # Ends discovery loop if recursive flag not true or no new routers and switches discovered
+                    finished = not recursive or len(rt_sw.new) == 0
+                    pass_count = discovery_count
+                    if finished:
+                        mgmt_ips = []
+                    else:
+                        # Re-defines 'mgmt_ips' list for next discovery pass and appends to 'new_routers_switches' list
+                        mgmt_ips = new_routers_switches_parse(rt_sw.new)
+                        discovery_count += 1
+                        init = False
+                    if journal is not None:
+                        journal.write_pass(pass_count, sessions, rt_sw.connection_parsed, mgmt_ips, known_hostnames,
+                                           new_routers_switches)
+        finally:
+            # Shuts down 'ShardCoordinator' worker processes even if discovery fails
+            if hasattr(session_backend, 'close'):
+                session_backend.close()
 
         # Appends remaining failed connection CDP discovered routers and switches to final 'routers_switches' list
         for new_router_switch in new_routers_switches:
             new_router_switch['discovery_status'] = 'new'
             new_router_switch['connection_attempt'] = 'Failed'
-            self.routers_switches.append(new_router_switch)
+            self.routers_switches.append(compact(RouterSwitch, new_router_switch))
+
+        for failed_device in self.failed_devices:
+            failed_device['session_retries'] = self.session_retries.get(failed_device['ip_address'], 0)
+
+        if verbose and len(self.session_retries) != 0:
+            print(f'Session Retries: {sum(self.session_retries.values())} on {len(self.session_retries)} Devices')
+
+        if cache is not None:
+            cache.save()
+            if verbose:
+                print(f'Discovery Cache: {cache.hits} Cached, {cache.misses} Polled')
+        if capture is not None:
+            capture.close()
+            if verbose:
+                print(f'Captured {capture.devices} Devices to {capture_file}')
+        if self.parse_cache is not None:
+            self.parse_cache.save()
+            if verbose:
+                for kind, hit_rate in self.parse_cache.hit_rates().items():
+                    stats = self.parse_cache.stats[kind]
+                    print(f'Parse Cache {kind}: {hit_rate:.0%} Hit Rate, {stats["hits"]} Hits, '
+                          f'{stats["misses"]} Misses')
 
         finish_full_discovery_time = time.perf_counter()
+        self.metrics.record('full_discovery', finish_full_discovery_time - start_full_discovery_time)
         full_discovery_elapsed_time = int(round((finish_full_discovery_time - start_full_discovery_time) / 60, 0))
         if verbose:
             print(f'=========================================================================\n'
@@ -336,8 +754,11 @@ def merge_phone_discovery_cucm_export(discovered_phones, cucm_parsed_phones):
     """Appends phone info from CUCM export to list of discovered phones
 
     :parameter discovered_phones: 'InventoryDiscovery().phones'
-    :parameter cucm_parsed_phones: Output of 'cucm_export_parse()'
+    :parameter cucm_parsed_phones: Output of 'cucm_export_parse()' or 'CucmPhoneIndex', index is only queried for
+    discovered phones
     :return: List of discovered phones with 'description' and 'directory_number' added"""
+    if isinstance(cucm_parsed_phones, CucmPhoneIndex):
+        cucm_parsed_phones = cucm_parsed_phones.lookup(phone['hostname'] for phone in discovered_phones)
     for phone in discovered_phones:
         phone_hostname = phone['hostname']
         if phone_hostname in cucm_parsed_phones:
@@ -0,0 +1,130 @@
+from threading import Lock
+from os import path
+import json
+
+
+class ReplayedSessions:
+    """
+    'AsyncSessions' shaped results combining journaled devices with devices connected to in current run.
+
+        Attributes:
+            outputs = [{'device', 'output'}]\n
+            successful_devices = []\n
+            failed_devices = []
+    """
+    def __init__(self, outputs=(), failed_devices=()):
+        self.outputs = list(outputs)
+        self.successful_devices = [output['device'] for output in self.outputs]
+        self.failed_devices = list(failed_devices)
+
+    def extend(self, sessions):
+        """Adds results of 'AsyncSessions' or 'AsyncDiscoverySessions'"""
+        self.outputs += sessions.outputs
+        self.successful_devices += sessions.successful_devices
+        self.failed_devices += sessions.failed_devices
+
+
+class DiscoveryJournal:
+    """
+    Append-only JSON lines journal of discovery results used to resume an interrupted 'InventoryDiscovery'.\n
+    A pass record written at the end of each discovery pass holds the pass state, resuming continues from the last
+    finished pass instead of rerunning its separation. Devices of the interrupted pass are replayed instead of
+    connected to, failed devices are connected to again unless 'retry_failed' is False.\n
+    Records:
+        {'record': 'output', 'ip_address', 'hostname', 'output'}, (written by 'discovery()' as each device finishes)\n
+        {'record': 'device', 'ip_address', 'device', 'output'}, (successful session)\n
+        {'record': 'failed', 'ip_address', 'device'}, (failed session)\n
+        {'record': 'pass', 'discovery_count', 'output_ips', 'routers_switches', 'failed_devices', 'mgmt_ips',
+        'known_hostnames', 'new_routers_switches'} (finished pass, state of next pass)
+
+    :param file: Journal file location
+    :param resume: Loads existing journal to replay instead of starting a new journal
+    """
+    def __init__(self, file, resume=False):
+        self.file = file
+        self.lock = Lock()
+        self.outputs = {}
+        """{ip_address: discovery() output} of devices finished within an interrupted pass"""
+        self.devices = {}
+        """{ip_address: {'device', 'output'}} of successful sessions"""
+        self.failed = {}
+        """{ip_address: failed device} of failed sessions"""
+        self.passes = []
+        """'pass' records of finished discovery passes in pass order"""
+        if resume and path.isfile(file):
+            with open(file) as journal_file:
+                for line in journal_file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Ignores partially written final line of interrupted run
+                        continue
+                    record_type = record['record']
+                    if record_type == 'output':
+                        self.outputs[record['ip_address']] = record['output']
+                    elif record_type == 'device':
+                        self.devices[record['ip_address']] = {'device': record['device'], 'output': record['output']}
+                    elif record_type == 'failed':
+                        self.failed[record['ip_address']] = record['device']
+                    elif record_type == 'pass':
+                        self.passes.append(record)
+        else:
+            open(file, 'w').close()
+
+    def write(self, record):
+        with self.lock:
+            with open(self.file, 'a') as journal_file:
+                journal_file.write(json.dumps(record, default=str) + '\n')
+
+    def write_output(self, ip_address, hostname, output):
+        self.write({'record': 'output', 'ip_address': ip_address, 'hostname': hostname, 'output': output})
+
+    def write_sessions(self, sessions):
+        """Journals successful and failed devices of 'AsyncSessions' results"""
+        for output in sessions.outputs:
+            ip_address = output['device']['ip_address']
+            self.devices[ip_address] = output
+            self.write({'record': 'device', 'ip_address': ip_address, 'device': output['device'],
+                        'output': output['output']})
+        for failed_device in sessions.failed_devices:
+            self.failed[failed_device['ip_address']] = failed_device
+            self.write({'record': 'failed', 'ip_address': failed_device['ip_address'], 'device': failed_device})
+
+    def write_pass(self, discovery_count, sessions, routers_switches, mgmt_ips, known_hostnames,
+                   new_routers_switches):
+        """Journals finished discovery pass and state of next pass
+
+        :param discovery_count: Finished discovery pass number
+        :param sessions: Session results of finished pass, successful devices are referenced by IP address since
+        their 'device' records are already journaled
+        :param routers_switches: 'RtSwSeperator().connection_parsed' of finished pass
+        :param mgmt_ips: IP addresses of next pass, empty when discovery is finished
+        :param known_hostnames: All known router and switch hostnames
+        :param new_routers_switches: Routers and switches discovered through CDP not yet connected to"""
+        self.write({
+            'record': 'pass',
+            'discovery_count': discovery_count,
+            'output_ips': [output['device']['ip_address'] for output in sessions.outputs],
+            'routers_switches': routers_switches,
+            'failed_devices': sessions.failed_devices,
+            'mgmt_ips': mgmt_ips,
+            'known_hostnames': list(known_hostnames),
+            'new_routers_switches': new_routers_switches
+        })
+
+    def replay(self, ip_addresses, retry_failed=True):
+        """Splits IP addresses into journaled results and IP addresses still needing connection
+
+        :param retry_failed: Journaled failed devices are connected to again instead of replayed as failed
+        :return: ReplayedSessions, list(remaining IP addresses)"""
+        outputs = []
+        failed_devices = []
+        remaining = []
+        for ip_address in ip_addresses:
+            if ip_address in self.devices:
+                outputs.append(self.devices[ip_address])
+            elif ip_address in self.failed and not retry_failed:
+                failed_devices.append(self.failed[ip_address])
+            else:
+                remaining.append(ip_address)
+        return ReplayedSessions(outputs, failed_devices), remaining
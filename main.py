@@ -1,22 +1,38 @@
-from gui import InventoryGui, inventory_save_folder_browse
-from inventory import InventoryDiscovery, merge_phone_discovery_cucm_export
-from parsers import output_to_spreadsheet
+import sys
 # PyInstaller bundle command:
 # pyinstaller -F --hidden-import PySimpleGUI,net_async --add-data templates;templates main.py
+# Running with command line arguments starts headless discovery, see 'cli.py'
 
 
 def main():
+    # GUI, discovery, and spreadsheet modules are imported only when GUI is used
+    from gui import InventoryGui, inventory_save_folder_browse
+    from cucm_join import CucmJoin
+    from inventory import InventoryDiscovery
+    from parsers import output_to_spreadsheet
+
     user_info = InventoryGui()
     if hasattr(user_info, 'mgmt_ips'):
-        inventory = InventoryDiscovery(
-            user_info.username, user_info.password, user_info.mgmt_ips, user_info.enable_pw, True)
         if hasattr(user_info, 'parsed_cucm_phones'):
-            merge_phone_discovery_cucm_export(inventory.phones, user_info.parsed_cucm_phones)
+            # Removes temporary CUCM index even if discovery fails
+            with user_info.parsed_cucm_phones:
+                inventory = InventoryDiscovery(
+                    user_info.username, user_info.password, user_info.mgmt_ips, user_info.enable_pw, True)
+                cucm_join = CucmJoin(inventory.phones, user_info.parsed_cucm_phones.records())
+                cucm_join.apply()
+        else:
+            inventory = InventoryDiscovery(
+                user_info.username, user_info.password, user_info.mgmt_ips, user_info.enable_pw, True)
+            cucm_join = None
         file_location = inventory_save_folder_browse()
         output_to_spreadsheet(
             inventory.routers_switches, inventory.phones, inventory.waps, inventory.others, inventory.failed_devices,
-            file_location)
+            file_location, cucm_join=cucm_join)
 
 
 if __name__ == '__main__':
-    main()
+    if len(sys.argv) > 1:
+        import cli
+        cli.main(sys.argv[1:])
+    else:
+        main()
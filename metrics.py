@@ -0,0 +1,129 @@
+from contextlib import contextmanager, nullcontext
+from threading import Lock
+import csv
+import math
+import json
+import time
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of sorted list"""
+    if len(sorted_values) == 0:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def phase_timer(metrics, phase, device=None):
+    """Returns 'DiscoveryMetrics.timer' context manager, or no-op context manager if metrics is None"""
+    if metrics is None:
+        return nullcontext()
+    return metrics.timer(phase, device)
+
+
+class DiscoveryMetrics:
+    """
+    Thread-safe timing samples of discovery phases per device and in aggregate, and event counters.\n
+    Phases:
+        'reachability', (TCP connect RTT of reachability precheck)\n
+        'connect', (asyncio session backend only)\n
+        'show cdp neighbor detail', 'show interface switchport', 'show mac address-table', (includes TextFSM parsing
+        with threads session backend)\n
+        'textfsm', (asyncio session backend only)\n
+        'cdp_parser',\n
+        'rt_sw_seperator', (per discovery pass)\n
+        'discovery_pass',\n
+        'full_discovery',\n
+        'spreadsheet',\n
+        'csv_export', 'parquet_export', 'arrow_export'\n
+    Counters:
+        'session_retry' (retries of devices missing from session results, backoff isn't timed)
+    """
+    def __init__(self):
+        self.samples = []
+        """[(device, phase, seconds)], device is None for non-device phases"""
+        self.counters = {}
+        """{counter: count}"""
+        self.lock = Lock()
+
+    def record(self, phase, seconds, device=None):
+        with self.lock:
+            self.samples.append((device, phase, seconds))
+
+    def increment(self, counter, count=1):
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + count
+
+    @contextmanager
+    def timer(self, phase, device=None):
+        """Records elapsed time of with block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start, device)
+
+    def summary(self):
+        """
+        :return: {phase: {'count', 'sum', 'p50', 'p95', 'p99', 'max'}}"""
+        phases = {}
+        with self.lock:
+            for _, phase, seconds in self.samples:
+                phases.setdefault(phase, []).append(seconds)
+        summary = {}
+        for phase, values in phases.items():
+            values.sort()
+            summary[phase] = {
+                'count': len(values),
+                'sum': sum(values),
+                'p50': percentile(values, 0.5),
+                'p95': percentile(values, 0.95),
+                'p99': percentile(values, 0.99),
+                'max': values[-1]
+            }
+        return summary
+
+    def devices(self):
+        """
+        :return: {device: {phase: seconds}}, seconds summed for repeated phases"""
+        devices = {}
+        with self.lock:
+            for device, phase, seconds in self.samples:
+                if device is not None:
+                    phases = devices.setdefault(device, {})
+                    phases[phase] = phases.get(phase, 0.0) + seconds
+        return devices
+
+    def to_json(self, file):
+        with open(file, 'w') as json_file:
+            json.dump({'summary': self.summary(), 'devices': self.devices(), 'counters': dict(self.counters)},
+                      json_file, indent=2)
+
+    def to_csv(self, file):
+        """Writes one row per sample"""
+        with self.lock:
+            samples = list(self.samples)
+        with open(file, 'w', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(['Device', 'Phase', 'Seconds'])
+            for device, phase, seconds in samples:
+                writer.writerow([device or '', phase, f'{seconds:.6f}'])
+
+    def to_prometheus(self):
+        """
+        :return: Prometheus text exposition format summary of phase durations"""
+        lines = ['# HELP netinventory_phase_seconds Duration of discovery phases',
+                 '# TYPE netinventory_phase_seconds summary']
+        for phase, stats in self.summary().items():
+            label = phase.replace('\\', '\\\\').replace('"', '\\"')
+            for quantile, key in [('0.5', 'p50'), ('0.95', 'p95'), ('0.99', 'p99')]:
+                lines.append(f'netinventory_phase_seconds{{phase="{label}",quantile="{quantile}"}} {stats[key]:.6f}')
+            lines.append(f'netinventory_phase_seconds_sum{{phase="{label}"}} {stats["sum"]:.6f}')
+            lines.append(f'netinventory_phase_seconds_count{{phase="{label}"}} {stats["count"]}')
+        lines += ['# HELP netinventory_events_total Count of discovery events',
+                  '# TYPE netinventory_events_total counter']
+        with self.lock:
+            counters = sorted(self.counters.items())
+        for counter, count in counters:
+            lines.append(f'netinventory_events_total{{event="{counter}"}} {count}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,90 @@
+from functools import lru_cache
+import re
+
+# Software version and platform normalization of CDP neighbor fields shared by 'CdpParser' neighbor parsers.
+# The same banners repeat across every neighbor of a network, so each raw string is normalized once and memoized.
+
+version_re = re.compile(r'Version((?:(?!Version)[^,])*)')
+"""Text following first 'Version' up to next 'Version' or comma, eg. ' 15.2(4)E10' from IOS banner"""
+phone_platform_prefix = 'Cisco IP Phone '
+memo_size = 4096
+"""Distinct raw strings memoized per normalizer"""
+
+
+def version_number(version, release=True):
+    """Strips version text following 'Version', eg. ' 15.2(4)E10' or ': 17.3.4.154'
+
+    :param release: Truncates at 'REL' of ', RELEASE SOFTWARE' suffix"""
+    if release:
+        version = version.split('REL')[0]
+    if ':' in version:
+        return version.replace(': ', '')
+    return version.replace(' ', '')
+
+
+@lru_cache(maxsize=memo_size)
+def router_sw_version(software_version):
+    """IOS, IOS-XE, and NX-OS router/switch version, eg. '16.12.4', unchanged if banner has no 'Version'"""
+    match = version_re.search(software_version)
+    if match is None:
+        return software_version
+    return version_number(match.group(1))
+
+
+@lru_cache(maxsize=memo_size)
+def wap_version(software_version):
+    """Access point version, eg. '15.3(3)JPJ7' or '17.3.4.154', unchanged if banner has no 'Version'"""
+    match = version_re.search(software_version)
+    if match is None:
+        return software_version
+    return version_number(match.group(1), release=False)
+
+
+@lru_cache(maxsize=memo_size)
+def other_version(software_version):
+    """Version of other device types. Comma seperated banners are parsed as router/switch banners, otherwise the
+    word following 'Version' or 'version' is the version."""
+    if ',' in software_version:
+        return router_sw_version(software_version)
+    for keyword in ('Version', 'version'):
+        if keyword in software_version:
+            words = software_version.split(' ')
+            for i, word in enumerate(words[:-1]):
+                if keyword in word:
+                    return words[i + 1]
+            return software_version
+    return software_version
+
+
+@lru_cache(maxsize=memo_size)
+def phone_version(software_version):
+    """Phone firmware load, eg. 'sip88xx.14-1-1-0001-136' from 'sip88xx.14-1-1-0001-136.loads'"""
+    return software_version.replace('.loads', '')
+
+
+@lru_cache(maxsize=memo_size)
+def platform_model(platform):
+    """Model without 'cisco ', or 'Cisco ' if platform has no 'cisco ', eg. 'WS-C3850-48P'"""
+    if 'cisco ' in platform:
+        return platform.replace('cisco ', '')
+    if 'Cisco ' in platform:
+        return platform.replace('Cisco ', '')
+    return platform
+
+
+@lru_cache(maxsize=memo_size)
+def phone_model(platform):
+    """Phone model, eg. '8845' from 'Cisco IP Phone 8845'"""
+    if phone_platform_prefix in platform:
+        return platform.replace(phone_platform_prefix, '')
+    return platform
+
+
+normalizers = {
+    'router_sw_version': router_sw_version,
+    'wap_version': wap_version,
+    'other_version': other_version,
+    'phone_version': phone_version,
+    'platform_model': platform_model,
+    'phone_model': phone_model
+}
@@ -1,14 +1,35 @@
 from exceptions import NoPhoneReportFound
 from net_async import multithread
+from normalize import router_sw_version, wap_version, other_version, phone_version, platform_model, phone_model
 from openpyxl import Workbook
-from openpyxl.worksheet.table import Table, TableStyleInfo
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
+import xlsx_writer
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import chain, islice
+from os import cpu_count
+import warnings
+import time
+import csv
 import re
 
+intf_prefix_re = re.compile(r'.{2}')
+"""Interface type abbreviation, eg. 'Gi' from 'GigabitEthernet1/0/1'"""
+intf_number_re = re.compile(r'\d.+')
+"""Interface number, eg. '1/0/1' from 'GigabitEthernet1/0/1'"""
+mac_quad_re = re.compile(r'.{4}')
+"""MAC address quads from phone hostname"""
+streaming_width_sample = 5000
+"""Rows per worksheet column widths are computed from with streaming spreadsheet output"""
+
 
 class CdpParser:
     """
     Parses outputs of commands: 'show cdp neighbor', 'show interface switchport', and 'show mac address-table'.
+
+    :param mode: 'sequential' parses neighbors in order within a single loop (default), 'thread' parses each neighbor
+    within its own thread, 'process' splits neighbors across worker processes for very large neighbor tables
+    :param processes: Worker process count for 'process' mode, defaults to CPU count
         Attributes:
             phones = []\n
             routers_switches = []\n
@@ -31,7 +52,7 @@ class CdpParser:
             }
     """
 
-    def __init__(self, cdp_neighbors, switchports, mac_addrs, session):
+    def __init__(self, cdp_neighbors, switchports, mac_addrs, session, mode='sequential', processes=None):
         nxos = False
         try:
             _ = cdp_neighbors[0]['destination_host']
@@ -48,6 +69,19 @@ class CdpParser:
         self.waps = []
         self.others = []
 
+        # Indexes switchports by interface and VLANs with MAC address entries once per device so each phone is a
+        # constant time lookup. Unparsed string output, eg. router without switchports or empty MAC address table, is
+        # left unindexed.
+        switchport_index = {}
+        """{interface: switchport}"""
+        if isinstance(switchports, list):
+            for switchport in switchports:
+                switchport_index.setdefault(switchport['interface'], switchport)
+        mac_vlans = set()
+        """VLANs present in MAC address table"""
+        if isinstance(mac_addrs, list):
+            mac_vlans = {mac_addr['vlan'] for mac_addr in mac_addrs}
+
         def phone_parse(neighbor):
             """Returns dictionary for CDP neighbor phone"""
             mgmt_ip = neighbor[mgmt_ip_s]
@@ -59,23 +93,15 @@ class CdpParser:
                 if mgmt_ip == '':
                     mgmt_ip = neighbor['interface_ip']
             l_intf = neighbor['local_port']
-            intf = re.findall(r'.{2}', l_intf)[0] + re.findall(r'\d.+', l_intf)[0]
-            macreg = re.findall(r'.{4}', hostname.replace('SEP', ''))
+            intf = intf_prefix_re.findall(l_intf)[0] + intf_number_re.findall(l_intf)[0]
+            macreg = mac_quad_re.findall(hostname.replace('SEP', ''))
             mac_address = f'{macreg[0]}.{macreg[1]}.{macreg[2]}'.lower()
             voice_vlan = 'None'
-            software_version = neighbor[version_s].replace('.loads', '')
-            platform = neighbor['platform']
-            for switchport in switchports:
-                if switchport['interface'] == intf:
-                    for mac_addr in mac_addrs:
-                        if mac_addr['vlan'] == switchport['voice_vlan']:
-                            voice_vlan = mac_addr['vlan']
-                            break
-                    break
-            if platform.__contains__('Cisco IP Phone'):
-                platform = neighbor['platform'].replace('Cisco IP Phone ', '')
-            else:
-                platform = neighbor['platform']
+            software_version = phone_version(neighbor[version_s])
+            platform = phone_model(neighbor['platform'])
+            switchport = switchport_index.get(intf)
+            if switchport is not None and switchport['voice_vlan'] in mac_vlans:
+                voice_vlan = switchport['voice_vlan']
             phone = {
                 'hostname': hostname,
                 'neighbor': {
@@ -103,22 +129,8 @@ class CdpParser:
                     hostname = sysname
                 if mgmt_ip == '':
                     mgmt_ip = neighbor['interface_ip']
-            software_version = neighbor[version_s]
-            platform = neighbor['platform']
-            for software in software_version.split(','):
-                if software.__contains__('Version'):
-                    software_version = software.split('Version')[1].split('REL')[0]
-                    if software_version.__contains__(':'):
-                        software_version = software_version.replace(': ', '')
-                    else:
-                        software_version = software_version.replace(' ', '')
-                    break
-            if platform.__contains__('cisco '):
-                platform = neighbor['platform'].replace('cisco ', '')
-            elif platform.__contains__('Cisco '):
-                platform = neighbor['platform'].replace('Cisco ', '')
-            else:
-                platform = neighbor['platform']
+            software_version = router_sw_version(neighbor[version_s])
+            platform = platform_model(neighbor['platform'])
             router_sw = {
                 'hostname': hostname,
                 'ip_address': mgmt_ip,
@@ -139,22 +151,8 @@ class CdpParser:
                     hostname = sysname
                 if mgmt_ip == '':
                     mgmt_ip = neighbor['interface_ip']
-            software_version = neighbor[version_s]
-            platform = neighbor['platform']
-            for software in software_version.split(','):
-                if software.__contains__('Version'):
-                    software_version = software.split('Version')[1]
-                    if software_version.__contains__(':'):
-                        software_version = software_version.replace(': ', '')
-                    else:
-                        software_version = software_version.replace(' ', '')
-                    break
-            if platform.__contains__('cisco '):
-                platform = neighbor['platform'].replace('cisco ', '')
-            elif platform.__contains__('Cisco '):
-                platform = neighbor['platform'].replace('Cisco ', '')
-            else:
-                platform = neighbor['platform']
+            software_version = wap_version(neighbor[version_s])
+            platform = platform_model(neighbor['platform'])
             ap = {
                 'hostname': hostname,
                 'ip_address': mgmt_ip,
@@ -178,41 +176,8 @@ class CdpParser:
                     hostname = sysname
                 if mgmt_ip == '':
                     mgmt_ip = neighbor['interface_ip']
-            software_version = neighbor[version_s]
-            if software_version.__contains__(','):
-                for software in software_version.split(','):
-                    if software.__contains__('Version'):
-                        software_version = software.split('Version')[1].split('REL')[0]
-                        if software_version.__contains__(':'):
-                            software_version = software_version.replace(': ', '')
-                        else:
-                            software_version = software_version.replace(' ', '')
-                        break
-            elif software_version.__contains__('Version'):
-                found_1 = False
-                for x in software_version.split(' '):
-                    if x.__contains__('Version'):
-                        found_1 = True
-                        continue
-                    if found_1:
-                        software_version = x
-                        break
-            elif software_version.__contains__('version'):
-                found_1 = False
-                for x in software_version.split(' '):
-                    if x.__contains__('version'):
-                        found_1 = True
-                        continue
-                    if found_1:
-                        software_version = x
-                        break
-            platform = neighbor['platform']
-            if platform.__contains__('cisco '):
-                platform = neighbor['platform'].replace('cisco ', '')
-            elif platform.__contains__('Cisco '):
-                platform = neighbor['platform'].replace('Cisco ', '')
-            else:
-                platform = neighbor['platform']
+            software_version = other_version(neighbor[version_s])
+            platform = platform_model(neighbor['platform'])
             other = {
                 'hostname': hostname,
                 'ip_address': mgmt_ip,
@@ -240,7 +205,124 @@ class CdpParser:
             else:
                 other_parse(n)
 
-        multithread(parse, cdp_neighbors)
+        def process_parse():
+            """Splits CDP neighbors into chunks parsed within worker processes and joins results in neighbor order"""
+            chunk_count = processes or cpu_count() or 1
+            chunk_size = -(-len(cdp_neighbors) // chunk_count)
+            chunks = [cdp_neighbors[i:i + chunk_size] for i in range(0, len(cdp_neighbors), chunk_size)]
+            # Only sends fields used by 'phone_parse' to worker processes
+            reduced_switchports = [{'interface': intf, 'voice_vlan': switchport['voice_vlan']}
+                                   for intf, switchport in switchport_index.items()]
+            reduced_mac_addrs = [{'vlan': vlan} for vlan in mac_vlans]
+            session_info = SessionInfo(session.hostname, session.ip_address)
+            with ProcessPoolExecutor(processes) as executor:
+                results = executor.map(
+                    cdp_parse_chunk, chunks, [reduced_switchports] * len(chunks), [reduced_mac_addrs] * len(chunks),
+                    [session_info] * len(chunks))
+                for phones, routers_switches, waps, others in results:
+                    self.phones += phones
+                    self.routers_switches += routers_switches
+                    self.waps += waps
+                    self.others += others
+
+        if mode == 'sequential':
+            for cdp_neighbor in cdp_neighbors:
+                parse(cdp_neighbor)
+        elif mode == 'thread':
+            multithread(parse, cdp_neighbors)
+        elif mode == 'process':
+            process_parse()
+        else:
+            raise ValueError(f'Invalid CdpParser mode: {mode}')
+
+
+def targeted_mac_commands(cdp_neighbors, switchports):
+    """Returns 'show mac address-table vlan <voice_vlan>' commands for voice VLANs of switchports with CDP neighbor
+    phones. Empty list if device has no phone neighbors."""
+    if isinstance(cdp_neighbors, str) or isinstance(switchports, str) or len(cdp_neighbors) == 0:
+        return []
+    voice_vlans = {switchport['interface']: switchport['voice_vlan'] for switchport in reversed(switchports)}
+    commands = []
+    for neighbor in cdp_neighbors:
+        if neighbor['platform'].__contains__('IP Phone') or neighbor['capabilities'].__contains__('Phone'):
+            l_intf = neighbor['local_port']
+            intf = intf_prefix_re.findall(l_intf)[0] + intf_number_re.findall(l_intf)[0]
+            voice_vlan = voice_vlans.get(intf, '')
+            if voice_vlan.isdigit():
+                command = f'show mac address-table vlan {voice_vlan}'
+                if command not in commands:
+                    commands.append(command)
+    return commands
+
+
+class SessionInfo:
+    """Picklable stand-in for session providing 'hostname' and 'ip_address' to 'CdpParser' in worker processes"""
+    def __init__(self, hostname, ip_address):
+        self.hostname = hostname
+        self.ip_address = ip_address
+
+
+def cdp_parse_chunk(cdp_neighbors, switchports, mac_addrs, session):
+    """Runs sequential 'CdpParser' within worker process
+
+    :return: phones, routers_switches, waps, others"""
+    cdp_parser = CdpParser(cdp_neighbors, switchports, mac_addrs, session)
+    return cdp_parser.phones, cdp_parser.routers_switches, cdp_parser.waps, cdp_parser.others
+
+
+cucm_export_fields = ['Description', 'Device Name', 'Directory Number 1']
+"""CUCM phone report fields, positions used when export has no header row"""
+directory_number_re = re.compile(r'DIRECTORY NUMBER (\d+)')
+"""Line directory number header, eg. 'DIRECTORY NUMBER 2'"""
+
+
+def cucm_export_records(file):
+    """Streams CUCM phone report through csv reader, handling quoted commas within descriptions. Columns are found
+    by case insensitive header row names, otherwise 'cucm_export_fields' positions are used.
+
+    :return: Generator of {'device_name', 'description', 'directory_number', (line 1)
+        'line_numbers', (list of line 2-N directory numbers)
+        'device_pool',
+        'model'} (CUCM 'Device Type' or 'Model' field)"""
+    try:
+        phonelist_csv = open(file, newline='', encoding='utf-8-sig', errors='replace')
+    except FileNotFoundError:
+        raise NoPhoneReportFound('No phone report file found at provided location.')
+    with phonelist_csv:
+        reader = csv.reader(phonelist_csv)
+        columns = {'description': 0, 'device_name': 1, 'directory_number': 2, 'device_pool': None, 'model': None}
+        """Positions of record fields"""
+        line_columns = []
+        """Positions of line 2-N directory numbers in line order"""
+
+        def value(row, column):
+            return row[column] if column is not None and column < len(row) else ''
+
+        for row in reader:
+            if reader.line_num == 1:
+                header = [field.strip().upper() for field in row]
+                if 'DEVICE NAME' in header:
+                    for key, fields in (('description', ['DESCRIPTION']), ('device_name', ['DEVICE NAME']),
+                                        ('directory_number', ['DIRECTORY NUMBER 1']),
+                                        ('device_pool', ['DEVICE POOL']), ('model', ['DEVICE TYPE', 'MODEL'])):
+                        columns[key] = next((header.index(field) for field in fields if field in header), None)
+                    lines = []
+                    for column, field in enumerate(header):
+                        match = directory_number_re.fullmatch(field)
+                        if match is not None and match.group(1) != '1':
+                            lines.append((int(match.group(1)), column))
+                    line_columns = [column for _, column in sorted(lines)]
+                    continue
+            device_name = value(row, columns['device_name'])
+            if device_name != '':
+                yield {
+                    'device_name': device_name.upper(),
+                    'description': value(row, columns['description']),
+                    'directory_number': value(row, columns['directory_number']),
+                    'line_numbers': [value(row, column) for column in line_columns if value(row, column) != ''],
+                    'device_pool': value(row, columns['device_pool']),
+                    'model': value(row, columns['model'])
+                }
 
 
 def cucm_export_parse(file):
@@ -248,167 +330,260 @@ def cucm_export_parse(file):
 
     :returns:  {'SEP000000000000': {'description', 'directory_number'}}"""
     phones = {}
-    while True:
-        try:
-            with open(file) as phonelist_csv:
-                for line in phonelist_csv:
-                    if not line.__contains__('Description,Device Name,Directory Number 1'):
-                        info = line.split(',')
-                        device_name = info[1]
-                        description = info[0]
-                        directory_number = info[2]
-                        phones[device_name.upper()] = {
-                            'description': description,
-                            'directory_number': directory_number
-                        }
-            return phones
-        except FileNotFoundError:
-            raise NoPhoneReportFound('No phone report file found at provided location.')
-
-
-def output_to_spreadsheet(routers_switches, phones, aps, others, failed_devices, file_location):
-    """Parses device lists and outputs to spreadsheet"""
-    # Creates Excel workbook and worksheets
-    wb = Workbook()
-    routers_switches_ws = wb.active
-    routers_switches_ws.title = 'Routers_Switches'
-    phones_ws = wb.create_sheet('Phones')
-    aps_ws = wb.create_sheet('APs')
-    others_ws = wb.create_sheet('Others')
-    failed_ws = wb.create_sheet('Failed')
-
-    alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
-
-    # Checks if phones contain directory number and description from CUCM export merge
-    if any('description' in phone for phone in phones):
-        phone_string = 'CUCMPhone'
+    for record in cucm_export_records(file):
+        phones[record['device_name']] = {
+            'description': record['description'],
+            'directory_number': record['directory_number']
+        }
+    return phones
+
+
+
+sheet_titles = ['Routers_Switches', 'Phones', 'APs', 'Others', 'Failed']
+"""Worksheet titles in workbook order"""
+cucm_join_titles = ['CUCM_Not_Discovered', 'Phones_Not_In_CUCM']
+"""Worksheet titles of 'CucmJoin' report sheets following 'sheet_titles'"""
+phone_device_types = ('Phone', 'CUCMPhone', 'CUCMJoinedPhone', 'NotInCUCM')
+
+
+def phone_device_type(phones):
+    """Returns 'CUCMJoinedPhone' if phones contain 'CucmJoin' fields, 'CUCMPhone' if phones contain directory number
+    and description from CUCM export merge, otherwise 'Phone'"""
+    if any('device_pool' in phone for phone in phones):
+        return 'CUCMJoinedPhone'
+    elif any('description' in phone for phone in phones):
+        return 'CUCMPhone'
     else:
-        phone_string = 'Phone'
+        return 'Phone'
+
 
+def rt_sw_neighbor_count(routers_switches):
+    """Returns length of longest neighbor list of failed connection routers and switches, minimum 1"""
     neighbor_count = 1
-    # Sets 'neighbor_count' to length of longest neighbor list in routers_switches dictionaries
     for rt_sw in routers_switches:
         if rt_sw['connection_attempt'] == 'Failed':
             if len(rt_sw['neighbors']) > neighbor_count:
                 neighbor_count = len(rt_sw['neighbors'])
+    return neighbor_count
 
-    def write_header(worksheet, device_type):
-        """
-        :param device_type: 'RouterSwitch', 'Phone', 'CUCMPhone', 'WAP', 'Other', or 'Failed'
-        :param worksheet: Device worksheet
-        :return: int(header_length), list(header)
-        """
-        header = ['Hostname', 'IP Address', 'Model', 'Software Version']
-        if device_type == 'RouterSwitch':
-            header += ['Serial', 'Connection Type', 'ROMMON', 'Connection Attempt', 'Discovery Status']
-            for n in range(1, neighbor_count + 1):
-                header += [f'Neighbor {n} Hostname', f'Neighbor {n} IP Address', f'Local Interface to Neighbor {n}',
-                           f'Neighbor {n} Interface']
-        elif device_type == 'Phone' or device_type == 'CUCMPhone':
-            header += ['Voice VLAN', 'MAC Address', 'Switch Hostname', 'Switch IP Address', 'Switchport']
-            if device_type == 'CUCMPhone':
-                header += ['Description', 'Main Directory Number']
-        elif device_type == 'WAP':
-            header += ['Switch Hostname', 'Switch IP Address', 'Switchport']
-        elif device_type == 'Other':
-            header += ['Neighbor  Hostname', 'Neighbor IP Address', 'Local Interface to Neighbor', 'Neighbor Interface']
-        elif device_type == 'Failed':
-            header = ['IP Address', 'Connection Type', 'Device Type', 'Connectivity', 'Authentication',
-                      'Authorization', 'Discovery Status', 'Connection Exception']
-        worksheet.append(header)
-        return len(header), header
-
-    def write_to_sheet(device_list, worksheet, device_type):
-        """
-        :param device_type: 'RouterSwitch', 'Phone', 'CUCMPhone', 'WAP', 'Other', or 'Failed'
-        :param device_list: List of devices
-        :param worksheet: Device worksheet
-        :return: list(rows)
-        """
-        rows = []
-        for device in device_list:
-            if device_type != 'Failed':
-                row = [device['hostname'], device['ip_address'], device['model'], device['software_version']]
-                if device_type == 'RouterSwitch':
-                    if 'serial' in device:
-                        serial = device['serial']
-                        connection_type = device['connection_type']
-                        rommon = device['rommon']
-                    else:
-                        serial = 'Unknown'
-                        connection_type = 'Unknown'
-                        rommon = 'Unknown'
-                    row += [serial, connection_type, rommon, device['connection_attempt'], device['discovery_status']]
-                    if device['connection_attempt'] == 'Failed':
-                        for neighbor in device['neighbors']:
-                            row += [neighbor['hostname'], neighbor['ip_address'], neighbor['local_intf'],
-                                    neighbor['remote_intf']]
-                if device_type == 'Phone' or device_type == 'CUCMPhone':
-                    neighbor = device['neighbor']
-                    row += [device['voice_vlan'], device['mac_addr'], neighbor['hostname'], neighbor['ip_address'],
-                            neighbor['remote_intf']]
-                    if 'description' in device:
-                        row += [device['description'], device['directory_number']]
-                if device_type == 'WAP' or device_type == 'Other':
-                    neighbor = device['neighbor']
-                    row += [neighbor['hostname'], neighbor['ip_address'], neighbor['remote_intf']]
-                    if device_type == 'Other':
-                        row.append(neighbor['local_intf'])
-            else:
-                row = [device['ip_address'], device['connection_type'], device['device_type'], device['connectivity'],
-                       device['authentication'], device['authorization'], device['discovery_status'],
-                       device['exception']]
-            worksheet.append(row)
-            rows.append(row)
-        return rows
+
+def spreadsheet_header(device_type, neighbor_count=1):
+    """
+    :param device_type: 'RouterSwitch', 'Phone', 'CUCMPhone', 'CUCMJoinedPhone', 'NotInCUCM', 'WAP', 'Other',
+    'Failed', or 'CUCMOnly'
+    :param neighbor_count: Neighbor column groups on 'RouterSwitch' sheet
+    :return: list(header)
+    """
+    if device_type == 'CUCMOnly':
+        return ['Device Name', 'Description', 'Main Directory Number', 'Line 2-N Directory Numbers', 'Device Pool',
+                'Model']
+    header = ['Hostname', 'IP Address', 'Model', 'Software Version']
+    if device_type == 'RouterSwitch':
+        header += ['Serial', 'Connection Type', 'ROMMON', 'Connection Attempt', 'Discovery Status']
+        for n in range(1, neighbor_count + 1):
+            header += [f'Neighbor {n} Hostname', f'Neighbor {n} IP Address', f'Local Interface to Neighbor {n}',
+                       f'Neighbor {n} Interface']
+    elif device_type in phone_device_types:
+        header += ['Voice VLAN', 'MAC Address', 'Switch Hostname', 'Switch IP Address', 'Switchport']
+        if device_type == 'CUCMPhone' or device_type == 'CUCMJoinedPhone':
+            header += ['Description', 'Main Directory Number']
+        if device_type == 'CUCMJoinedPhone':
+            header += ['Line 2-N Directory Numbers', 'Device Pool', 'CUCM Model']
+    elif device_type == 'WAP':
+        header += ['Switch Hostname', 'Switch IP Address', 'Switchport']
+    elif device_type == 'Other':
+        header += ['Neighbor  Hostname', 'Neighbor IP Address', 'Local Interface to Neighbor', 'Neighbor Interface']
+    elif device_type == 'Failed':
+        header = ['IP Address', 'Connection Type', 'Device Type', 'Connectivity', 'Authentication',
+                  'Authorization', 'Discovery Status', 'Connection Exception', 'Session Retries']
+    return header
+
+
+def spreadsheet_rows(device_list, device_type, neighbors=True):
+    """Yields worksheet row for each device
+
+    :param device_type: 'RouterSwitch', 'Phone', 'CUCMPhone', 'CUCMJoinedPhone', 'NotInCUCM', 'WAP', 'Other',
+    'Failed', or 'CUCMOnly'
+    :param device_list: List of devices, 'cucm_export_records()' records for 'CUCMOnly'
+    :param neighbors: Appends 'Neighbor N' columns to rows of failed connection routers and switches
+    """
+    for device in device_list:
+        if device_type == 'CUCMOnly':
+            row = [device['device_name'], device['description'], device['directory_number'],
+                   ', '.join(device['line_numbers']), device['device_pool'], device['model']]
+        elif device_type != 'Failed':
+            row = [device['hostname'], device['ip_address'], device['model'], device['software_version']]
+            if device_type == 'RouterSwitch':
+                if 'serial' in device:
+                    serial = device['serial']
+                    connection_type = device['connection_type']
+                    rommon = device['rommon']
+                else:
+                    serial = 'Unknown'
+                    connection_type = 'Unknown'
+                    rommon = 'Unknown'
+                row += [serial, connection_type, rommon, device['connection_attempt'], device['discovery_status']]
+                if neighbors and device['connection_attempt'] == 'Failed':
+                    for neighbor in device['neighbors']:
+                        row += [neighbor['hostname'], neighbor['ip_address'], neighbor['local_intf'],
+                                neighbor['remote_intf']]
+            if device_type in phone_device_types:
+                neighbor = device['neighbor']
+                row += [device['voice_vlan'], device['mac_addr'], neighbor['hostname'], neighbor['ip_address'],
+                        neighbor['remote_intf']]
+                if 'description' in device:
+                    row += [device['description'], device['directory_number']]
+                if 'device_pool' in device:
+                    row += [', '.join(device['line_numbers']), device['device_pool'], device['cucm_model']]
+            if device_type == 'WAP' or device_type == 'Other':
+                neighbor = device['neighbor']
+                row += [neighbor['hostname'], neighbor['ip_address'], neighbor['remote_intf']]
+                if device_type == 'Other':
+                    row.append(neighbor['local_intf'])
+        else:
+            row = [device['ip_address'], device['connection_type'], device['device_type'], device['connectivity'],
+                   device['authentication'], device['authorization'], device['discovery_status'],
+                   device['exception'], device.get('session_retries', 0)]
+        yield row
+
+
+def update_column_widths(column_widths, row):
+    """Widens 'column_widths' to fit cells of row"""
+    for i, cell in enumerate(row):
+        if len(column_widths) > i:
+            if len(str(cell)) > column_widths[i]:
+                column_widths[i] = len(str(cell))
+        else:
+            column_widths.append(len(str(cell)))
+
+
+def render_sheet(device_list, device_type, neighbor_count, table_id):
+    """Renders worksheet and table XML of device list within worker process for 'parallel' spreadsheet output
+
+    :return: sheet_xml, table_xml (None if device list is empty)"""
+    header = spreadsheet_header(device_type, neighbor_count)
+    column_widths = []
+    update_column_widths(column_widths, header)
+    rows = [xlsx_writer.row_xml(1, header)]
+    for row_num, row in enumerate(spreadsheet_rows(device_list, device_type), 2):
+        update_column_widths(column_widths, row)
+        rows.append(xlsx_writer.row_xml(row_num, row))
+    if len(device_list) != 0:
+        ref = f'A1:{xlsx_writer.column_letters(len(header) - 1)}{len(device_list) + 1}'
+        table_xml = xlsx_writer.table_xml(table_id, device_type, ref, header)
+    else:
+        table_xml = None
+    sheet_xml = xlsx_writer.sheet_xml([width + 3 for width in column_widths], rows, table_xml is not None)
+    return sheet_xml, table_xml
+
+
+def table_columns(header):
+    """Returns table columns named from header, write-only worksheets can't read header cells back to name table
+    columns"""
+    return [TableColumn(id=i, name=str(heading)) for i, heading in enumerate(header, 1)]
+
+
+def add_table(worksheet, table):
+    """Adds table with columns from 'table_columns()' to worksheet. openpyxl warns on every write-only worksheet
+    table, even with columns added, so the warning is suppressed."""
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', 'In write-only mode you must add table columns manually')
+        worksheet.add_table(table)
+
+
+def output_to_spreadsheet(routers_switches, phones, aps, others, failed_devices, file_location, streaming=False,
+                          metrics=None, parallel=False, processes=None, cucm_join=None):
+    """Parses device lists and outputs to spreadsheet
+
+    :param streaming: Writes rows through openpyxl write-only worksheets so rows aren't held in memory. Column widths
+    are computed from the first 'streaming_width_sample' rows of each worksheet.
+    :param metrics: 'DiscoveryMetrics' recording 'spreadsheet' write time
+    :param parallel: Renders each worksheet's rows and table XML within separate worker processes and assembles the
+    xlsx package directly, producing the same sheets, tables, styles, and column widths
+    :param processes: Worker process count for 'parallel', defaults to CPU count
+    :param cucm_join: 'CucmJoin' adding sheets of CUCM phones not discovered and discovered phones not in CUCM"""
+    start_time = time.perf_counter()
+    date_time = datetime.now().strftime('%m_%d_%Y-%H_%M_%S')
+    file = f'{file_location}/network_inventory-{date_time}-.xlsx'
+
+    phone_string = phone_device_type(phones)
+    neighbor_count = rt_sw_neighbor_count(routers_switches)
+    sheets = [
+        (routers_switches, 'RouterSwitch'),
+        (phones, phone_string),
+        (aps, 'WAP'),
+        (others, 'Other'),
+        (failed_devices, 'Failed')
+    ]
+    titles = list(sheet_titles)
+    if cucm_join is not None:
+        sheets += [(cucm_join.cucm_only, 'CUCMOnly'), (cucm_join.discovered_only, 'NotInCUCM')]
+        titles += cucm_join_titles
+
+    if parallel:
+        with ProcessPoolExecutor(processes) as executor:
+            rendered = executor.map(
+                render_sheet, [device_list for device_list, _ in sheets], [device_type for _, device_type in sheets],
+                [neighbor_count] * len(sheets), range(1, len(sheets) + 1))
+            xlsx_writer.write_package(file, [
+                (title, sheet_xml, table_xml) for title, (sheet_xml, table_xml) in zip(titles, rendered)])
+        if metrics is not None:
+            metrics.record('spreadsheet', time.perf_counter() - start_time)
+        return
+
+    # Creates Excel workbook and worksheets
+    if streaming:
+        wb = Workbook(write_only=True)
+        routers_switches_ws = wb.create_sheet(titles[0])
+    else:
+        wb = Workbook()
+        routers_switches_ws = wb.active
+        routers_switches_ws.title = titles[0]
+    worksheets = [routers_switches_ws] + [wb.create_sheet(title) for title in titles[1:]]
+
+    def set_column_widths(worksheet, column_widths):
+        """Sets worksheet column widths"""
+        for i, column_width in enumerate(column_widths):
+            worksheet.column_dimensions[xlsx_writer.column_letters(i)].width = column_width + 3
 
     def complete_sheet(device_list, worksheet, device_type):
         """Completes workbook sheet"""
         column_num = len(device_list) + 1
-        header_out = write_header(worksheet, device_type)
-        header = header_out[1]
-        header_length = header_out[0]
-        letter = header_length - 1
-        if letter > 25:
-            column_letter = f'{alphabet[int(letter / 26) - 1]}{alphabet[letter % 26]}'
+        header = spreadsheet_header(device_type, neighbor_count)
+        bottom_right_cell = f'{xlsx_writer.column_letters(len(header) - 1)}{column_num}'
+        column_widths = []
+        update_column_widths(column_widths, header)
+
+        if streaming:
+            # Write-only worksheets require column widths before first row is written, widths are computed from a
+            # bounded sample of rows held until widths are set so rows are only generated once
+            rows = spreadsheet_rows(device_list, device_type)
+            sample_rows = list(islice(rows, streaming_width_sample))
+            for row in sample_rows:
+                update_column_widths(column_widths, row)
+            set_column_widths(worksheet, column_widths)
+            worksheet.append(header)
+            for row in chain(sample_rows, rows):
+                worksheet.append(row)
         else:
-            column_letter = alphabet[letter]
-        bottom_right_cell = f'{column_letter}{column_num}'
-        rows = write_to_sheet(device_list, worksheet, device_type)
+            worksheet.append(header)
+            for row in spreadsheet_rows(device_list, device_type):
+                worksheet.append(row)
+                update_column_widths(column_widths, row)
+            set_column_widths(worksheet, column_widths)
 
         # Creates table if there is data in table
         if len(device_list) != 0:
-            table = Table(displayName=device_type, ref=f'A1:{bottom_right_cell}')
+            table = Table(displayName=device_type, ref=f'A1:{bottom_right_cell}', tableColumns=table_columns(header))
             style = TableStyleInfo(name='TableStyleMedium9', showFirstColumn=False, showLastColumn=False,
                                    showRowStripes=True, showColumnStripes=True)
             table.tableStyleInfo = style
-            worksheet.add_table(table)
+            add_table(worksheet, table)
 
-        # Sets column widths
-        all_data = [header]
-        all_data += rows
-        column_widths = []
-        for row in all_data:
-            for i, cell in enumerate(row):
-                if len(column_widths) > i:
-                    if len(str(cell)) > column_widths[i]:
-                        column_widths[i] = len(str(cell))
-                else:
-                    column_widths += [len(str(cell))]
-
-        for i, column_width in enumerate(column_widths):
-            if i > 25:
-                l1 = f'{alphabet[int(i / 26) - 1]}{alphabet[i % 26]}'
-            else:
-                l1 = alphabet[i]
-            worksheet.column_dimensions[l1].width = column_width + 3
-
-    complete_sheet(routers_switches, routers_switches_ws, 'RouterSwitch')
-    complete_sheet(phones, phones_ws, phone_string)
-    complete_sheet(aps, aps_ws, 'WAP')
-    complete_sheet(others, others_ws, 'Other')
-    complete_sheet(failed_devices, failed_ws, 'Failed')
+    for (device_list, device_type), worksheet in zip(sheets, worksheets):
+        complete_sheet(device_list, worksheet, device_type)
 
     # Saves workbook
-    date_time = datetime.now().strftime('%m_%d_%Y-%H_%M_%S')
-    wb.save(f'{file_location}/network_inventory-{date_time}-.xlsx')
+    wb.save(file)
+    if metrics is not None:
+        metrics.record('spreadsheet', time.perf_counter() - start_time)
@@ -0,0 +1,131 @@
+from ipaddress import ip_network
+from threading import Lock
+import asyncio
+import time
+
+
+class ReachabilityPrecheck:
+    """
+    Concurrent TCP connect precheck of SSH and TELNET ports run before device sessions, so unreachable IP addresses
+    fail fast instead of waiting on full SSH then TELNET session timeouts.\n
+    Connect timeouts adapt per subnet from a smoothed RTT and RTT deviation, updated as exponentially weighted moving
+    averages of observed round trip times like TCP retransmission timeouts, so timeouts also shrink after slow outliers.
+    Learned RTTs are kept across discovery passes.
+
+    :param ports: TCP ports checked concurrently, reachable if any port accepts a connection
+    :param timeout: Connect timeout in seconds for subnets without observed RTTs
+    :param min_timeout: Minimum adaptive connect timeout in seconds
+    :param max_timeout: Maximum adaptive connect timeout in seconds
+    :param deviation_multiplier: Adaptive timeout is smoothed subnet RTT plus RTT deviation times multiplier
+    :param rtt_gain: Weight of each observed RTT in smoothed subnet RTT
+    :param deviation_gain: Weight of each observed RTT's deviation in subnet RTT deviation
+    :param prefix_length: IPv4 prefix length grouping IP addresses into subnets
+    :param max_concurrency: Maximum concurrent connection attempts
+    :param metrics: 'DiscoveryMetrics' recording 'reachability' RTT of each reachable device
+    """
+    def __init__(self, ports=(22, 23), timeout=1.0, min_timeout=0.25, max_timeout=5.0, deviation_multiplier=4,
+                 rtt_gain=0.125, deviation_gain=0.25, prefix_length=24, max_concurrency=1000, metrics=None):
+        self.ports = ports
+        self.timeout = timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.deviation_multiplier = deviation_multiplier
+        self.rtt_gain = rtt_gain
+        self.deviation_gain = deviation_gain
+        self.prefix_length = prefix_length
+        self.max_concurrency = max_concurrency
+        self.metrics = metrics
+        self.subnet_rtts = {}
+        """{subnet: (smoothed RTT, RTT deviation)}"""
+        self.lock = Lock()
+
+    def subnet(self, ip_address):
+        try:
+            return str(ip_network(f'{ip_address}/{self.prefix_length}', strict=False))
+        except ValueError:
+            return ip_address
+
+    def subnet_timeout(self, ip_address):
+        """Returns connect timeout of IP address from its subnet's observed RTTs"""
+        with self.lock:
+            estimate = self.subnet_rtts.get(self.subnet(ip_address))
+        if estimate is None:
+            return self.timeout
+        smoothed_rtt, deviation = estimate
+        return min(max(smoothed_rtt + self.deviation_multiplier * deviation, self.min_timeout), self.max_timeout)
+
+    def observe(self, ip_address, rtt):
+        """Updates smoothed RTT and RTT deviation of IP address's subnet, the first RTT seeds deviation as half RTT"""
+        subnet = self.subnet(ip_address)
+        with self.lock:
+            estimate = self.subnet_rtts.get(subnet)
+            if estimate is None:
+                self.subnet_rtts[subnet] = (rtt, rtt / 2)
+            else:
+                smoothed_rtt, deviation = estimate
+                deviation += self.deviation_gain * (abs(smoothed_rtt - rtt) - deviation)
+                smoothed_rtt += self.rtt_gain * (rtt - smoothed_rtt)
+                self.subnet_rtts[subnet] = (smoothed_rtt, deviation)
+        if self.metrics is not None:
+            self.metrics.record('reachability', rtt, ip_address)
+
+    async def connect(self, ip_address, port, timeout):
+        """Opens and closes TCP connection
+
+        :return: Bool of connection accepted"""
+        start = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(ip_address, port), timeout)
+        except ConnectionRefusedError:
+            # Host responded, RTT is still usable for the subnet's timeout
+            self.observe(ip_address, time.perf_counter() - start)
+            return False
+        except (asyncio.TimeoutError, OSError):
+            return False
+        self.observe(ip_address, time.perf_counter() - start)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+    async def reachable(self, semaphore, ip_address):
+        """Checks ports concurrently, returning as soon as any port accepts a connection"""
+        async with semaphore:
+            timeout = self.subnet_timeout(ip_address)
+            attempts = [asyncio.ensure_future(self.connect(ip_address, port, timeout)) for port in self.ports]
+            try:
+                for attempt in asyncio.as_completed(attempts):
+                    if await attempt:
+                        return True
+                return False
+            finally:
+                for attempt in attempts:
+                    attempt.cancel()
+
+    def check(self, ip_addresses):
+        """Prechecks IP addresses
+
+        :return: list(reachable IP addresses), list(failed devices of unreachable IP addresses)"""
+        async def run():
+            semaphore = asyncio.BoundedSemaphore(self.max_concurrency)
+            return await asyncio.gather(*[self.reachable(semaphore, ip_address) for ip_address in ip_addresses])
+
+        reachable_ips = []
+        failed_devices = []
+        for ip_address, reachable in zip(ip_addresses, asyncio.run(run())):
+            if reachable:
+                reachable_ips.append(ip_address)
+            else:
+                failed_devices.append({
+                    'ip_address': ip_address,
+                    'connection_type': 'Unknown',
+                    'device_type': 'Unknown',
+                    'connectivity': False,
+                    'authentication': False,
+                    'authorization': False,
+                    'exception': f'No response on TCP ports {", ".join(str(port) for port in self.ports)} '
+                                 f'within reachability precheck'
+                })
+        return reachable_ips, failed_devices
@@ -0,0 +1,108 @@
+import sys
+
+interned_fields = frozenset({'model', 'software_version', 'voice_vlan', 'discovery_status', 'connection_attempt',
+                             'connection_type', 'device_type', 'device_pool'})
+"""Low cardinality fields with values repeated across many devices, shared through 'sys.intern'. Endpoint hostnames
+and IP addresses are unique per device and aren't interned."""
+switch_interned_fields = interned_fields | {'hostname'}
+"""Fields interned on router/switch and neighbor switch records, switch hostnames repeat in every endpoint neighbor"""
+
+
+class Record:
+    """
+    Base of compact '__slots__' inventory records with dictionary style access, eg. record['hostname'],
+    'description' in record, record.get('serial'). Unset optional fields behave as missing dictionary keys.\n
+    Records compare equal to records and dictionaries of the same fields. Like dictionaries they're mutable and
+    unhashable, so they can't be set members or dictionary keys.
+    """
+    __slots__ = ()
+    interned_fields = interned_fields
+    __hash__ = None
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        try:
+            setattr(self, key, value)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.__slots__ and hasattr(self, key)
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.to_dict()!r})'
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def keys(self):
+        return [key for key in self.__slots__ if hasattr(self, key)]
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    def to_dict(self):
+        """Returns nested dictionary format of record"""
+        device = {}
+        for key, value in self.items():
+            if isinstance(value, Record):
+                value = value.to_dict()
+            elif isinstance(value, list):
+                value = [v.to_dict() if isinstance(v, Record) else v for v in value]
+            device[key] = value
+        return device
+
+    @classmethod
+    def from_dict(cls, device):
+        """Builds record from device dictionary, keys without matching field are dropped"""
+        record = cls.__new__(cls)
+        for key in cls.__slots__:
+            if key in device:
+                value = device[key]
+                if key == 'neighbor':
+                    value = Neighbor.from_dict(value)
+                elif key == 'neighbors':
+                    value = [Neighbor.from_dict(neighbor) for neighbor in value]
+                elif key in cls.interned_fields and type(value) is str:
+                    value = sys.intern(value)
+                setattr(record, key, value)
+        return record
+
+
+class Neighbor(Record):
+    """Neighbor switch of endpoint or CDP neighbor of router/switch, 'local_intf' not on phone or WAP neighbor"""
+    __slots__ = ('hostname', 'ip_address', 'remote_intf', 'local_intf')
+    interned_fields = switch_interned_fields
+
+
+class Phone(Record):
+    """'description' and 'directory_number' set by CUCM export merge, 'line_numbers', 'device_pool', and 'cucm_model'
+    by 'CucmJoin'"""
+    __slots__ = ('hostname', 'neighbor', 'ip_address', 'mac_addr', 'voice_vlan', 'software_version', 'model',
+                 'description', 'directory_number', 'line_numbers', 'device_pool', 'cucm_model')
+
+
+class Wap(Record):
+    __slots__ = ('hostname', 'ip_address', 'model', 'neighbor', 'software_version')
+
+
+class Other(Record):
+    __slots__ = ('hostname', 'ip_address', 'neighbor', 'software_version', 'model')
+
+
+class RouterSwitch(Record):
+    """'serial', 'connection_type', 'rommon', and 'device_type' only set on connection scanned devices, 'neighbors'
+    only on CDP discovered devices"""
+    __slots__ = ('hostname', 'ip_address', 'software_version', 'model', 'serial', 'connection_type', 'rommon',
+                 'device_type', 'discovery_status', 'connection_attempt', 'neighbors')
+    interned_fields = switch_interned_fields
@@ -0,0 +1,259 @@
+from capture import CaptureArchive
+import zlib
+
+# TextFSM shaped show command outputs of a synthetic campus network, as 'discovery()' receives them from
+# 'send_command', for offline benchmarks replayed through 'CaptureReplay'. Raw CLI outputs are in 'fake_cli'.
+
+ios_version = 'Cisco IOS Software, IOS-XE Software, Catalyst L3 Switch Software (CAT3K_CAA-UNIVERSALK9-M), ' \
+              'Version 16.9.5, RELEASE SOFTWARE (fc2)'
+nxos_version = 'Cisco Nexus Operating System (NX-OS) Software, Version 9.3(5)'
+ap_version = 'Cisco AP Software, ap3g3-k9w8 Version: 8.10.130.0'
+phone_version = 'sip88xx.12-8-1-0001-455.loads'
+other_version = 'Linux 4.19.0 Version 2.1.3'
+ios_platform = 'cisco WS-C3850-48P'
+nxos_platform = 'N9K-C93180YC-EX'
+voice_vlan = '100'
+data_vlan = '10'
+
+
+def ios_cdp_neighbor(device_id, ip_address, platform, capabilities, local_port, remote_port, version):
+    """Returns 'show cdp neighbor detail' entry of cisco_ios template"""
+    return {
+        'destination_host': device_id,
+        'management_ip': ip_address,
+        'platform': platform,
+        'remote_port': remote_port,
+        'local_port': local_port,
+        'software_version': version,
+        'capabilities': capabilities
+    }
+
+
+def nxos_cdp_neighbor(device_id, ip_address, platform, capabilities, local_port, remote_port, version):
+    """Returns 'show cdp neighbor detail' entry of cisco_nxos template"""
+    return {
+        'dest_host': device_id,
+        'sysname': device_id.split('.')[0],
+        'mgmt_ip': ip_address,
+        'interface_ip': ip_address,
+        'platform': platform,
+        'remote_port': remote_port,
+        'local_port': local_port,
+        'version': version,
+        'capabilities': capabilities
+    }
+
+
+def ios_switchport(interface, vlan, switchport_voice_vlan):
+    """Returns 'show interface switchport' entry of cisco_ios template"""
+    return {
+        'interface': interface,
+        'switchport': 'Enabled',
+        'mode': 'static access',
+        'access_vlan': vlan,
+        'native_vlan': '1',
+        'voice_vlan': switchport_voice_vlan,
+        'trunking_vlans': ['ALL']
+    }
+
+
+def nxos_switchport(interface):
+    """Returns 'show interface switchport' entry of cisco_nxos template"""
+    return {
+        'interface': interface,
+        'switchport': 'Enabled',
+        'mode': 'trunk',
+        'access_vlan': '1',
+        'native_vlan': '1',
+        'voice_vlan': 'none',
+        'trunking_vlans': '1-4094'
+    }
+
+
+def ios_mac_entry(vlan, mac_addr, port):
+    """Returns 'show mac address-table' entry of cisco_ios template"""
+    return {
+        'destination_address': mac_addr,
+        'type': 'DYNAMIC',
+        'vlan': vlan,
+        'destination_port': port
+    }
+
+
+def nxos_mac_entry(vlan, mac_addr, port):
+    """Returns 'show mac address-table' entry of cisco_nxos template"""
+    return {
+        'vlan': vlan,
+        'mac': mac_addr,
+        'type': 'dynamic',
+        'age': '0',
+        'secure': 'F',
+        'ntfy': 'F',
+        'ports': port
+    }
+
+
+def switch_mac(hostname):
+    """Returns stable MAC address of switch from hostname"""
+    mac = f'{zlib.crc32(hostname.encode()):012x}'
+    return f'{mac[0:4]}.{mac[4:8]}.{mac[8:12]}'
+
+
+class SyntheticDevice:
+    """
+    TextFSM shaped outputs of a single synthetic router or switch.
+
+    :param hostname: Device hostname
+    :param ip_address: Management IP address
+    :param nxos: NX-OS template outputs, otherwise IOS
+    """
+    def __init__(self, hostname, ip_address, nxos=False):
+        self.nxos = nxos
+        self.device = {
+            'hostname': hostname,
+            'ip_address': ip_address,
+            'model': nxos_platform if nxos else ios_platform.replace('cisco ', ''),
+            'software_version': '9.3(5)' if nxos else '16.9.5',
+            'serial': f'FOC{zlib.crc32(hostname.encode()) % 100000000:08d}',
+            'connection_type': 'ssh',
+            'rommon': '07.69' if nxos else 'IOS-XE ROMMON',
+            'device_type': 'cisco_nxos' if nxos else 'cisco_ios'
+        }
+        """Device dictionary in 'AsyncSessions().successful_devices' format"""
+        self.cdp_neighbors = []
+        self.switchports = []
+        self.mac_addrs = []
+
+    def add_neighbor(self, device_id, ip_address, platform, capabilities, local_port, remote_port, version):
+        cdp_neighbor = nxos_cdp_neighbor if self.nxos else ios_cdp_neighbor
+        self.cdp_neighbors.append(
+            cdp_neighbor(device_id, ip_address, platform, capabilities, local_port, remote_port, version))
+
+    def add_switchport(self, interface, vlan=data_vlan, switchport_voice_vlan='none'):
+        if self.nxos:
+            self.switchports.append(nxos_switchport(interface))
+        else:
+            self.switchports.append(ios_switchport(interface, vlan, switchport_voice_vlan))
+
+    def add_mac_addr(self, vlan, mac_addr, port):
+        mac_entry = nxos_mac_entry if self.nxos else ios_mac_entry
+        self.mac_addrs.append(mac_entry(vlan, mac_addr, port))
+
+    def outputs(self):
+        """
+        :return: {command: TextFSM parsed output}, including 'show mac address-table vlan <voice_vlan>' for targeted
+        MAC address table discovery"""
+        return {
+            'show cdp neighbor detail': self.cdp_neighbors,
+            'show interface switchport': self.switchports,
+            'show mac address-table': self.mac_addrs,
+            f'show mac address-table vlan {voice_vlan}': [
+                mac_addr for mac_addr in self.mac_addrs if mac_addr['vlan'] == voice_vlan]
+        }
+
+
+class SyntheticNetwork:
+    """
+    Synthetic campus network of core, distribution, and access switches with phones, access points, and other
+    endpoints on access switches, as TextFSM shaped outputs written to a 'CaptureArchive' for 'CaptureReplay'.\n
+    Hostnames are fixed width per tier so no hostname is a substring of another.
+
+    :param core_count: Core switches, NX-OS
+    :param dist_per_core: Distribution switches per core switch, IOS unless 'nxos_dist'
+    :param access_per_dist: Access switches per distribution switch, IOS
+    :param phones_per_access: Phones per access switch
+    :param aps_per_access: Access points per access switch
+    :param others_per_access: Other endpoints per access switch
+    :param nxos_dist: NX-OS distribution switches
+
+        Attributes:
+            devices = {ip_address: SyntheticDevice}\n
+            core_ips = []\n
+            counts = {'routers_switches', 'phones', 'waps', 'others'}
+    """
+    def __init__(self, core_count=2, dist_per_core=2, access_per_dist=4, phones_per_access=24, aps_per_access=4,
+                 others_per_access=2, nxos_dist=False):
+        self.devices = {}
+        self.core_ips = []
+        self.counts = {'routers_switches': 0, 'phones': 0, 'waps': 0, 'others': 0}
+
+        def endpoint_ip(n, first_octet):
+            return f'{first_octet}.{int(n / 65536) % 256}.{int(n / 256) % 256}.{n % 256}'
+
+        def add_device(hostname, nxos):
+            self.counts['routers_switches'] += 1
+            device = SyntheticDevice(hostname, endpoint_ip(self.counts['routers_switches'], 10), nxos)
+            self.devices[device.device['ip_address']] = device
+            return device
+
+        def link(a, a_intf, b, b_intf):
+            """Adds CDP neighbor entries and trunk switchports in both directions between switches"""
+            for local, local_intf, remote, remote_intf in [(a, a_intf, b, b_intf), (b, b_intf, a, a_intf)]:
+                platform = nxos_platform if remote.nxos else ios_platform
+                version = nxos_version if remote.nxos else ios_version
+                local.add_neighbor(remote.device['hostname'], remote.device['ip_address'], platform,
+                                   'Router Switch IGMP', local_intf, remote_intf, version)
+                local.add_switchport(local_intf.replace('TenGigabitEthernet', 'Te').replace('Ethernet', 'Eth'))
+                local.add_mac_addr(data_vlan, switch_mac(remote.device['hostname']), local_intf)
+
+        for c in range(0, core_count):
+            core = add_device(f'CORE{c:02d}', True)
+            self.core_ips.append(core.device['ip_address'])
+            for d in range(0, dist_per_core):
+                dist = add_device(f'DIST{c:02d}{d:03d}', nxos_dist)
+                link(core, f'Ethernet1/{d + 1}', dist, 'TenGigabitEthernet1/1/1')
+                for a in range(0, access_per_dist):
+                    access = add_device(f'ACC{c:02d}{d:03d}{a:03d}', False)
+                    link(dist, f'TenGigabitEthernet2/1/{a + 1}', access, 'TenGigabitEthernet1/1/1')
+                    port = 0
+                    for _ in range(0, phones_per_access):
+                        port += 1
+                        self.counts['phones'] += 1
+                        mac = f'{self.counts["phones"]:012X}'
+                        intf = f'{int((port - 1) / 48) + 1}/0/{(port - 1) % 48 + 1}'
+                        access.add_neighbor(f'SEP{mac}', endpoint_ip(self.counts['phones'], 11),
+                                            'Cisco IP Phone 8845', 'Host Phone Two-port Mac Relay',
+                                            f'GigabitEthernet{intf}', 'Port 1', phone_version)
+                        access.add_switchport(f'Gi{intf}', switchport_voice_vlan=voice_vlan)
+                        access.add_mac_addr(voice_vlan, f'{mac[0:4]}.{mac[4:8]}.{mac[8:12]}'.lower(), f'Gi{intf}')
+                    for _ in range(0, aps_per_access):
+                        port += 1
+                        self.counts['waps'] += 1
+                        intf = f'{int((port - 1) / 48) + 1}/0/{(port - 1) % 48 + 1}'
+                        access.add_neighbor(f'AP{self.counts["waps"]:07d}', endpoint_ip(self.counts['waps'], 12),
+                                            'cisco AIR-AP2802I-B-K9', 'Trans-Bridge Source-Route-Bridge IGMP',
+                                            f'GigabitEthernet{intf}', 'GigabitEthernet0', ap_version)
+                        access.add_switchport(f'Gi{intf}')
+                    for _ in range(0, others_per_access):
+                        port += 1
+                        self.counts['others'] += 1
+                        intf = f'{int((port - 1) / 48) + 1}/0/{(port - 1) % 48 + 1}'
+                        access.add_neighbor(f'HOST{self.counts["others"]:07d}.corp.local',
+                                            endpoint_ip(self.counts['others'], 13), 'Linux', 'Host',
+                                            f'GigabitEthernet{intf}', 'eth0', other_version)
+                        access.add_switchport(f'Gi{intf}')
+
+    @classmethod
+    def scaled(cls, device_count, core_count=2, phones_per_access=24, aps_per_access=4, others_per_access=2,
+               access_per_dist=40):
+        """Returns network of approximately 'device_count' total inventory devices, switches and endpoints"""
+        per_access = 1 + phones_per_access + aps_per_access + others_per_access
+        access_count = max(-(-device_count // per_access), 1)
+        dist_per_core = max(-(-access_count // (core_count * access_per_dist)), 1)
+        access_per_dist = max(-(-access_count // (core_count * dist_per_core)), 1)
+        return cls(core_count, dist_per_core, access_per_dist, phones_per_access, aps_per_access, others_per_access)
+
+    def device_count(self):
+        return sum(self.counts.values())
+
+    def sessions_outputs(self):
+        """
+        :return: [{'device', 'outputs'}] of every router and switch"""
+        return [{'device': device.device, 'outputs': device.outputs()} for device in self.devices.values()]
+
+    def write_capture(self, file):
+        """Writes every router and switch to 'CaptureArchive' file for 'CaptureReplay'"""
+        archive = CaptureArchive(file)
+        for device in self.devices.values():
+            archive.write_device(device.device, device.outputs())
+        archive.close()
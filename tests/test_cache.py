@@ -0,0 +1,121 @@
+import json
+import time
+
+import pytest
+
+from cache import DiscoveryCache, ParseCache, cdp_fingerprint
+
+
+class SummarySession:
+    """Session returning given 'show cdp neighbors' summary"""
+    def __init__(self, cdp_summary):
+        self.cdp_summary = cdp_summary
+
+    def send_command(self, command):
+        assert command == 'show cdp neighbors'
+        return self.cdp_summary
+
+
+output = {'phones': [], 'routers_switches': [], 'waps': [], 'others': []}
+
+
+def test_cdp_fingerprint_changes_with_neighbors():
+    neighbors = [{'neighbor': 'SW2', 'local_interface': 'Gi1/0/1'}, {'neighbor': 'SW3', 'local_interface': 'Gi1/0/2'}]
+    fingerprint = cdp_fingerprint(SummarySession(neighbors))
+    assert cdp_fingerprint(SummarySession(list(reversed(neighbors)))) == fingerprint
+    moved = [neighbors[0], {'neighbor': 'SW3', 'local_interface': 'Gi1/0/3'}]
+    assert cdp_fingerprint(SummarySession(moved)) != fingerprint
+    assert cdp_fingerprint(SummarySession(neighbors[:1])) != fingerprint
+    assert cdp_fingerprint(SummarySession('')) != fingerprint
+
+
+def test_discovery_cache_hits_across_runs(tmp_path):
+    file = str(tmp_path / 'cache.json')
+    cache = DiscoveryCache(file)
+    assert cache.get('10.0.0.1', 'SW1', '1:a') is None
+    cache.put('10.0.0.1', 'SW1', '1:a', output)
+    cache.save()
+
+    cache = DiscoveryCache(file)
+    assert cache.get('10.0.0.1', 'SW1', '1:a') == output
+    # Changed CDP state and other hostname at same IP address are polled
+    assert cache.get('10.0.0.1', 'SW1', '2:b') is None
+    assert cache.get('10.0.0.1', 'SW9', '1:a') is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_discovery_cache_expires_and_evicts(tmp_path):
+    file = str(tmp_path / 'cache.json')
+    cache = DiscoveryCache(file, ttl=60, max_entries=2)
+    for n in range(4):
+        cache.put(f'10.0.0.{n}', f'SW{n}', '1:a', output)
+    cache.entries[cache.key('10.0.0.3', 'SW3')]['stored'] = time.time() - 120
+    cache.save()
+    # Expired entry and least recently stored entry over 'max_entries' are removed
+    assert list(DiscoveryCache(file, ttl=60, max_entries=2).entries) == [cache.key('10.0.0.1', 'SW1'),
+                                                                          cache.key('10.0.0.2', 'SW2')]
+
+
+def test_discovery_cache_ignores_corrupt_file(tmp_path):
+    file = tmp_path / 'cache.json'
+    file.write_text('{"10.0.0.1|SW1": ')
+    assert DiscoveryCache(str(file)).entries == {}
+
+
+def test_parse_cache_hit_rates_across_runs(tmp_path):
+    file = str(tmp_path / 'parse_cache.json')
+    outputs = ['show cdp neighbor detail output 1', 'show cdp neighbor detail output 2']
+    cache = ParseCache(file)
+    for raw_output in outputs:
+        digest = ParseCache.digest(raw_output)
+        if cache.get('textfsm', digest) is None:
+            cache.put('textfsm', digest, [{'output': raw_output}])
+    assert cache.hit_rates() == {'textfsm': 0.0}
+    cache.save()
+
+    cache = ParseCache(file)
+    for raw_output in outputs + ['show cdp neighbor detail output 3']:
+        cache.get('textfsm', ParseCache.digest(raw_output))
+    assert cache.hit_rates() == {'textfsm': pytest.approx(2 / 3)}
+
+
+def test_parse_cache_returns_copies_and_evicts_least_recently_used():
+    cache = ParseCache(max_entries=2)
+    cache.put('cdp_parser', 'a', {'phones': []})
+    cache.put('cdp_parser', 'b', {'phones': []})
+    cache.get('cdp_parser', 'a')['phones'].append('modified')
+    assert cache.get('cdp_parser', 'a') == {'phones': []}
+    cache.put('cdp_parser', 'c', {'phones': []})
+    assert cache.get('cdp_parser', 'b') is None
+    assert cache.get('cdp_parser', 'a') is not None
+
+
+def test_parse_cache_digest_of_parsed_outputs_ignores_key_order():
+    assert ParseCache.digest({'a': 1, 'b': 2}) == ParseCache.digest({'b': 2, 'a': 1})
+    # Outputs are seperated, so moving text between outputs changes the digest
+    assert ParseCache.digest('ab', 'c') != ParseCache.digest('a', 'bc')
+
+
+def test_inventory_parse_cache_hit_rates_across_runs(tmp_path):
+    pytest.importorskip('net_async')
+    pytest.importorskip('ntc_templates')
+    from fake_cli import fake_campus_network
+    from inventory import InventoryDiscovery
+
+    network = fake_campus_network()
+    core_ips = [device.ip_address for device in network.devices.values() if device.nxos]
+    parse_cache_file = str(tmp_path / 'parse_cache.json')
+
+    def run():
+        return InventoryDiscovery('', '', core_ips, session_backend='asyncio', connector=network.connect,
+                                  parse_cache_file=parse_cache_file)
+
+    first = run()
+    assert first.parse_cache.hit_rates() == {'textfsm': 0.0, 'cdp_parser': 0.0}
+    with open(parse_cache_file) as cache_file:
+        assert sum(key.startswith('cdp_parser:') for key in json.load(cache_file)) == len(network.devices)
+    # Unchanged outputs of second run skip TextFSM parsing and 'CdpParser'
+    second = run()
+    assert second.parse_cache.hit_rates() == {'textfsm': 1.0, 'cdp_parser': 1.0}
+    for attribute in ['phones', 'waps', 'others', 'routers_switches']:
+        assert sorted(map(repr, getattr(second, attribute))) == sorted(map(repr, getattr(first, attribute)))
@@ -0,0 +1,91 @@
+import gzip
+
+import pytest
+
+pytest.importorskip('net_async')
+
+from capture import CaptureArchive, CaptureReplay
+from inventory import InventoryDiscovery
+from synthetic import SyntheticNetwork
+
+
+def inventory_lists(inventory):
+    return [sorted(map(repr, devices)) for devices in [inventory.routers_switches, inventory.phones, inventory.waps,
+                                                       inventory.others, inventory.failed_devices]]
+
+
+@pytest.fixture
+def network():
+    return SyntheticNetwork(core_count=2, dist_per_core=2, access_per_dist=2, phones_per_access=3, aps_per_access=1,
+                            others_per_access=1)
+
+
+def test_replay_follows_synthetic_cdp_graph(network, tmp_path):
+    capture_file = str(tmp_path / 'capture.jsonl.gz')
+    network.write_capture(capture_file)
+    inventory = InventoryDiscovery('', '', network.core_ips, session_backend=CaptureReplay(capture_file),
+                                   topology=True)
+    # Distribution and access switches are only reachable through CDP of captured outputs
+    assert len(inventory.routers_switches) == network.counts['routers_switches']
+    assert all(router_switch['connection_attempt'] == 'Success' for router_switch in inventory.routers_switches)
+    assert (len(inventory.phones), len(inventory.waps), len(inventory.others)) == \
+        (network.counts['phones'], network.counts['waps'], network.counts['others'])
+    switch_hostnames = {device.device['hostname'] for device in network.devices.values()}
+    expected_links = set()
+    for device in network.devices.values():
+        for neighbor in device.cdp_neighbors:
+            neighbor_hostname = neighbor['dest_host'] if device.nxos else neighbor['destination_host']
+            if neighbor_hostname in switch_hostnames:
+                expected_links.add(frozenset((device.device['hostname'], neighbor_hostname)))
+    # Every distribution and access switch has one uplink
+    assert len(expected_links) == network.counts['routers_switches'] - len(network.core_ips)
+    assert {frozenset((hostname, neighbor)) for hostname, neighbor, _, _ in inventory.topology.links()
+            if neighbor in switch_hostnames} == expected_links
+
+
+def test_captured_run_replays_same_inventory(tmp_path):
+    pytest.importorskip('ntc_templates')
+    from fake_cli import fake_campus_network
+
+    network = fake_campus_network()
+    core_ips = [device.ip_address for device in network.devices.values() if device.nxos] + ['10.250.0.1']
+    capture_file = str(tmp_path / 'capture.jsonl.gz')
+    live = InventoryDiscovery('', '', core_ips, session_backend='asyncio', connector=network.connect, topology=True,
+                              capture_file=capture_file)
+    replayed = InventoryDiscovery('', '', core_ips, session_backend=CaptureReplay(capture_file), topology=True)
+    assert inventory_lists(replayed) == inventory_lists(live)
+    assert replayed.topology.nodes == live.topology.nodes
+    assert sorted(replayed.topology.links()) == sorted(live.topology.links())
+
+
+def test_truncated_archive_replays_complete_records(network, tmp_path):
+    capture_file = tmp_path / 'capture.jsonl.gz'
+    network.write_capture(str(capture_file))
+    with gzip.open(str(capture_file), 'rt') as archive_file:
+        record_count = sum(1 for _ in archive_file)
+    data = capture_file.read_bytes()
+    truncated_file = tmp_path / 'truncated.jsonl.gz'
+    truncated_file.write_bytes(data[:len(data) // 2])
+    replay = CaptureReplay(str(truncated_file))
+    assert 0 < len(replay.records) < record_count
+    sessions = replay.run('', '', list(network.devices))
+    assert len(sessions.outputs) == len(replay.records)
+    assert len(sessions.failed_devices) == len(network.devices) - len(replay.records)
+    assert {device['exception'] for device in sessions.failed_devices} == {'Not within capture archive'}
+
+
+def test_failed_and_uncaptured_devices(network, tmp_path):
+    capture_file = str(tmp_path / 'capture.jsonl.gz')
+    device = next(iter(network.devices.values()))
+    failed_device = {'ip_address': '10.250.0.1', 'connection_type': 'Unknown', 'device_type': 'Unknown',
+                     'connectivity': False, 'authentication': False, 'authorization': False, 'exception': 'Timeout'}
+    archive = CaptureArchive(capture_file)
+    outputs = device.outputs()
+    outputs.pop(next(command for command in outputs if 'mac address-table' in command))
+    archive.write_device(device.device, outputs)
+    archive.write({'record': 'failed', 'ip_address': '10.250.0.1', 'device': failed_device})
+    archive.close()
+    sessions = CaptureReplay(capture_file).run('', '', [device.device['ip_address'], '10.250.0.1'])
+    assert sessions.outputs == []
+    assert sessions.failed_devices[1] == failed_device
+    assert 'mac address-table' in sessions.failed_devices[0]['exception']
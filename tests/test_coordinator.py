@@ -0,0 +1,31 @@
+import pytest
+
+pytest.importorskip('net_async')
+pytest.importorskip('ntc_templates')
+
+from coordinator import ShardCoordinator
+from fake_cli import fake_campus_network
+from inventory import InventoryDiscovery
+
+unreachable_ip = '10.250.0.1'
+"""Initial IP address not within fake network, a failed device in both runs"""
+
+
+def test_sharded_discovery_matches_single_process():
+    network = fake_campus_network()
+    core_ips = [device.ip_address for device in network.devices.values() if device.nxos] + [unreachable_ip]
+    single = InventoryDiscovery('', '', core_ips, session_backend='asyncio', connector=network.connect)
+    with ShardCoordinator(workers=3, worker_backend='asyncio', connector=network.connect) as coordinator:
+        sharded = InventoryDiscovery('', '', core_ips, session_backend=coordinator)
+    assert len(single.routers_switches) == len(network.devices)
+    assert [device['ip_address'] for device in single.failed_devices] == [unreachable_ip]
+    for attribute in ['phones', 'waps', 'routers_switches', 'others', 'failed_devices']:
+        assert getattr(sharded, attribute) == getattr(single, attribute), attribute
+
+
+@pytest.mark.parametrize('option', ['cache_file', 'parse_cache_file', 'capture_file'])
+def test_coordinator_rejects_options_not_shared_with_workers(option, tmp_path):
+    with ShardCoordinator(workers=1) as coordinator:
+        with pytest.raises(ValueError, match=option):
+            InventoryDiscovery('', '', ['10.0.0.1'], session_backend=coordinator,
+                               **{option: str(tmp_path / option)})
@@ -0,0 +1,89 @@
+import sqlite3
+
+import pytest
+
+pytest.importorskip('net_async')
+
+from cucm_index import CucmPhoneIndex
+from cucm_join import CucmJoin
+from exceptions import NoPhoneReportFound
+from parsers import cucm_export_parse, cucm_export_records
+
+phone_report = (
+    '\ufeffDescription,Device Name,Directory Number 1,Directory Number 3,Directory Number 2,Device Pool,Device Type\n'
+    '"Smith, John - Front Desk",SEP001122334455,1001,3001,2001,DP_Campus,Cisco 8845\n'
+    '"Lobby ""Courtesy"" Phone",sep00aabbccddee,1002,,,DP_Campus,Cisco 7841\n'
+    'Conference Room,,1003,,,DP_Campus,Cisco 8832\n'
+    'Replaced Desk,SEP001122334455,1004,,,DP_Branch,Cisco 8865\n'
+)
+"""Byte order mark, header with lines out of order, quoted commas and quotes, blank device name, and repeated device
+name"""
+
+
+@pytest.fixture
+def report_file(tmp_path):
+    file = tmp_path / 'phones.csv'
+    file.write_text(phone_report, encoding='utf-8')
+    return str(file)
+
+
+def test_records_handle_quoted_commas(report_file):
+    records = list(cucm_export_records(report_file))
+    assert len(records) == 3
+    assert records[0] == {'device_name': 'SEP001122334455', 'description': 'Smith, John - Front Desk',
+                          'directory_number': '1001', 'line_numbers': ['2001', '3001'], 'device_pool': 'DP_Campus',
+                          'model': 'Cisco 8845'}
+    assert records[1]['device_name'] == 'SEP00AABBCCDDEE'
+    assert records[1]['description'] == 'Lobby "Courtesy" Phone'
+    assert records[1]['line_numbers'] == []
+
+
+def test_records_without_header_use_field_positions(tmp_path):
+    file = tmp_path / 'phones.csv'
+    file.write_text('"Smith, John",SEP001122334455,1001\nLobby,SEP00AABBCCDDEE\n')
+    assert [(record['description'], record['device_name'], record['directory_number'])
+            for record in cucm_export_records(str(file))] == [('Smith, John', 'SEP001122334455', '1001'),
+                                                              ('Lobby', 'SEP00AABBCCDDEE', '')]
+
+
+def test_index_matches_export_parse(report_file):
+    parsed = cucm_export_parse(report_file)
+    with CucmPhoneIndex(report_file) as index:
+        assert len(index) == len(parsed) == 2
+        for device_name, phone in parsed.items():
+            assert device_name in index
+            assert index[device_name]['description'] == phone['description']
+            assert index[device_name]['directory_number'] == phone['directory_number']
+        # Later row of repeated device name replaces earlier row
+        assert index['sep001122334455']['directory_number'] == '1004'
+        assert index.get('SEP000000000000') is None
+        assert 'SEP000000000000' not in index
+        with pytest.raises(KeyError):
+            index['SEP000000000000']
+        assert set(index.lookup(['sep00aabbccddee', 'SEP000000000000'])) == {'SEP00AABBCCDDEE'}
+        temporary_file = index.index_file
+    with pytest.raises(FileNotFoundError):
+        open(temporary_file)
+
+
+def test_index_file_reused_and_kept_when_export_missing(report_file, tmp_path):
+    index_file = str(tmp_path / 'phones.sqlite')
+    with CucmPhoneIndex(report_file, index_file, chunk_size=1) as index:
+        assert len(index) == 2
+    with pytest.raises(NoPhoneReportFound):
+        CucmPhoneIndex(str(tmp_path / 'missing.csv'), index_file)
+    # Failed load leaves staging table dropped and existing index in place
+    connection = sqlite3.connect(index_file)
+    tables = [row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    assert tables == ['phones']
+    assert connection.execute('SELECT COUNT(*) FROM phones').fetchone()[0] == 2
+    connection.close()
+
+
+def test_index_records_join_with_discovered_phones(report_file):
+    discovered = [{'hostname': 'SEP001122334455'}, {'hostname': 'SEP000000000000'}]
+    with CucmPhoneIndex(report_file) as index:
+        cucm_join = CucmJoin(discovered, index.records())
+    assert len(cucm_join.matched) == 1
+    assert [phone['hostname'] for phone in cucm_join.discovered_only] == ['SEP000000000000']
+    assert [record['device_name'] for record in cucm_join.cucm_only] == ['SEP00AABBCCDDEE']
@@ -0,0 +1,66 @@
+from cucm_join import CucmJoin
+from records import Neighbor, Phone
+
+
+def phone(hostname, switch='ACC1'):
+    return Phone.from_dict({'hostname': hostname, 'ip_address': '', 'mac_addr': '', 'voice_vlan': '20',
+                            'software_version': '', 'model': 'CP-8845',
+                            'neighbor': {'hostname': switch, 'ip_address': '', 'remote_intf': 'Gi1/0/1'}})
+
+
+def record(device_name, directory_number='1001'):
+    return {'device_name': device_name, 'description': f'{device_name} desk', 'directory_number': directory_number,
+            'line_numbers': ['2001'], 'device_pool': 'DP_Campus', 'model': 'Cisco 8845'}
+
+
+def join():
+    # SEP000000000001 is seen from two switches, SEP00000000000A is lower case from CDP
+    discovered = [phone('SEP000000000001'), phone('SEP000000000001', 'ACC2'), phone('SEP000000000002'),
+                  phone('sep00000000000a'), phone('SEP000000000003')]
+    cucm_records = [record('SEP000000000001'), record('SEP00000000000A'), record('SEP000000000004'),
+                    record('SEP000000000005')]
+    return CucmJoin(discovered, iter(cucm_records))
+
+
+def test_inner_and_anti_join_counts():
+    cucm_join = join()
+    assert [(phone['hostname'], record['device_name']) for phone, record in cucm_join.matched] == [
+        ('SEP000000000001', 'SEP000000000001'), ('SEP000000000001', 'SEP000000000001'),
+        ('sep00000000000a', 'SEP00000000000A')]
+    assert [phone['hostname'] for phone in cucm_join.discovered_only] == ['SEP000000000002', 'SEP000000000003']
+    assert [record['device_name'] for record in cucm_join.cucm_only] == ['SEP000000000004', 'SEP000000000005']
+
+
+def test_left_and_right_join_counts():
+    cucm_join = join()
+    left = list(cucm_join.left_join())
+    # Every discovered phone once, matched or not
+    assert len(left) == 5
+    assert sum(record is None for _, record in left) == 2
+    right = list(cucm_join.right_join())
+    # Every CUCM record once per discovered phone it matched, unmatched records once
+    assert len(right) == 5
+    assert sum(phone is None for _, phone in right) == 2
+    assert {record['device_name'] for record, _ in right} == {'SEP000000000001', 'SEP00000000000A',
+                                                              'SEP000000000004', 'SEP000000000005'}
+
+
+def test_apply_adds_cucm_fields_to_matched_phones():
+    cucm_join = join()
+    cucm_join.apply()
+    for phone, record in cucm_join.matched:
+        assert phone['description'] == record['description']
+        assert phone['directory_number'] == '1001'
+        assert phone['line_numbers'] == ['2001']
+        assert phone['device_pool'] == 'DP_Campus'
+        assert phone['cucm_model'] == 'Cisco 8845'
+        assert isinstance(phone['neighbor'], Neighbor)
+    for phone in cucm_join.discovered_only:
+        assert 'device_pool' not in phone
+
+
+def test_empty_inputs():
+    cucm_join = CucmJoin([], [])
+    assert (cucm_join.matched, cucm_join.discovered_only, cucm_join.cucm_only) == ([], [], [])
+    assert list(cucm_join.left_join()) == []
+    assert list(cucm_join.right_join()) == []
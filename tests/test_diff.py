@@ -0,0 +1,136 @@
+import json
+
+import pytest
+
+pytest.importorskip('net_async')
+pytest.importorskip('openpyxl')
+
+from diff import InventoryDiff, diff_categories, diff_header, load_csv, load_spreadsheet
+from openpyxl import load_workbook
+from exporters import output_to_csv
+from parsers import output_to_spreadsheet
+from records import Phone
+
+
+def phone_row(mac_addr, switch='ACC1', switchport='Gi1/0/1', ip_address='10.1.0.10'):
+    return {'Hostname': f'SEP{mac_addr.replace(".", "").upper()}', 'IP Address': ip_address, 'Model': 'CP-8845',
+            'Software Version': '14-1-1', 'Voice VLAN': '20', 'MAC Address': mac_addr, 'Switch Hostname': switch,
+            'Switch IP Address': '', 'Switchport': switchport}
+
+
+def ap_row(hostname, switch='ACC1', switchport='Gi1/0/10'):
+    return {'Hostname': hostname, 'IP Address': '', 'Model': 'AIR-AP2802I', 'Software Version': '8.10',
+            'Switch Hostname': switch, 'Switch IP Address': '', 'Switchport': switchport}
+
+
+def other_row(hostname, switch, intf):
+    return {'Hostname': hostname, 'IP Address': '', 'Model': 'Linux', 'Software Version': '',
+            'Neighbor  Hostname': switch, 'Neighbor IP Address': '', 'Local Interface to Neighbor': intf,
+            'Neighbor Interface': 'eth0'}
+
+
+def rt_sw_row(hostname, software_version='16.9.5', discovery_status='existing'):
+    return {'Hostname': hostname, 'IP Address': '10.0.0.1', 'Model': 'C9300', 'Software Version': software_version,
+            'Discovery Status': discovery_status, 'Neighbor 1 Hostname': ''}
+
+
+def inventory(routers_switches=(), phones=(), aps=(), others=()):
+    return {'Routers_Switches': list(routers_switches), 'Phones': list(phones), 'APs': list(aps),
+            'Others': list(others)}
+
+
+def changes(inventory_diff, category):
+    return sorted((change['change'], change['key'], change['field'], change['previous'], change['current'])
+                  for change in inventory_diff.changes if change['category'] == category)
+
+
+def test_unchanged_inventory_has_no_changes():
+    previous = inventory([rt_sw_row('CORE1')], [phone_row('0011.2233.4455')], [ap_row('AP1')],
+                         [other_row('HOST1', 'ACC1', 'Gi1/0/20')])
+    inventory_diff = InventoryDiff(previous, json.loads(json.dumps(previous)))
+    assert inventory_diff.changes == []
+    assert inventory_diff.counts == {category: {'added': 0, 'removed': 0, 'moved': 0, 'changed': 0}
+                                     for category, _, _ in diff_categories}
+
+
+def test_phones_moved_changed_added_removed():
+    previous = inventory(phones=[phone_row('0011.2233.4455'), phone_row('0011.2233.4466', switchport='Gi1/0/2'),
+                                 phone_row('0011.2233.4477', switchport='Gi1/0/3')])
+    current = inventory(phones=[phone_row('0011.2233.4455', 'ACC2', 'Gi1/0/5'),
+                                phone_row('0011.2233.4466', switchport='Gi1/0/2', ip_address='10.1.0.20'),
+                                phone_row('0011.2233.4488', switchport='Gi1/0/4')])
+    inventory_diff = InventoryDiff(previous, current)
+    assert changes(inventory_diff, 'Phones') == [
+        ('added', '0011.2233.4488', '', '', 'SEP001122334488'),
+        ('changed', '0011.2233.4466', 'IP Address', '10.1.0.10', '10.1.0.20'),
+        ('moved', '0011.2233.4455', 'Location', 'ACC1 Gi1/0/1', 'ACC2 Gi1/0/5'),
+        ('removed', '0011.2233.4477', '', 'SEP001122334477', '')]
+    assert inventory_diff.counts['Phones'] == {'added': 1, 'removed': 1, 'moved': 1, 'changed': 1}
+
+
+def test_ap_moved_by_switch_or_switchport():
+    previous = inventory(aps=[ap_row('AP1'), ap_row('AP2', switchport='Gi1/0/11')])
+    current = inventory(aps=[ap_row('AP1', switchport='Gi1/0/12'), ap_row('AP2', 'ACC2', 'Gi1/0/11')])
+    inventory_diff = InventoryDiff(previous, current)
+    assert changes(inventory_diff, 'APs') == [
+        ('moved', 'AP1', 'Location', 'ACC1 Gi1/0/10', 'ACC1 Gi1/0/12'),
+        ('moved', 'AP2 Gi1/0/11', 'Location', 'ACC1', 'ACC2')]
+    assert inventory_diff.counts['APs'] == {'added': 0, 'removed': 0, 'moved': 2, 'changed': 0}
+
+
+def test_others_sharing_hostname_compared_as_locations():
+    previous = inventory(others=[other_row('HOST1', 'ACC1', 'Gi1/0/20'), other_row('HOST1', 'ACC2', 'Gi1/0/20')])
+    current = inventory(others=[other_row('HOST1', 'ACC2', 'Gi1/0/20'), other_row('HOST1', 'ACC3', 'Gi1/0/21')])
+    inventory_diff = InventoryDiff(previous, current)
+    assert changes(inventory_diff, 'Others') == [('moved', 'HOST1', 'Location', 'ACC1 Gi1/0/20', 'ACC3 Gi1/0/21')]
+
+
+def test_router_switch_changes_ignore_discovery_status():
+    previous = inventory([rt_sw_row('CORE1'), rt_sw_row('DIST1')])
+    current = inventory([rt_sw_row('CORE1', '17.3.1', 'new'), rt_sw_row('DIST1', discovery_status='new')])
+    inventory_diff = InventoryDiff(previous, current)
+    assert changes(inventory_diff, 'Routers_Switches') == [
+        ('changed', 'CORE1', 'Software Version', '16.9.5', '17.3.1')]
+
+
+def exported_phones(count, switch='ACC1'):
+    phones = []
+    for n in range(1, count + 1):
+        mac = f'{n:012x}'
+        phones.append(Phone.from_dict({
+            'hostname': f'SEP{mac.upper()}', 'ip_address': f'10.1.0.{n}',
+            'mac_addr': f'{mac[0:4]}.{mac[4:8]}.{mac[8:12]}', 'voice_vlan': '20', 'software_version': '14-1-1',
+            'model': 'CP-8845',
+            'neighbor': {'hostname': switch, 'ip_address': '10.0.0.3', 'remote_intf': f'Gi1/0/{n}'}}))
+    return phones
+
+
+@pytest.mark.parametrize('export', ['csv', 'xlsx'])
+def test_diff_of_exported_inventories(export, tmp_path):
+    previous_phones = exported_phones(3)
+    current_phones = exported_phones(4)
+    current_phones[0]['neighbor']['hostname'] = 'ACC2'
+    locations = []
+    for name, phones in [('previous', previous_phones), ('current', current_phones)]:
+        location = tmp_path / name
+        location.mkdir()
+        if export == 'csv':
+            output_to_csv([], phones, [], [], [], str(location))
+            prefix = str(next(location.glob('*-Phones.csv')))[:-len('Phones.csv')]
+            locations.append(load_csv(prefix))
+        else:
+            output_to_spreadsheet([], phones, [], [], [], str(location))
+            locations.append(load_spreadsheet(str(next(location.glob('*.xlsx')))))
+    inventory_diff = InventoryDiff(*locations)
+    assert inventory_diff.counts['Phones'] == {'added': 1, 'removed': 0, 'moved': 1, 'changed': 0}
+    assert changes(inventory_diff, 'Phones')[1] == ('moved', '0000.0000.0001', 'Location', 'ACC1 Gi1/0/1',
+                                                    'ACC2 Gi1/0/1')
+
+    json_file = tmp_path / 'changes.json'
+    inventory_diff.to_json(str(json_file))
+    assert json.loads(json_file.read_text())['counts'] == inventory_diff.counts
+    wb = load_workbook(inventory_diff.to_spreadsheet(str(tmp_path)), read_only=True)
+    rows = list(wb['Inventory_Changes'].iter_rows(values_only=True))
+    wb.close()
+    assert list(rows[0]) == diff_header
+    assert len(rows) == len(inventory_diff.changes) + 1
@@ -0,0 +1,103 @@
+import csv
+
+import pytest
+
+pytest.importorskip('net_async')
+
+from cucm_join import CucmJoin
+from exporters import boolean, integer, neighbor_header, output_to_csv, output_to_parquet
+from metrics import DiscoveryMetrics
+from parsers import cucm_join_titles, sheet_titles, spreadsheet_header
+from records import Other, Phone, RouterSwitch
+
+neighbor = {'hostname': 'ACC1', 'ip_address': '10.0.0.3', 'remote_intf': 'Gi1/0/1'}
+routers_switches = [
+    RouterSwitch.from_dict({'hostname': 'ACC1', 'ip_address': '10.0.0.3', 'software_version': '16.9.5',
+                            'model': 'C9300', 'serial': 'FOC1', 'connection_type': 'ssh', 'rommon': '16.9r',
+                            'device_type': 'cisco_ios', 'discovery_status': 'existing',
+                            'connection_attempt': 'Success'}),
+    RouterSwitch.from_dict({'hostname': 'ACC2', 'ip_address': '10.0.0.4', 'software_version': '16.9.5',
+                            'model': 'C9300', 'discovery_status': 'new', 'connection_attempt': 'Failed',
+                            'neighbors': [{**neighbor, 'local_intf': 'Te1/1/1'},
+                                          {'hostname': 'DIST1', 'ip_address': '10.0.0.2', 'remote_intf': 'Te2/1/1',
+                                           'local_intf': 'Te1/1/2'}]})
+]
+phones = [Phone.from_dict({'hostname': 'SEP001122334455', 'ip_address': '10.1.0.10', 'mac_addr': '0011.2233.4455',
+                           'voice_vlan': '20', 'software_version': '14-1-1', 'model': 'CP-8845',
+                           'neighbor': neighbor})]
+others = [Other.from_dict({'hostname': 'HOST1, Lab', 'ip_address': '', 'software_version': '', 'model': 'Linux',
+                           'neighbor': {**neighbor, 'local_intf': 'eth0'}})]
+failed_devices = [{'ip_address': '10.0.0.9', 'connection_type': 'Unknown', 'device_type': 'Unknown',
+                   'connectivity': False, 'authentication': False, 'authorization': False,
+                   'discovery_status': 'new', 'exception': 'Timeout', 'session_retries': 2}]
+
+
+def read_tables(location):
+    tables = {}
+    for file in location.glob('network_inventory-*.csv'):
+        with open(str(file), newline='') as csv_file:
+            tables[file.stem.rsplit('-', 1)[1]] = list(csv.reader(csv_file))
+    return tables
+
+
+def test_csv_export_tables(tmp_path):
+    metrics = DiscoveryMetrics()
+    output_to_csv(routers_switches, phones, [], others, failed_devices, str(tmp_path), metrics=metrics)
+    tables = read_tables(tmp_path)
+    assert sorted(tables) == sorted(sheet_titles + ['Routers_Switches_Neighbors'])
+    assert tables['Routers_Switches'][0] == spreadsheet_header('RouterSwitch', neighbor_count=0)
+    # Unscanned router/switch fields are 'Unknown', neighbors are exploded to their own table
+    assert tables['Routers_Switches'][2][4:7] == ['Unknown', 'Unknown', 'Unknown']
+    assert len(tables['Routers_Switches'][2]) == len(tables['Routers_Switches'][0])
+    assert tables['Routers_Switches_Neighbors'] == [
+        neighbor_header, ['ACC2', '10.0.0.4', 'ACC1', '10.0.0.3', 'Te1/1/1', 'Gi1/0/1'],
+        ['ACC2', '10.0.0.4', 'DIST1', '10.0.0.2', 'Te1/1/2', 'Te2/1/1']]
+    assert tables['Phones'][1][:2] == ['SEP001122334455', '10.1.0.10']
+    # Quoted comma within hostname stays one column
+    assert tables['Others'][1][0] == 'HOST1, Lab'
+    assert tables['APs'] == [spreadsheet_header('WAP')]
+    assert tables['Failed'][1][3:6] == ['False', 'False', 'False']
+    assert tables['Failed'][1][-1] == '2'
+    assert metrics.summary()['csv_export']['count'] == 1
+
+
+def test_csv_export_cucm_join_tables(tmp_path):
+    cucm_records = [{'device_name': 'SEP001122334455', 'description': 'Smith, John', 'directory_number': '1001',
+                     'line_numbers': ['2001', '3001'], 'device_pool': 'DP_Campus', 'model': 'Cisco 8845'},
+                    {'device_name': 'SEP00AABBCCDDEE', 'description': 'Lobby', 'directory_number': '1002',
+                     'line_numbers': [], 'device_pool': 'DP_Campus', 'model': 'Cisco 7841'}]
+    joined_phones = [Phone.from_dict(phone.to_dict()) for phone in phones] + [
+        Phone.from_dict({**phones[0].to_dict(), 'hostname': 'SEP000000000001', 'mac_addr': '0000.0000.0001'})]
+    cucm_join = CucmJoin(joined_phones, cucm_records)
+    cucm_join.apply()
+    output_to_csv([], joined_phones, [], [], [], str(tmp_path), cucm_join=cucm_join)
+    tables = read_tables(tmp_path)
+    assert tables['Phones'][0] == spreadsheet_header('CUCMJoinedPhone')
+    assert tables['Phones'][1][-5:] == ['Smith, John', '1001', '2001, 3001', 'DP_Campus', 'Cisco 8845']
+    assert [row[0] for row in tables[cucm_join_titles[0]][1:]] == ['SEP00AABBCCDDEE']
+    assert [row[0] for row in tables[cucm_join_titles[1]][1:]] == ['SEP000000000001']
+
+
+def test_column_coercion():
+    assert [boolean(value) for value in [True, False, None, 'True', 'false', 'YES', '1', '0', '', 1, 0]] == \
+        [True, False, None, True, False, True, True, False, False, True, False]
+    assert [integer(value) for value in [2, '3', None, '', 'Unknown', 4.0]] == [2, 3, None, None, None, 4]
+
+
+@pytest.mark.parametrize('arrow', [False, True])
+def test_parquet_and_arrow_failed_table_types(arrow, tmp_path):
+    pyarrow = pytest.importorskip('pyarrow')
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    replayed_failed = [{**failed_devices[0], 'connectivity': 'True', 'session_retries': '1'}]
+    output_to_parquet(routers_switches, phones, [], others, failed_devices + replayed_failed, str(tmp_path),
+                      arrow=arrow, batch_size=1)
+    file = next(tmp_path.glob(f'*-Failed.{"arrow" if arrow else "parquet"}'))
+    if arrow:
+        table = pyarrow.ipc.open_file(str(file)).read_all()
+    else:
+        table = pyarrow.parquet.read_table(str(file))
+    assert table.schema.field('Connectivity').type == pyarrow.bool_()
+    assert table.column('Connectivity').to_pylist() == [False, True]
+    assert table.column('Session Retries').to_pylist() == [2, 1]
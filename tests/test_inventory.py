@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+pytest.importorskip('net_async')
+
+from capture import CaptureArchive, CaptureReplay, ReplaySession
+from inventory import HostnameIndex, InventoryDiscovery, RtSwSeperator, discovery
+from synthetic import SyntheticNetwork
+
+second_ip = '10.255.0.1'
+"""Second IP address of a distribution switch, not its CDP management IP address"""
+
+
+class DelayedReplay(CaptureReplay):
+    """'CaptureReplay' delaying sessions of given IP addresses, ordering pipelined session completions"""
+    def __init__(self, file, delays):
+        super().__init__(file)
+        self.delays = delays
+
+    def run(self, username, password, ip_addresses, *args, **kwargs):
+        time.sleep(max(self.delays.get(ip_address, 0) for ip_address in ip_addresses))
+        return super().run(username, password, ip_addresses, *args, **kwargs)
+
+
+def test_hostname_index_substring_semantics():
+    known_hostnames = ['SW1', 'CORE-01.corp.local', 'DIST']
+    index = HostnameIndex(known_hostnames)
+    for hostname in ['SW1', 'SW1.corp.local', 'SW10', 'CORE-01.corp.local', 'AB-DIST-02', 'DIST', 'xSW1']:
+        assert hostname in index
+        assert any(known_hostname in hostname for known_hostname in known_hostnames)
+    for hostname in ['SW', 'CORE-01', 'DIS', '', 'sw1']:
+        assert hostname not in index
+        assert not any(known_hostname in hostname for known_hostname in known_hostnames)
+    index.add('SW')
+    assert 'SW' in index
+    assert sorted(index) == sorted(known_hostnames + ['SW'])
+
+
+def test_rt_sw_seperator_known_hostnames_index_matches_list():
+    network = SyntheticNetwork(core_count=1, dist_per_core=2, access_per_dist=2, phones_per_access=1,
+                               aps_per_access=1, others_per_access=1)
+    replay_outputs = [output for output in network.sessions_outputs() if output['device']['hostname'] == 'CORE00']
+    assert len(replay_outputs) == 1
+    # CDP neighbors of core switch are new unless their hostname contains a known hostname
+    sessions_outputs = [{'device': output['device'],
+                         'output': discovery(ReplaySession(output['device'], output['outputs']))}
+                        for output in replay_outputs]
+    for known_hostnames in [['DIST00000'], HostnameIndex(['DIST00000'])]:
+        rt_sw = RtSwSeperator(sessions_outputs, known_hostnames)
+        assert [router_switch['hostname'] for router_switch in rt_sw.connection_parsed] == ['CORE00']
+        assert [router_switch['hostname'] for router_switch in rt_sw.new] == ['DIST00001']
+
+
+@pytest.fixture
+def capture_file(tmp_path):
+    network = SyntheticNetwork(core_count=1, dist_per_core=2, access_per_dist=2, phones_per_access=3,
+                               aps_per_access=1, others_per_access=1)
+    capture_file = str(tmp_path / 'capture.jsonl.gz')
+    archive = CaptureArchive(capture_file)
+    for device in network.devices.values():
+        archive.write_device(device.device, device.outputs())
+    dist_device = next(device for device in network.devices.values() if device.device['hostname'].startswith('DIST'))
+    archive.write_device({**dist_device.device, 'ip_address': second_ip}, dist_device.outputs())
+    archive.close()
+    return capture_file, network, dist_device.device['ip_address']
+
+
+@pytest.mark.parametrize('pipelined', [False, True])
+def test_device_reached_through_second_ip_listed_once(capture_file, pipelined):
+    capture_file, network, dist_ip = capture_file
+    expected = InventoryDiscovery('', '', network.core_ips, session_backend=CaptureReplay(capture_file))
+    # Second IP address session finishes after the core switch queues the CDP management IP address, but before the
+    # management IP address session finishes
+    replay = DelayedReplay(capture_file, {second_ip: 0.05, dist_ip: 0.3})
+    inventory = InventoryDiscovery('', '', network.core_ips + [second_ip], session_backend=replay,
+                                   pipelined=pipelined)
+    hostnames = [router_switch['hostname'] for router_switch in inventory.routers_switches]
+    assert sorted(hostnames) == sorted(router_switch['hostname'] for router_switch in expected.routers_switches)
+    assert all(router_switch['connection_attempt'] == 'Success' for router_switch in inventory.routers_switches)
+    assert inventory.failed_devices == []
+    assert len(inventory.phones) == len(expected.phones)
@@ -0,0 +1,105 @@
+import pytest
+
+pytest.importorskip('net_async')
+
+from capture import CaptureArchive, CaptureReplay
+from journal import DiscoveryJournal, ReplayedSessions
+from inventory import InventoryDiscovery
+from synthetic import SyntheticNetwork
+
+
+class InterruptedReplay(CaptureReplay):
+    """'CaptureReplay' raising on the given session run, as if the discovery process died mid pass"""
+    def __init__(self, file, interrupt_run):
+        super().__init__(file)
+        self.interrupt_run = interrupt_run
+        self.runs = 0
+
+    def run(self, *args, **kwargs):
+        self.runs += 1
+        if self.runs == self.interrupt_run:
+            raise RuntimeError('Interrupted')
+        return super().run(*args, **kwargs)
+
+
+def inventory_lists(inventory):
+    return [sorted(map(repr, devices)) for devices in [inventory.routers_switches, inventory.phones, inventory.waps,
+                                                       inventory.others, inventory.failed_devices]]
+
+
+@pytest.fixture
+def network(tmp_path):
+    network = SyntheticNetwork(core_count=1, dist_per_core=2, access_per_dist=2, phones_per_access=3,
+                               aps_per_access=1, others_per_access=1)
+    network.write_capture(str(tmp_path / 'capture.jsonl.gz'))
+    return network
+
+
+def test_resume_after_interrupted_pass_matches_uninterrupted(network, tmp_path):
+    capture_file = str(tmp_path / 'capture.jsonl.gz')
+    journal_file = str(tmp_path / 'journal.jsonl')
+    expected = InventoryDiscovery('', '', network.core_ips, session_backend=CaptureReplay(capture_file))
+    with pytest.raises(RuntimeError):
+        InventoryDiscovery('', '', network.core_ips, session_backend=InterruptedReplay(capture_file, 3),
+                           journal_file=journal_file)
+    replay = InterruptedReplay(capture_file, None)
+    resumed = InventoryDiscovery('', '', network.core_ips, session_backend=replay, journal_file=journal_file,
+                                 resume=True)
+    # Only the interrupted third pass runs again, the two finished passes are restored from pass records
+    assert replay.runs == 1
+    assert inventory_lists(resumed) == inventory_lists(expected)
+
+
+def test_resume_retries_journaled_failed_devices(network, tmp_path):
+    capture_file = str(tmp_path / 'capture.jsonl.gz')
+    partial_file = str(tmp_path / 'partial.jsonl.gz')
+    journal_file = str(tmp_path / 'journal.jsonl')
+    # Access switch missing from partial archive is a failed device
+    missing_ip = list(network.devices)[-1]
+    archive = CaptureArchive(partial_file)
+    for ip_address, device in network.devices.items():
+        if ip_address != missing_ip:
+            archive.write_device(device.device, device.outputs())
+    archive.close()
+    failed = InventoryDiscovery('', '', network.core_ips, session_backend=CaptureReplay(partial_file),
+                                journal_file=journal_file)
+    assert [device['ip_address'] for device in failed.failed_devices] == [missing_ip]
+
+    not_retried = InventoryDiscovery('', '', network.core_ips, session_backend=CaptureReplay(capture_file),
+                                     journal_file=journal_file, resume=True, retry_failed=False)
+    assert inventory_lists(not_retried) == inventory_lists(failed)
+
+    retried = InventoryDiscovery('', '', network.core_ips, session_backend=CaptureReplay(capture_file),
+                                 journal_file=journal_file, resume=True)
+    expected = InventoryDiscovery('', '', network.core_ips, session_backend=CaptureReplay(capture_file))
+    assert retried.failed_devices == []
+    assert inventory_lists(retried) == inventory_lists(expected)
+
+
+def test_journal_replay_splits_journaled_and_remaining_ips(tmp_path):
+    journal_file = str(tmp_path / 'journal.jsonl')
+    journal = DiscoveryJournal(journal_file)
+    device = {'hostname': 'SW1', 'ip_address': '10.0.0.1'}
+    failed_device = {'ip_address': '10.0.0.2', 'exception': 'Timeout'}
+    journal.write_sessions(ReplayedSessions([{'device': device, 'output': {'phones': []}}], [failed_device]))
+    with open(journal_file, 'a') as file:
+        file.write('{"record": "device", "ip_add')
+
+    journal = DiscoveryJournal(journal_file, resume=True)
+    sessions, remaining_ips = journal.replay(['10.0.0.1', '10.0.0.2', '10.0.0.3'])
+    assert sessions.successful_devices == [device]
+    assert sessions.failed_devices == []
+    assert remaining_ips == ['10.0.0.2', '10.0.0.3']
+    sessions, remaining_ips = journal.replay(['10.0.0.1', '10.0.0.2', '10.0.0.3'], retry_failed=False)
+    assert sessions.failed_devices == [failed_device]
+    assert remaining_ips == ['10.0.0.3']
+
+
+def test_journal_without_resume_starts_empty(tmp_path):
+    journal_file = str(tmp_path / 'journal.jsonl')
+    DiscoveryJournal(journal_file).write_output('10.0.0.1', 'SW1', {'phones': []})
+    assert DiscoveryJournal(journal_file, resume=True).outputs == {'10.0.0.1': {'phones': []}}
+    journal = DiscoveryJournal(journal_file)
+    assert journal.outputs == {}
+    with open(journal_file) as file:
+        assert file.read() == ''
@@ -0,0 +1,74 @@
+from normalize import normalizers
+import pytest
+
+# (normalizer, raw CDP banner, expected) corpus of IOS, IOS-XE, NX-OS, access point, phone, and other banners
+version_corpus = [
+    # IOS
+    ('router_sw_version', 'Cisco IOS Software, C3750E Software (C3750E-UNIVERSALK9-M), Version 15.2(4)E10, RELEASE '
+                          'SOFTWARE (fc2)', '15.2(4)E10'),
+    ('router_sw_version', 'Cisco IOS Software, C2960X Software (C2960X-UNIVERSALK9-M), Version 15.2(7)E4, RELEASE '
+                          'SOFTWARE (fc2)', '15.2(7)E4'),
+    ('router_sw_version', 'Cisco IOS Software, C3900 Software (C3900-UNIVERSALK9-M), Version 15.7(3)M5, RELEASE '
+                          'SOFTWARE (fc1)', '15.7(3)M5'),
+    ('router_sw_version', 'Cisco Internetwork Operating System Software IOS (tm) C3550 Software '
+                          '(C3550-IPSERVICESK9-M), Version 12.2(44)SE6, RELEASE SOFTWARE (fc1)', '12.2(44)SE6'),
+    # IOS-XE
+    ('router_sw_version', 'Cisco IOS Software [Gibraltar], Catalyst L3 Switch Software (CAT9K_IOSXE), Version 16.12.4, '
+                          'RELEASE SOFTWARE (fc5)', '16.12.4'),
+    ('router_sw_version', 'Cisco IOS Software [Bengaluru], Catalyst L3 Switch Software (CAT9K_IOSXE), Version 17.6.4, '
+                          'RELEASE SOFTWARE (fc1)', '17.6.4'),
+    ('router_sw_version', 'Cisco IOS Software [Everest], ISR Software (X86_64_LINUX_IOSD-UNIVERSALK9-M), Version '
+                          '16.6.4, RELEASE SOFTWARE (fc3)', '16.6.4'),
+    ('router_sw_version', 'Cisco IOS Software, IOS-XE Software, Catalyst L3 Switch Software (CAT3K_CAA-UNIVERSALK9-M), '
+                          'Version 03.06.06E RELEASE SOFTWARE (fc1)', '03.06.06E'),
+    # NX-OS
+    ('router_sw_version', 'Cisco Nexus Operating System (NX-OS) Software, Version 9.3(8)', '9.3(8)'),
+    ('router_sw_version', 'Cisco Nexus Operating System (NX-OS) Software, Version 7.0(3)I7(6)', '7.0(3)I7(6)'),
+    ('router_sw_version', 'Cisco NX-OS(tm) n5000, Software (n5000-uk9), Version 7.3(8)N1(1), RELEASE SOFTWARE '
+                          'Copyright (c) 2002-2012 by Cisco Systems, Inc.', '7.3(8)N1(1)'),
+    ('router_sw_version', 'Cisco Controller, Version: 8.5.140.0', '8.5.140.0'),
+    ('router_sw_version', 'Cisco Adaptive Security Appliance Software Version 9.8(4)', '9.8(4)'),
+    ('router_sw_version', 'Meraki MS225-48FP Cloud Managed Switch', 'Meraki MS225-48FP Cloud Managed Switch'),
+    # Access points
+    ('wap_version', 'Cisco IOS Software, C3600 Software (AP3G2-K9W8-M), Version 15.3(3)JPJ7, RELEASE SOFTWARE (fc1)',
+     '15.3(3)JPJ7'),
+    ('wap_version', 'Cisco IOS Software, C1700 Software (AP1G4-K9W8-M), Version 15.3(3)JF12, RELEASE SOFTWARE (fc2)',
+     '15.3(3)JF12'),
+    ('wap_version', 'Cisco AP Software, ap3g3-k9w8 Version: 17.3.4.154', '17.3.4.154'),
+    ('wap_version', 'Cisco AP Software, ap1g6a-k9c Version: 17.9.4.27', '17.9.4.27'),
+    ('wap_version', 'Cisco AP Software, ap1g5-k9w8 Version: 8.10.151.0', '8.10.151.0'),
+    ('wap_version', 'Meraki MR46 Cloud Managed AP', 'Meraki MR46 Cloud Managed AP'),
+    # Other devices
+    ('other_version', 'Cisco IOS Software, ISR Software (X86_64_LINUX_IOSD-UNIVERSALK9-M), Version 17.3.5, RELEASE '
+                      'SOFTWARE (fc2)', '17.3.5'),
+    ('other_version', 'Cisco Adaptive Security Appliance Software Version 9.8(4)', '9.8(4)'),
+    ('other_version', 'VMware ESXi version 7.0.3', '7.0.3'),
+    ('other_version', 'Cisco Unified Communications Manager version', 'Cisco Unified Communications Manager version'),
+    ('other_version', 'Linux 4.14.76 #1 SMP', 'Linux 4.14.76 #1 SMP'),
+    ('other_version', 'Cisco Identity Services Engine Version 3.1.0.518', '3.1.0.518'),
+    # Phones
+    ('phone_version', 'sip88xx.14-1-1-0001-136.loads', 'sip88xx.14-1-1-0001-136'),
+    ('phone_version', 'sip78xx.14-1-1-0001-136.loads', 'sip78xx.14-1-1-0001-136'),
+    ('phone_version', 'SCCP75.9-4-2SR4-3S', 'SCCP75.9-4-2SR4-3S'),
+    ('phone_version', 'CP-8832-NR.12-8-1-0001-455.loads', 'CP-8832-NR.12-8-1-0001-455'),
+    # Platforms
+    ('platform_model', 'cisco WS-C3850-48P', 'WS-C3850-48P'),
+    ('platform_model', 'cisco C9300-48P', 'C9300-48P'),
+    ('platform_model', 'cisco ISR4451-X/K9', 'ISR4451-X/K9'),
+    ('platform_model', 'N9K-C93180YC-EX', 'N9K-C93180YC-EX'),
+    ('platform_model', 'Cisco AIR-AP2802I-B-K9', 'AIR-AP2802I-B-K9'),
+    ('platform_model', 'cisco AIR-CAP3702I-A-K9', 'AIR-CAP3702I-A-K9'),
+    ('platform_model', 'Cisco C9120AXI-B', 'C9120AXI-B'),
+    ('platform_model', 'VMware', 'VMware'),
+    ('platform_model', 'Cisco cisco C8000V', 'Cisco C8000V'),
+    ('phone_model', 'Cisco IP Phone 8845', '8845'),
+    ('phone_model', 'Cisco IP Phone 7841', '7841'),
+    ('phone_model', 'Cisco IP Conference Phone 8832', 'Cisco IP Conference Phone 8832'),
+    ('phone_model', 'Polycom SoundStation', 'Polycom SoundStation')
+]
+
+
+@pytest.mark.parametrize('normalizer, raw, expected', version_corpus)
+def test_normalizer(normalizer, raw, expected):
+    assert normalizers[normalizer](raw) == expected
+
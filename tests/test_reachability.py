@@ -0,0 +1,36 @@
+import socket
+
+from reachability import ReachabilityPrecheck
+
+
+def test_subnet_timeout_decays_after_slow_outlier():
+    precheck = ReachabilityPrecheck(min_timeout=0.01, max_timeout=5.0)
+    precheck.observe('10.1.1.1', 0.02)
+    precheck.observe('10.1.1.2', 1.0)
+    outlier_timeout = precheck.subnet_timeout('10.1.1.3')
+    for _ in range(50):
+        precheck.observe('10.1.1.1', 0.02)
+    assert precheck.subnet_timeout('10.1.1.3') < outlier_timeout
+    assert precheck.subnet_timeout('10.1.1.3') < 0.05
+    # Other subnets keep the default timeout
+    assert precheck.subnet_timeout('10.1.2.1') == precheck.timeout
+
+
+def test_subnet_timeout_within_floor_and_cap():
+    precheck = ReachabilityPrecheck(min_timeout=0.25, max_timeout=5.0)
+    precheck.observe('10.1.1.1', 0.001)
+    assert precheck.subnet_timeout('10.1.1.1') == 0.25
+    precheck.observe('10.2.1.1', 30.0)
+    assert precheck.subnet_timeout('10.2.1.1') == 5.0
+
+
+def test_check_local_listener():
+    # Kernel accepts connections into the listen backlog
+    with socket.socket() as listener:
+        listener.bind(('127.0.0.1', 0))
+        listener.listen()
+        precheck = ReachabilityPrecheck(ports=(listener.getsockname()[1],))
+        reachable_ips, failed_devices = precheck.check(['127.0.0.1'])
+    assert reachable_ips == ['127.0.0.1']
+    assert failed_devices == []
+    assert '127.0.0.0/24' in precheck.subnet_rtts
@@ -0,0 +1,65 @@
+import pytest
+
+from records import Neighbor, Phone, RouterSwitch
+
+phone_device = {
+    'hostname': 'SEP001122334455',
+    'neighbor': {'hostname': 'access-sw1', 'ip_address': '10.0.0.2', 'remote_intf': 'Gi1/0/1'},
+    'ip_address': '10.1.0.10',
+    'mac_addr': '0011.2233.4455',
+    'voice_vlan': '20',
+    'software_version': 'sip88xx.14-1-1',
+    'model': 'CP-8845'
+}
+
+
+def test_dictionary_style_access():
+    phone = Phone.from_dict(phone_device)
+    assert phone['hostname'] == 'SEP001122334455'
+    assert phone['neighbor']['hostname'] == 'access-sw1'
+    assert isinstance(phone['neighbor'], Neighbor)
+    assert phone.get('model') == 'CP-8845'
+    assert 'model' in phone
+    assert phone.keys() == list(phone_device)
+    assert phone.to_dict() == phone_device
+    assert phone == phone_device
+
+
+def test_unset_and_unknown_fields_behave_as_missing_keys():
+    phone = Phone.from_dict(phone_device)
+    for key in ['description', 'not_a_field']:
+        assert key not in phone
+        assert phone.get(key) is None
+        assert phone.get(key, 'default') == 'default'
+        with pytest.raises(KeyError):
+            phone[key]
+    with pytest.raises(KeyError):
+        phone['not_a_field'] = 'value'
+
+
+def test_cucm_field_assignment():
+    phone = Phone.from_dict(phone_device)
+    cucm_fields = {'description': 'Front desk', 'directory_number': '1001', 'line_numbers': ['1001', '1002'],
+                   'device_pool': 'DP_Campus', 'cucm_model': 'Cisco 8845'}
+    for key, value in cucm_fields.items():
+        phone[key] = value
+    for key, value in cucm_fields.items():
+        assert key in phone
+        assert phone[key] == value
+        assert phone.get(key) == value
+    assert phone.to_dict() == {**phone_device, **cucm_fields}
+
+
+def test_from_dict_drops_unknown_keys_and_interns_fields():
+    switch = RouterSwitch.from_dict({'hostname': ''.join(['core', '-sw1']), 'ip_address': '10.0.0.1',
+                                     'model': ''.join(['N9K', '-C93180']), 'unknown': 'dropped'})
+    assert 'unknown' not in switch
+    assert switch['model'] is RouterSwitch.from_dict({'model': 'N9K-C93180'})['model']
+    assert switch['hostname'] is Neighbor.from_dict({'hostname': 'core-sw1'})['hostname']
+
+
+def test_records_are_unhashable():
+    phone = Phone.from_dict(phone_device)
+    assert phone == Phone.from_dict(phone_device)
+    with pytest.raises(TypeError):
+        hash(phone)
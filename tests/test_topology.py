@@ -0,0 +1,95 @@
+from xml.etree import ElementTree
+import json
+
+from topology import TopologyGraph
+
+
+def neighbor_output(routers_switches=(), phones=(), waps=(), others=()):
+    """'discovery()' shaped output"""
+    return {'routers_switches': list(routers_switches), 'phones': list(phones), 'waps': list(waps),
+            'others': list(others)}
+
+
+def router_switch(hostname, ip_address, local_intf, remote_intf):
+    return {'hostname': hostname, 'ip_address': ip_address, 'model': 'C9300', 'software_version': '16.9.5',
+            'local_intf': local_intf, 'remote_intf': remote_intf}
+
+
+def endpoint(hostname, switch_intf, remote_intf='Port 1'):
+    return {'hostname': hostname, 'ip_address': '', 'model': 'CP-8845', 'software_version': '14-1-1',
+            'neighbor': {'hostname': 'ACC1', 'ip_address': '10.0.0.3', 'remote_intf': switch_intf,
+                         'local_intf': remote_intf}}
+
+
+def campus():
+    """CORE1 - DIST1 - ACC1 with phone and WAP on ACC1, link between CORE1 and DIST1 reported by both switches"""
+    graph = TopologyGraph()
+    graph.add_discovery({'hostname': 'CORE1', 'ip_address': '10.0.0.1'}, neighbor_output(
+        [router_switch('DIST1', '10.0.0.2', 'Te1/1/1', 'Eth1/1')]))
+    graph.add_discovery({'hostname': 'DIST1', 'ip_address': '10.0.0.2'}, neighbor_output(
+        [router_switch('CORE1', '10.0.0.1', 'Eth1/1', 'Te1/1/1'),
+         router_switch('ACC1', '10.0.0.3', 'Te1/1/1', 'Te2/1/1')]))
+    graph.add_discovery({'hostname': 'ACC1', 'ip_address': '10.0.0.3'}, neighbor_output(
+        phones=[endpoint('SEP001122334455', 'Gi1/0/1')], waps=[endpoint('AP1', 'Gi1/0/2', 'Gi0')]))
+    return graph
+
+
+def test_links_reported_by_both_neighbors_stored_once():
+    graph = campus()
+    assert list(graph.links()) == [('CORE1', 'DIST1', 'Eth1/1', 'Te1/1/1'), ('DIST1', 'ACC1', 'Te2/1/1', 'Te1/1/1'),
+                                   ('ACC1', 'SEP001122334455', 'Gi1/0/1', 'Port 1'), ('ACC1', 'AP1', 'Gi1/0/2', 'Gi0')]
+    assert graph.nodes['DIST1'] == {'device_type': 'RouterSwitch', 'ip_address': '10.0.0.2', 'model': 'C9300',
+                                    'software_version': '16.9.5'}
+
+
+def test_shortest_path_and_components():
+    graph = campus()
+    assert graph.shortest_path('CORE1', 'AP1') == ['CORE1', 'DIST1', 'ACC1', 'AP1']
+    assert graph.shortest_path('AP1', 'CORE1') == ['AP1', 'ACC1', 'DIST1', 'CORE1']
+    assert graph.shortest_path('CORE1', 'CORE1') == ['CORE1']
+    assert graph.shortest_path('CORE1', 'missing') is None
+    graph.add_node('ISOLATED', 'RouterSwitch')
+    assert graph.shortest_path('CORE1', 'ISOLATED') is None
+    assert graph.connected_components() == [{'CORE1', 'DIST1', 'ACC1', 'SEP001122334455', 'AP1'}, {'ISOLATED'}]
+
+
+def test_endpoints_of_switch():
+    graph = campus()
+    assert graph.endpoints('ACC1') == [
+        {'hostname': 'SEP001122334455', 'device_type': 'Phone', 'local_intf': 'Gi1/0/1', 'remote_intf': 'Port 1'},
+        {'hostname': 'AP1', 'device_type': 'WAP', 'local_intf': 'Gi1/0/2', 'remote_intf': 'Gi0'}]
+    assert graph.endpoints('ACC1', ('WAP',)) == [
+        {'hostname': 'AP1', 'device_type': 'WAP', 'local_intf': 'Gi1/0/2', 'remote_intf': 'Gi0'}]
+    assert graph.endpoints('CORE1') == []
+
+
+def test_self_loop_kept_once():
+    graph = TopologyGraph()
+    graph.add_node('SW1', 'RouterSwitch')
+    graph.add_link('SW1', 'SW1', 'Gi1/0/1', 'Gi1/0/2')
+    assert list(graph.links()) == [('SW1', 'SW1', 'Gi1/0/1', 'Gi1/0/2')]
+
+
+def test_router_switch_type_and_known_attributes_kept():
+    graph = TopologyGraph()
+    graph.add_node('SW1', 'RouterSwitch', '10.0.0.1', 'C9300', '16.9.5')
+    graph.add_node('SW1', 'Other', '', 'Unknown')
+    assert graph.nodes['SW1'] == {'device_type': 'RouterSwitch', 'ip_address': '10.0.0.1', 'model': 'C9300',
+                                  'software_version': '16.9.5'}
+
+
+def test_json_and_graphml_export(tmp_path):
+    graph = campus()
+    graph.add_node('SW<&>', 'RouterSwitch')
+    json_file = tmp_path / 'topology.json'
+    graph.to_json(str(json_file))
+    topology = json.loads(json_file.read_text())
+    assert [node['id'] for node in topology['nodes']] == list(graph.nodes)
+    assert len(topology['links']) == 4
+
+    graphml_file = tmp_path / 'topology.graphml'
+    graph.to_graphml(str(graphml_file))
+    namespace = {'g': 'http://graphml.graphdrawing.org/xmlns'}
+    root = ElementTree.parse(str(graphml_file)).getroot()
+    assert [node.get('id') for node in root.iterfind('g:graph/g:node', namespace)] == list(graph.nodes)
+    assert len(root.findall('g:graph/g:edge', namespace)) == 4
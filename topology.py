@@ -0,0 +1,191 @@
+from threading import Lock
+from xml.sax.saxutils import escape, quoteattr
+import json
+
+endpoint_types = ('Phone', 'WAP', 'Other')
+
+
+class TopologyGraph:
+    """
+    In-memory CDP topology graph keyed by hostname, built incrementally from 'discovery()' results, as each device's
+    session finishes with pipelined discovery or after each discovery pass otherwise.\n
+    Links are stored in both directions with the interface of each end, so links reported by both neighbors are only
+    stored once. Self-loops, eg. a device neighboring itself through a loopback cable, are kept.
+
+        Attributes:
+            nodes = {hostname: {'device_type', 'ip_address', 'model', 'software_version'}}\n
+            adjacency = {hostname: {neighbor hostname: {(local interface, neighbor interface)}}}
+    """
+    def __init__(self):
+        self.nodes = {}
+        self.adjacency = {}
+        self.lock = Lock()
+
+    def add_node(self, hostname, device_type, ip_address='', model='', software_version=''):
+        """Adds node, router/switch type and known attributes of existing node are kept"""
+        node = self.nodes.get(hostname)
+        if node is None:
+            self.nodes[hostname] = {'device_type': device_type, 'ip_address': ip_address, 'model': model,
+                                    'software_version': software_version}
+            self.adjacency[hostname] = {}
+        else:
+            if device_type == 'RouterSwitch':
+                node['device_type'] = device_type
+            for key, value in (('ip_address', ip_address), ('model', model), ('software_version', software_version)):
+                if value not in ('', None, 'Unknown'):
+                    node[key] = value
+
+    def add_link(self, hostname, neighbor_hostname, local_intf, neighbor_intf):
+        self.adjacency[hostname].setdefault(neighbor_hostname, set()).add((local_intf, neighbor_intf))
+        self.adjacency[neighbor_hostname].setdefault(hostname, set()).add((neighbor_intf, local_intf))
+
+    def add_discovery(self, device, output):
+        """Adds connection scanned device and its CDP neighbors
+
+        :param device: 'AsyncSessions().outputs' device
+        :param output: 'discovery()' output
+        """
+        hostname = device['hostname']
+        with self.lock:
+            self.add_node(hostname, 'RouterSwitch', device['ip_address'], device.get('model', ''),
+                          device.get('software_version', ''))
+            for rt_sw in output['routers_switches']:
+                self.add_node(rt_sw['hostname'], 'RouterSwitch', rt_sw['ip_address'], rt_sw['model'],
+                              rt_sw['software_version'])
+                self.add_link(hostname, rt_sw['hostname'], rt_sw['remote_intf'], rt_sw['local_intf'])
+            for device_type, endpoints in (('Phone', output['phones']), ('WAP', output['waps']),
+                                           ('Other', output['others'])):
+                for endpoint in endpoints:
+                    neighbor = endpoint['neighbor']
+                    self.add_node(endpoint['hostname'], device_type, endpoint['ip_address'], endpoint['model'],
+                                  endpoint['software_version'])
+                    self.add_link(hostname, endpoint['hostname'], neighbor['remote_intf'],
+                                  neighbor.get('local_intf', ''))
+
+    def add_sessions(self, sessions_outputs):
+        """Adds each 'AsyncSessions().outputs' result"""
+        for output in sessions_outputs:
+            self.add_discovery(output['device'], output['output'])
+
+    def shortest_path(self, source, target):
+        """Bidirectional breadth first search of fewest hop path
+
+        :return: list(hostnames) from source to target, None if not connected"""
+        if source not in self.adjacency or target not in self.adjacency:
+            return None
+        if source == target:
+            return [source]
+        forward = {source: None}
+        backward = {target: None}
+        forward_frontier = [source]
+        backward_frontier = [target]
+        while forward_frontier and backward_frontier:
+            # Expands smaller frontier
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, visited, other = forward_frontier, forward, backward
+            else:
+                frontier, visited, other = backward_frontier, backward, forward
+            next_frontier = []
+            for hostname in frontier:
+                for neighbor in self.adjacency[hostname]:
+                    if neighbor in visited:
+                        continue
+                    visited[neighbor] = hostname
+                    if neighbor in other:
+                        path = []
+                        node = neighbor
+                        while node is not None:
+                            path.append(node)
+                            node = forward[node]
+                        path.reverse()
+                        node = backward[neighbor]
+                        while node is not None:
+                            path.append(node)
+                            node = backward[node]
+                        return path
+                    next_frontier.append(neighbor)
+            if visited is forward:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+        return None
+
+    def endpoints(self, hostname, device_types=endpoint_types):
+        """Endpoints directly connected to switch
+
+        :return: [{'hostname', 'device_type', 'local_intf', 'remote_intf'}], 'local_intf' being switch interface"""
+        endpoints = []
+        for neighbor, links in self.adjacency.get(hostname, {}).items():
+            device_type = self.nodes[neighbor]['device_type']
+            if device_type in device_types:
+                for local_intf, remote_intf in sorted(links):
+                    endpoints.append({'hostname': neighbor, 'device_type': device_type, 'local_intf': local_intf,
+                                      'remote_intf': remote_intf})
+        return endpoints
+
+    def connected_components(self):
+        """
+        :return: list(set(hostnames)), largest first"""
+        components = []
+        visited = set()
+        for start in self.adjacency:
+            if start in visited:
+                continue
+            visited.add(start)
+            component = {start}
+            stack = [start]
+            while stack:
+                for neighbor in self.adjacency[stack.pop()]:
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        component.add(neighbor)
+                        stack.append(neighbor)
+            components.append(component)
+        components.sort(key=len, reverse=True)
+        return components
+
+    def links(self):
+        """Yields each link once as (hostname, neighbor hostname, local interface, neighbor interface), including
+        self-loops"""
+        order = {hostname: i for i, hostname in enumerate(self.adjacency)}
+        for hostname, neighbors in self.adjacency.items():
+            for neighbor, links in neighbors.items():
+                if order[hostname] < order[neighbor]:
+                    for local_intf, neighbor_intf in sorted(links):
+                        yield hostname, neighbor, local_intf, neighbor_intf
+                elif hostname == neighbor:
+                    # Self-loop cable is stored from both of its interfaces
+                    for local_intf, neighbor_intf in sorted(links):
+                        if local_intf <= neighbor_intf:
+                            yield hostname, neighbor, local_intf, neighbor_intf
+
+    def to_dict(self):
+        """Node-link dictionary format"""
+        return {
+            'nodes': [{'id': hostname, **node} for hostname, node in self.nodes.items()],
+            'links': [{'source': hostname, 'target': neighbor, 'source_intf': local_intf, 'target_intf': neighbor_intf}
+                      for hostname, neighbor, local_intf, neighbor_intf in self.links()]
+        }
+
+    def to_json(self, file):
+        with open(file, 'w') as json_file:
+            json.dump(self.to_dict(), json_file)
+
+    def to_graphml(self, file):
+        node_keys = ['device_type', 'ip_address', 'model', 'software_version']
+        with open(file, 'w') as graphml_file:
+            graphml_file.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                               '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+            for key in node_keys:
+                graphml_file.write(f'<key id="{key}" for="node" attr.name="{key}" attr.type="string"/>\n')
+            for key in ('source_intf', 'target_intf'):
+                graphml_file.write(f'<key id="{key}" for="edge" attr.name="{key}" attr.type="string"/>\n')
+            graphml_file.write('<graph id="cdp" edgedefault="undirected">\n')
+            for hostname, node in self.nodes.items():
+                data = ''.join(f'<data key="{key}">{escape(str(node[key]))}</data>' for key in node_keys)
+                graphml_file.write(f'<node id={quoteattr(hostname)}>{data}</node>\n')
+            for hostname, neighbor, local_intf, neighbor_intf in self.links():
+                graphml_file.write(f'<edge source={quoteattr(hostname)} target={quoteattr(neighbor)}>'
+                                   f'<data key="source_intf">{escape(str(local_intf))}</data>'
+                                   f'<data key="target_intf">{escape(str(neighbor_intf))}</data></edge>\n')
+            graphml_file.write('</graph>\n</graphml>\n')
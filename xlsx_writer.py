@@ -0,0 +1,140 @@
+from xml.sax.saxutils import escape
+from zipfile import ZipFile, ZIP_DEFLATED
+import re
+
+# Minimal SpreadsheetML package writer used by 'output_to_spreadsheet' parallel mode. Worksheet and table XML are
+# rendered independently, so each sheet can be built within its own worker process, then assembled here.
+
+invalid_xml_re = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+"""Control characters not allowed within XML"""
+
+content_types = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">\
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>\
+<Default Extension="xml" ContentType="application/xml"/>\
+<Override PartName="/xl/workbook.xml" \
+ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>\
+<Override PartName="/xl/styles.xml" \
+ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>\
+{overrides}</Types>'''
+
+package_rels = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">\
+<Relationship Id="rId1" \
+Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" \
+Target="xl/workbook.xml"/></Relationships>'''
+
+styles = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">\
+<fonts count="1"><font><sz val="11"/><name val="Calibri"/><family val="2"/></font></fonts>\
+<fills count="2"><fill><patternFill patternType="none"/></fill>\
+<fill><patternFill patternType="gray125"/></fill></fills>\
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>\
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>\
+<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>\
+<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>\
+<tableStyles count="0" defaultTableStyle="TableStyleMedium9" defaultPivotStyle="PivotStyleLight16"/>\
+</styleSheet>'''
+
+main_ns = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+relationship_ns = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+
+def column_letters(i):
+    """Returns column letters of zero based column index"""
+    letters = ''
+    i += 1
+    while i > 0:
+        i, remainder = divmod(i - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def cell_xml(ref, value):
+    """Returns cell XML, strings are written inline"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    text = escape(invalid_xml_re.sub('', str(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def row_xml(row_num, row):
+    """Returns row XML of list of cell values"""
+    cells = ''.join(cell_xml(f'{column_letters(i)}{row_num}', value) for i, value in enumerate(row))
+    return f'<row r="{row_num}">{cells}</row>'
+
+
+def sheet_xml(column_widths, rows, table=False):
+    """
+    :param column_widths: Width of each column
+    :param rows: List of 'row_xml()'
+    :param table: Worksheet has table part
+    :return: Worksheet XML
+    """
+    cols = ''.join(f'<col min="{i}" max="{i}" width="{width}" customWidth="1"/>'
+                   for i, width in enumerate(column_widths, 1))
+    table_parts = '<tableParts count="1"><tablePart r:id="rId1"/></tableParts>' if table else ''
+    return (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<worksheet xmlns="{main_ns}" xmlns:r="{relationship_ns}">'
+            f'{f"<cols>{cols}</cols>" if cols else ""}<sheetData>{"".join(rows)}</sheetData>{table_parts}</worksheet>')
+
+
+def table_xml(table_id, name, ref, header, style='TableStyleMedium9'):
+    """Returns table XML with row and column stripes
+
+    :param table_id: Workbook unique table ID
+    :param name: Table display name
+    :param ref: Table range, eg. 'A1:D10'
+    :param header: List of column names
+    """
+    columns = ''.join(f'<tableColumn id="{i}" name="{escape(str(name), {chr(34): "&quot;"})}"/>'
+                      for i, name in enumerate(header, 1))
+    return (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<table xmlns="{main_ns}" id="{table_id}" name="{name}" displayName="{name}" ref="{ref}">'
+            f'<autoFilter ref="{ref}"/><tableColumns count="{len(header)}">{columns}</tableColumns>'
+            f'<tableStyleInfo name="{style}" showFirstColumn="0" showLastColumn="0" showRowStripes="1" '
+            f'showColumnStripes="1"/></table>')
+
+
+def write_package(file, sheets):
+    """Writes xlsx file
+
+    :param file: File location
+    :param sheets: List of (title, sheet_xml, table_xml or None) in workbook order
+    """
+    overrides = []
+    workbook_sheets = []
+    workbook_rels = []
+    with ZipFile(file, 'w', ZIP_DEFLATED) as package:
+        for i, (title, sheet, table) in enumerate(sheets, 1):
+            overrides.append(f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="application/'
+                             f'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>')
+            workbook_sheets.append(f'<sheet name="{escape(title)}" sheetId="{i}" r:id="rId{i}"/>')
+            workbook_rels.append(f'<Relationship Id="rId{i}" Type="{relationship_ns}/worksheet" '
+                                 f'Target="worksheets/sheet{i}.xml"/>')
+            package.writestr(f'xl/worksheets/sheet{i}.xml', sheet)
+            if table is not None:
+                overrides.append(f'<Override PartName="/xl/tables/table{i}.xml" ContentType="application/'
+                                 f'vnd.openxmlformats-officedocument.spreadsheetml.table+xml"/>')
+                package.writestr(f'xl/tables/table{i}.xml', table)
+                package.writestr(
+                    f'xl/worksheets/_rels/sheet{i}.xml.rels',
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                    f'<Relationship Id="rId1" Type="{relationship_ns}/table" Target="../tables/table{i}.xml"/>'
+                    '</Relationships>')
+        workbook_rels.append(f'<Relationship Id="rId{len(sheets) + 1}" Type="{relationship_ns}/styles" '
+                             f'Target="styles.xml"/>')
+        package.writestr('[Content_Types].xml', content_types.format(overrides=''.join(overrides)))
+        package.writestr('_rels/.rels', package_rels)
+        package.writestr('xl/workbook.xml', '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                                            f'<workbook xmlns="{main_ns}" xmlns:r="{relationship_ns}">'
+                                            f'<sheets>{"".join(workbook_sheets)}</sheets></workbook>')
+        package.writestr('xl/_rels/workbook.xml.rels',
+                         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                         f'{"".join(workbook_rels)}</Relationships>')